@@ -0,0 +1,47 @@
+"""add content_hash to policies
+
+Revision ID: 0b6e3f9c2d47
+Revises: f4b7d2e8a610
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e3f9c2d47'
+down_revision: Union[str, Sequence[str], None] = 'f4b7d2e8a610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('policies', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    policies = sa.table(
+        'policies',
+        sa.column('id', sa.Integer()),
+        sa.column('policy_content', sa.Text()),
+        sa.column('content_hash', sa.String(length=64)),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(policies.c.id, policies.c.policy_content).where(policies.c.policy_content.is_not(None))
+    ).all()
+    for policy_id, content in rows:
+        if content:
+            bind.execute(
+                policies.update()
+                .where(policies.c.id == policy_id)
+                .values(content_hash=hashlib.sha256(content.encode('utf-8')).hexdigest())
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('policies', 'content_hash')
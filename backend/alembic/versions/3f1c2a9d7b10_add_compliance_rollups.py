@@ -0,0 +1,70 @@
+"""add compliance_rollups table
+
+Revision ID: 3f1c2a9d7b10
+Revises: 83116199874d
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b10'
+down_revision: Union[str, Sequence[str], None] = '83116199874d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The cloudprovider enum type already exists on PostgreSQL (cloud_accounts/policies).
+provider_enum = sa.Enum('AWS', 'AZURE', 'GCP', name='cloudprovider').with_variant(
+    postgresql.ENUM('AWS', 'AZURE', 'GCP', name='cloudprovider', create_type=False), 'postgresql'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('compliance_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('provider', provider_enum, nullable=False),
+    sa.Column('accounts', sa.Integer(), nullable=False),
+    sa.Column('compliant', sa.Integer(), nullable=False),
+    sa.Column('non_compliant', sa.Integer(), nullable=False),
+    sa.Column('warning', sa.Integer(), nullable=False),
+    sa.Column('unknown', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_id', 'provider', name='uq_rollup_owner_provider')
+    )
+    op.create_index(op.f('ix_compliance_rollups_id'), 'compliance_rollups', ['id'], unique=False)
+
+    # Backfill from existing evaluations so the dashboard is correct immediately.
+    op.execute(
+        """
+        INSERT INTO compliance_rollups
+            (owner_id, provider, accounts, compliant, non_compliant, warning, unknown, updated_at)
+        SELECT a.owner_id,
+               a.provider,
+               COUNT(DISTINCT a.id),
+               SUM(CASE WHEN e.status = 'COMPLIANT' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN e.status = 'NON_COMPLIANT' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN e.status = 'WARNING' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN e.status = 'UNKNOWN' THEN 1 ELSE 0 END),
+               CURRENT_TIMESTAMP
+        FROM policy_evaluations e
+        JOIN cloud_accounts a ON e.account_id = a.id
+        WHERE a.owner_id IS NOT NULL
+        GROUP BY a.owner_id, a.provider
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_compliance_rollups_id'), table_name='compliance_rollups')
+    op.drop_table('compliance_rollups')
@@ -0,0 +1,48 @@
+"""add notification_counters table
+
+Revision ID: 6f2d9b4e8c13
+Revises: 9c3e5a1f7b24
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2d9b4e8c13'
+down_revision: Union[str, Sequence[str], None] = '9c3e5a1f7b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_counters',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+
+    # Backfill from existing notifications so the badge is correct immediately.
+    op.execute(
+        """
+        INSERT INTO notification_counters (owner_id, unread, total, updated_at)
+        SELECT owner_id,
+               SUM(CASE WHEN is_read THEN 0 ELSE 1 END),
+               COUNT(id),
+               CURRENT_TIMESTAMP
+        FROM notifications
+        GROUP BY owner_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_counters')
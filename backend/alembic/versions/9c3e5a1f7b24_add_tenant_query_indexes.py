@@ -0,0 +1,34 @@
+"""add tenant query indexes
+
+Revision ID: 9c3e5a1f7b24
+Revises: 5d1a8c7e4f92
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5a1f7b24'
+down_revision: Union[str, Sequence[str], None] = '5d1a8c7e4f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lookups by policy_id alone already use uq_policy_account (policy_id, account_id).
+    op.create_index('ix_cloud_accounts_owner_provider', 'cloud_accounts', ['owner_id', 'provider'], unique=False)
+    op.create_index('ix_policies_owner_provider', 'policies', ['owner_id', 'provider'], unique=False)
+    op.create_index('ix_policy_evaluations_account_status', 'policy_evaluations', ['account_id', 'status'], unique=False)
+    op.create_index('ix_notifications_owner_read', 'notifications', ['owner_id', 'is_read'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_owner_read', table_name='notifications')
+    op.drop_index('ix_policy_evaluations_account_status', table_name='policy_evaluations')
+    op.drop_index('ix_policies_owner_provider', table_name='policies')
+    op.drop_index('ix_cloud_accounts_owner_provider', table_name='cloud_accounts')
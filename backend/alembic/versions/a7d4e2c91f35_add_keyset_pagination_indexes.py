@@ -0,0 +1,35 @@
+"""add keyset pagination indexes
+
+Revision ID: a7d4e2c91f35
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d4e2c91f35'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a9d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_cloud_accounts_owner_created', 'cloud_accounts', ['owner_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_policies_owner_created', 'policies', ['owner_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_policy_evaluations_checked', 'policy_evaluations', ['last_checked_at', 'id'], unique=False)
+    op.create_index('ix_policy_evaluations_account_checked', 'policy_evaluations', ['account_id', 'last_checked_at', 'id'], unique=False)
+    op.create_index('ix_notifications_owner_created', 'notifications', ['owner_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_owner_created', table_name='notifications')
+    op.drop_index('ix_policy_evaluations_account_checked', table_name='policy_evaluations')
+    op.drop_index('ix_policy_evaluations_checked', table_name='policy_evaluations')
+    op.drop_index('ix_policies_owner_created', table_name='policies')
+    op.drop_index('ix_cloud_accounts_owner_created', table_name='cloud_accounts')
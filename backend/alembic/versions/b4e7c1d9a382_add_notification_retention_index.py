@@ -0,0 +1,28 @@
+"""add notification retention index
+
+Revision ID: b4e7c1d9a382
+Revises: 6f2d9b4e8c13
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e7c1d9a382'
+down_revision: Union[str, Sequence[str], None] = '6f2d9b4e8c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves the per-type expiry scan and the ACCOUNT_SYNC coalescing in app/retention.py.
+    op.create_index('ix_notifications_type_created', 'notifications', ['type', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_type_created', table_name='notifications')
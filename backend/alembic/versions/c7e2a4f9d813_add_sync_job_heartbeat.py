@@ -0,0 +1,30 @@
+"""add sync_jobs.heartbeat_at
+
+Revision ID: c7e2a4f9d813
+Revises: a1c9e5f3b706
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a4f9d813'
+down_revision: Union[str, Sequence[str], None] = 'a1c9e5f3b706'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('sync_jobs') as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sync_jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
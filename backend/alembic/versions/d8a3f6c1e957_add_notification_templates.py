@@ -0,0 +1,54 @@
+"""add notification_templates table
+
+Revision ID: d8a3f6c1e957
+Revises: b4e7c1d9a382
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3f6c1e957'
+down_revision: Union[str, Sequence[str], None] = 'b4e7c1d9a382'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The notificationtype enum type already exists on PostgreSQL (notifications).
+_types = ('POLICY_VIOLATION', 'ACCOUNT_SYNC', 'BUILD_COMPLETE', 'PROVISIONING', 'BROADCAST')
+type_enum = sa.Enum(*_types, name='notificationtype').with_variant(
+    postgresql.ENUM(*_types, name='notificationtype', create_type=False), 'postgresql'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('type', type_enum, nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('recipients', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.add_column(sa.Column('template_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_notifications_template_id', 'notification_templates', ['template_id'], ['id']
+        )
+        batch_op.create_index(batch_op.f('ix_notifications_template_id'), ['template_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notifications_template_id'))
+        batch_op.drop_constraint('fk_notifications_template_id', type_='foreignkey')
+        batch_op.drop_column('template_id')
+    op.drop_table('notification_templates')
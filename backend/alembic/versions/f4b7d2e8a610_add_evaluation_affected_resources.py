@@ -0,0 +1,28 @@
+"""add affected_resources to policy_evaluations
+
+Revision ID: f4b7d2e8a610
+Revises: e2a9c4d71b58
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b7d2e8a610'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c4d71b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('policy_evaluations', sa.Column('affected_resources', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('policy_evaluations', 'affected_resources')
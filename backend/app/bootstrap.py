@@ -0,0 +1,233 @@
+"""Schema creation, admin user and demo data: everything the API used to do
+on every startup.
+
+``STARTUP_MODE=full`` (the default outside serverless) still runs
+:func:`initialize` from ``main.on_startup``; with ``lazy`` (the default on
+Vercel/Lambda) startup does none of it and deployments run
+``python -m app.bootstrap init`` once instead.
+
+Schema work is keyed on a fingerprint of ``Base.metadata`` stored in
+``schema_meta``: when it matches, :func:`ensure_schema` is a single
+primary-key lookup instead of ``create_all`` plus reflection of every table.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import ForeignKeyConstraint, delete, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app import crud, models, notification_counts, rollups, schemas
+from app.config import running_serverless, settings
+from app.database import Base, SessionLocal, engine
+from app.security import password_manager
+
+
+SCHEMA_FINGERPRINT_KEY = "metadata_fingerprint"
+
+
+def startup_mode() -> str:
+    """``full`` or ``lazy``, resolving ``STARTUP_MODE=auto``."""
+    if settings.startup_mode != "auto":
+        return settings.startup_mode
+    return "lazy" if running_serverless() else "full"
+
+
+def create_admin_user(db: Session):
+    """Helper to ensure admin exists."""
+    try:
+        admin_email = "admin@cloudguard.dev"
+        from app.models import User
+        user = db.query(User).filter(User.email == admin_email).first()
+        
+        if not user:
+            print(f"Creating admin user: {admin_email}")
+
+            try:
+                user_in = schemas.UserCreate(
+                    email=admin_email, 
+                    password="changeme123", 
+                    full_name="Cloud Guard Admin"
+                )
+                crud.create_user(db, user_in, password_manager.hash)
+            except AttributeError:
+                hashed_pw = password_manager.hash("changeme123")
+                new_user = User(email=admin_email, hashed_password=hashed_pw, full_name="Cloud Guard Admin", is_active=True)
+                db.add(new_user)
+                db.commit()
+            print("✅ Admin user created successfully.")
+        else:
+            print("ℹ️  Admin user already exists.")
+    except Exception as e:
+        print(f"❌ Error creating admin user: {e}")
+
+
+def ensure_sqlite_schema() -> None:
+    """Backfill missing sqlite columns and indexes for local dev schema drift."""
+    if not engine.url.get_backend_name().startswith("sqlite"):
+        return
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    if not existing_tables:
+        return
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
+                )
+                # SQLite cannot add a NOT NULL column without a constant default;
+                # backfill existing rows so they hold no NULLs (keyset pagination relies on it).
+                default = column.default
+                if not column.nullable and default is not None and (default.is_scalar or default.is_callable):
+                    value = default.arg(None) if default.is_callable else default.arg
+                    conn.execute(table.update().where(column.is_(None)).values({column.name: value}))
+            # create_all skips tables that exist, so indexes added later need this too.
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column, index and constraint in ``Base.metadata``
+    as compiled for the current dialect."""
+    dialect = engine.dialect
+    lines = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda table: table.name):
+        lines.append(f"table {table.name}")
+        for column in table.columns:
+            lines.append(
+                f"column {column.name} {column.type.compile(dialect=dialect)}"
+                f" nullable={column.nullable} pk={column.primary_key}"
+            )
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            lines.append(f"index {index.name} {[column.name for column in index.columns]} unique={index.unique}")
+        constraints = []
+        for constraint in table.constraints:
+            line = f"{type(constraint).__name__} {constraint.name} {[column.name for column in constraint.columns]}"
+            if isinstance(constraint, ForeignKeyConstraint):
+                line += f" -> {[element.target_fullname for element in constraint.elements]}"
+            constraints.append(line)
+        lines.extend(sorted(constraints))
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _stored_fingerprint() -> Optional[str]:
+    table = models.SchemaMeta.__table__
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                select(table.c.value).where(table.c.key == SCHEMA_FINGERPRINT_KEY)
+            ).scalar_one_or_none()
+    except DBAPIError:  # schema_meta does not exist yet
+        return None
+
+
+def ensure_schema(*, force: bool = False) -> bool:
+    """Create missing tables and repair drift, unless the stored fingerprint
+    says ``Base.metadata`` is unchanged since the last run (one primary-key
+    lookup instead of reflecting every table). Returns whether it ran."""
+    fingerprint = schema_fingerprint()
+    if not force and _stored_fingerprint() == fingerprint:
+        return False
+
+    Base.metadata.create_all(bind=engine)
+    ensure_sqlite_schema()
+    table = models.SchemaMeta.__table__
+    with engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.key == SCHEMA_FINGERPRINT_KEY))
+        conn.execute(
+            table.insert().values(key=SCHEMA_FINGERPRINT_KEY, value=fingerprint, updated_at=datetime.utcnow())
+        )
+    return True
+
+
+# ============ DEMO SEED FUNCTION - REMOVE THIS FUNCTION FOR PRODUCTION ============
+def seed_demo_data(db: Session):
+    """Seed demo data from seed.py"""
+    try:
+        from app.models import CloudAccount, User
+        
+        # Check if demo data already exists by checking for cloud accounts
+        account_count = db.query(CloudAccount).count()
+        if account_count >= 3:  # We create 3 accounts
+            print("ℹ️  Demo data already seeded.")
+            return
+        
+        print("🌱 Seeding demo data...")
+        
+        from app.seed import load_demo  # deferred: only needed when seeding
+        
+        admin = db.query(User).filter(User.email == "admin@cloudguard.dev").first()
+        if admin is None:
+            print("❌ Admin user missing, skipping demo data.")
+            return
+        counts = load_demo(db, owner_id=admin.id)
+        for table, count in counts.items():
+            print(f"✅ Created {count} {table.replace('_', ' ')}")
+        
+        print("✅ Demo data seeded successfully!")
+        
+    except Exception as e:
+        print(f"❌ Error seeding demo data: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+# ===================================================================================
+# ===================================================================================
+
+
+def _report_schema(changed: bool) -> None:
+    print("📊 Database tables created." if changed else "📊 Database schema unchanged (fingerprint match).")
+
+
+def initialize(*, seed: bool | None = None, force_schema: bool = False) -> None:
+    """Create tables, the admin user and backfills, then seed demo data when
+    ``seed`` (default ``DEMO_SEED``) is set. Safe to run repeatedly."""
+    _report_schema(ensure_schema(force=force_schema))
+
+    db = SessionLocal()
+    try:
+        create_admin_user(db)
+        failed = crud.fail_stale_sync_jobs(db)
+        if failed:
+            print(f"⚠️  Marked {failed} orphaned sync jobs as failed.")
+        rollups.ensure_backfilled(db)
+        notification_counts.ensure_backfilled(db)
+
+        # ============ DEMO SEED - REMOVE THESE 2 LINES FOR PRODUCTION ============
+        if settings.demo_seed if seed is None else seed:
+            seed_demo_data(db)
+        # ==========================================================================
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create the schema, admin user and demo data")
+    parser.add_argument("command", choices=["init", "schema"])
+    parser.add_argument("--force", action="store_true", help="Check the schema even if the fingerprint matches")
+    seed = parser.add_mutually_exclusive_group()
+    seed.add_argument("--seed", dest="seed", action="store_true", default=None, help="Load demo data")
+    seed.add_argument("--no-seed", dest="seed", action="store_false", help="Skip demo data")
+    args = parser.parse_args()
+
+    if args.command == "schema":
+        _report_schema(ensure_schema(force=args.force))
+        return
+    initialize(seed=args.seed, force_schema=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Small in-process caches shared by the API workers."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` shortens (never extends) the cache's own TTL."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Serialized DashboardSnapshot bodies keyed by owner id: (etag, body).
+dashboard_cache = TTLCache(
+    maxsize=settings.dashboard_cache_max_entries,
+    ttl=settings.dashboard_cache_ttl_seconds,
+)
+
+
+def invalidate_dashboard(owner_id: Optional[int]) -> None:
+    if owner_id is not None:
+        dashboard_cache.pop(owner_id)
+
+
+# Detached User snapshots keyed by user id, used by deps.get_current_user.
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_max_entries,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+def invalidate_principal(user_id: Optional[int]) -> None:
+    if user_id is not None:
+        principal_cache.pop(user_id)
+
+
+# Compiled policy_engine matchers keyed by Policy.content_hash. Entries never
+# go stale (the key is the content), so the TTL only bounds memory held by
+# documents nobody scans any more.
+compiled_policy_cache = TTLCache(
+    maxsize=settings.policy_cache_max_entries,
+    ttl=settings.policy_cache_ttl_seconds,
+)
+
+
+def invalidate_compiled_policy(content_hash: Optional[str]) -> None:
+    if content_hash is not None:
+        compiled_policy_cache.pop(content_hash)
+
+
+# User ids that committed a write within READ_YOUR_WRITES_SECONDS; their
+# reads stay on the primary until the entry expires (see deps.get_read_db).
+recent_writers = TTLCache(
+    maxsize=settings.principal_cache_max_entries,
+    ttl=settings.read_your_writes_seconds,
+)
+
+
+def mark_recent_write(user_id: Optional[int]) -> None:
+    if user_id is not None:
+        recent_writers.set(user_id, True)
+
+
+def wrote_recently(user_id: Optional[int]) -> bool:
+    return recent_writers.get(user_id, False)
@@ -0,0 +1,207 @@
+"""Pluggable provider collectors used by the account sync engine.
+
+A collector talks to one cloud provider and either reports a
+:class:`Finding` per control it checked, or returns raw resource records
+from :meth:`Collector.collect_resources` for :mod:`app.policy_engine` to
+evaluate against each policy's ``policy_content``. Register real
+implementations with :func:`register_collector`; :class:`FakeCollector`
+produces deterministic data locally so the sync pipeline can run without
+cloud credentials; it is only registered with ``SYNC_FAKE_PROVIDERS=true``
+and never serves an account that has credentials.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from app import models
+
+
+@dataclass(frozen=True)
+class Finding:
+    control_id: str
+    status: models.ComplianceStatus
+    resource_id: Optional[str] = None
+    findings: Optional[str] = None
+    affected_resources: int = 0
+
+
+@dataclass(frozen=True)
+class PolicyTarget:
+    """The parts of a ``Policy`` a collector needs, detached from the session."""
+    id: int
+    control_id: str
+    name: str
+    category: str
+
+
+class CollectorError(RuntimeError):
+    """Raised by collectors when the provider cannot be reached or authenticated."""
+
+
+class NoCollectorError(LookupError):
+    """No collector may sync the account: none is registered for its provider,
+    or only the fake one is and the account has credentials."""
+
+
+class Collector(ABC):
+    provider: models.CloudProvider
+
+    @abstractmethod
+    def collect(self, account: models.CloudAccount, policies: list[PolicyTarget]) -> Iterable[Finding]:
+        """One finding per policy the provider could check."""
+
+    def collect_resources(self, account: models.CloudAccount) -> Optional[Iterable[dict[str, Any]]]:
+        """Resource records for local policy evaluation, or ``None`` if unsupported."""
+        return None
+
+
+class FakeCollector(Collector):
+    """Deterministic local stand-in for a provider API.
+
+    Results depend only on the account's external id and each control id, so
+    repeated syncs are stable. ``delay`` sleeps per finding to mimic API
+    latency and ``fail`` raises :class:`CollectorError` before any finding.
+    """
+
+    STATUS_WEIGHTS = (
+        (models.ComplianceStatus.COMPLIANT, 0.6),
+        (models.ComplianceStatus.NON_COMPLIANT, 0.25),
+        (models.ComplianceStatus.WARNING, 0.1),
+        (models.ComplianceStatus.UNKNOWN, 0.05),
+    )
+
+    def __init__(
+        self,
+        provider: models.CloudProvider,
+        *,
+        delay: float = 0.0,
+        fail: bool = False,
+        resources: int = 50,
+    ) -> None:
+        self.provider = provider
+        self.delay = delay
+        self.fail = fail
+        self.resources = resources
+
+    def collect(self, account: models.CloudAccount, policies: list[PolicyTarget]) -> Iterator[Finding]:
+        if self.fail:
+            raise CollectorError(f"Unable to reach {self.provider.value} for {account.external_id}")
+        statuses = [status for status, _ in self.STATUS_WEIGHTS]
+        weights = [weight for _, weight in self.STATUS_WEIGHTS]
+        for policy in policies:
+            rng = random.Random(f"{account.external_id}:{policy.control_id}")
+            status = rng.choices(statuses, weights)[0]
+            if self.delay:
+                time.sleep(self.delay)
+            yield Finding(
+                control_id=policy.control_id,
+                status=status,
+                resource_id=f"{account.external_id}/{policy.category.lower().replace(' ', '-')}",
+                findings=f"{policy.name}: {status.value.replace('_', ' ')} (simulated scan)",
+            )
+
+    def collect_resources(self, account: models.CloudAccount) -> Iterator[dict[str, Any]]:
+        if self.fail:
+            raise CollectorError(f"Unable to reach {self.provider.value} for {account.external_id}")
+        rng = random.Random(f"{account.external_id}:resources")
+        make = {
+            models.CloudProvider.AWS: self._aws_resource,
+            models.CloudProvider.AZURE: self._azure_resource,
+            models.CloudProvider.GCP: self._gcp_resource,
+        }[self.provider]
+        for index in range(self.resources):
+            if self.delay:
+                time.sleep(self.delay)
+            yield make(account.external_id, index, rng)
+
+    @staticmethod
+    def _aws_resource(external_id: str, index: int, rng: random.Random) -> dict[str, Any]:
+        if index % 2:
+            return {
+                "id": f"arn:aws:iam::{external_id}:user/user-{index}",
+                "type": "AWS::IAM::User",
+                "action": rng.choice(["iam:GetUser", "ec2:RunInstances", "s3:GetObject"]),
+                "resource": f"arn:aws:iam::{external_id}:user/user-{index}",
+                "aws:MultiFactorAuthPresent": rng.random() < 0.8,
+            }
+        return {
+            "id": f"arn:aws:s3:::bucket-{external_id}-{index}",
+            "type": "AWS::S3::Bucket",
+            "action": rng.choice(["s3:PutBucketAcl", "s3:PutObjectAcl"]),
+            "resource": f"arn:aws:s3:::bucket-{external_id}-{index}",
+            "aws:MultiFactorAuthPresent": True,
+            "s3:x-amz-acl": rng.choices(["private", "public-read", "bucket-owner-full-control"], [0.7, 0.1, 0.2])[0],
+        }
+
+    @staticmethod
+    def _azure_resource(external_id: str, index: int, rng: random.Random) -> dict[str, Any]:
+        resource_id = f"/subscriptions/{external_id}/resources/{index}"
+        if index % 5 == 0:
+            return {
+                "id": resource_id,
+                "type": "Microsoft.Security/secureScores",
+                "Microsoft.Security/secureScores/score.percentage": rng.randint(40, 100),
+            }
+        return {
+            "id": resource_id,
+            "type": rng.choice(["Microsoft.Compute/virtualMachines", "Microsoft.Storage/storageAccounts"]),
+            "location": rng.choice(["eastus", "westeurope", "uksouth"]),
+        }
+
+    @staticmethod
+    def _gcp_resource(external_id: str, index: int, rng: random.Random) -> dict[str, Any]:
+        return {
+            "id": f"projects/{external_id}-{index}",
+            "type": "cloudresourcemanager.googleapis.com/Project",
+            "iam.allowedPolicyMemberDomains": rng.choices(["C0abc1234", "C0def5678", "C0ext9999"], [0.5, 0.4, 0.1])[0],
+        }
+
+
+_registry: dict[models.CloudProvider, Collector] = {}
+_registry_lock = threading.Lock()
+
+
+def register_collector(collector: Collector) -> None:
+    with _registry_lock:
+        _registry[collector.provider] = collector
+
+
+def unregister_collector(provider: models.CloudProvider) -> None:
+    with _registry_lock:
+        _registry.pop(provider, None)
+
+
+def has_credentials(account: models.CloudAccount) -> bool:
+    return bool(account.credential or account.service_email or account.tenant_id)
+
+
+def get_collector(
+    provider: models.CloudProvider, account: Optional[models.CloudAccount] = None
+) -> Optional[Collector]:
+    """The collector registered for ``provider``. A :class:`FakeCollector` is
+    not returned for an ``account`` with credentials, so simulated findings
+    never overwrite a real account's evaluations."""
+    with _registry_lock:
+        collector = _registry.get(models.CloudProvider(provider))
+    if isinstance(collector, FakeCollector) and account is not None and has_credentials(account):
+        return None
+    return collector
+
+
+def require_collector(account: models.CloudAccount) -> Collector:
+    """:func:`get_collector` for ``account``; raises :class:`NoCollectorError` if there is none."""
+    collector = get_collector(account.provider, account)
+    if collector is None:
+        scope = " accounts with credentials" if has_credentials(account) else " accounts"
+        raise NoCollectorError(f"No collector configured for {models.CloudProvider(account.provider).value}{scope}")
+    return collector
+
+
+def register_fake_collectors() -> None:
+    for provider in models.CloudProvider:
+        register_collector(FakeCollector(provider))
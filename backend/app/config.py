@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+from typing import Optional
+
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 
@@ -8,14 +11,87 @@ def _default_cors() -> list[str]:
     return ["http://localhost:5173"]
 
 
+def running_serverless() -> bool:
+    """True on Vercel / AWS Lambda, where every cold start pays for process setup."""
+    return bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
+
+def _default_hash_workers() -> int:
+    # Lambda has no /dev/shm for multiprocessing locks, and a frozen function
+    # gains nothing from extra processes: hash on a thread there.
+    return 0 if running_serverless() else 2
+
+
 class Settings(BaseSettings):
     app_name: str = Field(default="Cloud Guard Platform", alias="APP_NAME")
     database_url: str = Field(default="sqlite:///./cloud_guard.db", alias="DATABASE_URL")
+    database_read_url: Optional[str] = Field(default=None, alias="DATABASE_READ_URL")
+    read_your_writes_seconds: float = Field(default=5.0, alias="READ_YOUR_WRITES_SECONDS")
     demo_seed: bool = Field(default=True, alias="DEMO_SEED")
+    startup_mode: str = Field(default="auto", alias="STARTUP_MODE", pattern="^(auto|full|lazy)$")
     cors_origins: list[str] = Field(default_factory=_default_cors, alias="CORS_ORIGINS")
     jwt_secret: str = Field(default="change-me", alias="JWT_SECRET")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=60, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
+    password_scheme: str = Field(default="argon2", alias="PASSWORD_SCHEME", pattern="^(argon2|bcrypt)$")
+    argon2_time_cost: int = Field(default=2, alias="ARGON2_TIME_COST")
+    argon2_memory_cost_kib: int = Field(default=19456, alias="ARGON2_MEMORY_COST_KIB")
+    argon2_parallelism: int = Field(default=1, alias="ARGON2_PARALLELISM")
+    bcrypt_rounds: int = Field(default=12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default_factory=_default_hash_workers, alias="PASSWORD_HASH_WORKERS")
+    rate_limit_enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
+    rate_limit_store: str = Field(default="memory", alias="RATE_LIMIT_STORE", pattern="^(memory|redis|local-redis)$")
+    redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
+    rate_limit_trust_forwarded: bool = Field(default=False, alias="RATE_LIMIT_TRUST_FORWARDED")
+    login_ip_burst: float = Field(default=20.0, alias="LOGIN_IP_BURST")
+    login_ip_per_minute: float = Field(default=10.0, alias="LOGIN_IP_PER_MINUTE")
+    login_email_burst: float = Field(default=5.0, alias="LOGIN_EMAIL_BURST")
+    login_email_per_minute: float = Field(default=2.0, alias="LOGIN_EMAIL_PER_MINUTE")
+    login_failure_window_seconds: float = Field(default=900.0, alias="LOGIN_FAILURE_WINDOW_SECONDS")
+    login_max_failures_per_ip: int = Field(default=50, alias="LOGIN_MAX_FAILURES_PER_IP")
+    login_max_failures_per_email: int = Field(default=10, alias="LOGIN_MAX_FAILURES_PER_EMAIL")
+    db_pool_mode: str = Field(default="auto", alias="DB_POOL_MODE", pattern="^(auto|queue|null)$")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30.0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_external_pooler: bool = Field(default=False, alias="DB_EXTERNAL_POOLER")
+    sqlite_journal_mode: str = Field(default="WAL", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size: int = Field(default=268435456, alias="SQLITE_MMAP_SIZE")
+    dashboard_cache_ttl_seconds: float = Field(default=30.0, alias="DASHBOARD_CACHE_TTL_SECONDS")
+    dashboard_cache_max_entries: int = Field(default=1024, alias="DASHBOARD_CACHE_MAX_ENTRIES")
+    principal_cache_ttl_seconds: float = Field(default=60.0, alias="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_max_entries: int = Field(default=4096, alias="PRINCIPAL_CACHE_MAX_ENTRIES")
+    policy_cache_ttl_seconds: float = Field(default=3600.0, alias="POLICY_CACHE_TTL_SECONDS")
+    policy_cache_max_entries: int = Field(default=512, alias="POLICY_CACHE_MAX_ENTRIES")
+    notification_ttl_days: str = Field(
+        default="account_sync=14,provisioning=30,build_complete=30,broadcast=90,policy_violation=180",
+        alias="NOTIFICATION_TTL_DAYS",
+    )
+    notification_coalesce_after_hours: float = Field(default=24.0, alias="NOTIFICATION_COALESCE_AFTER_HOURS")
+    retention_chunk_size: int = Field(default=1000, alias="RETENTION_CHUNK_SIZE")
+    retention_archive_dir: Optional[str] = Field(default=None, alias="RETENTION_ARCHIVE_DIR")
+    fanout_batch_size: int = Field(default=1000, alias="FANOUT_BATCH_SIZE")
+    fanout_template_min_recipients: int = Field(default=100, alias="FANOUT_TEMPLATE_MIN_RECIPIENTS")
+    export_batch_size: int = Field(default=1000, alias="EXPORT_BATCH_SIZE")
+    bulk_ingest_batch_size: int = Field(default=500, alias="BULK_INGEST_BATCH_SIZE")
+    bulk_ingest_max_items: int = Field(default=50000, alias="BULK_INGEST_MAX_ITEMS")
+    sync_workers: int = Field(default=4, alias="SYNC_WORKERS")
+    sync_batch_size: int = Field(default=500, alias="SYNC_BATCH_SIZE")
+    sync_job_stale_seconds: float = Field(default=600.0, alias="SYNC_JOB_STALE_SECONDS")
+    sync_fake_providers: bool = Field(default=False, alias="SYNC_FAKE_PROVIDERS")
+    scheduler_enabled: bool = Field(default=False, alias="SCHEDULER_ENABLED")
+    scheduler_tick_seconds: float = Field(default=5.0, alias="SCHEDULER_TICK_SECONDS")
+    scheduler_refresh_seconds: float = Field(default=60.0, alias="SCHEDULER_REFRESH_SECONDS")
+    scheduler_max_concurrency: int = Field(default=8, alias="SCHEDULER_MAX_CONCURRENCY")
+    scheduler_provider_rate_per_minute: float = Field(default=30.0, alias="SCHEDULER_PROVIDER_RATE_PER_MINUTE")
+    scheduler_max_jitter_seconds: float = Field(default=300.0, alias="SCHEDULER_MAX_JITTER_SECONDS")
+    scheduler_lease_seconds: float = Field(default=30.0, alias="SCHEDULER_LEASE_SECONDS")
+    query_profiling: bool = Field(default=False, alias="QUERY_PROFILING")
+    query_profiling_warn_queries: int = Field(default=20, alias="QUERY_PROFILING_WARN_QUERIES")
+    query_profiling_repeat_threshold: int = Field(default=5, alias="QUERY_PROFILING_REPEAT_THRESHOLD")
 
     model_config = {
         "env_file": ".env",
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+import hashlib
+from typing import Iterable, Iterator, Optional
 
 from datetime import datetime, timedelta, date
 
-from sqlalchemy import case, func, select
+from sqlalchemy import case, func, select, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
-from app import models, schemas
+from app import fanout, models, notification_counts, policy_engine, rollups, schemas
+from app.config import settings
+from app.database import note_write_owners, upsert_insert
+from app.events import publish_notifications
+from app.cache import dashboard_cache, invalidate_compiled_policy, invalidate_dashboard, wrote_recently
+from app.pagination import Page, paginate
 
 
 # -- User helpers -------------------------------------------------------------
@@ -37,6 +43,18 @@ def authenticate_user(db: Session, *, email: str, password: str, password_verifi
     return None
 
 
+def update_password_hash(db: Session, user: models.User, hashed_password: str) -> None:
+    """Replace ``user``'s stored hash, e.g. after a login with an outdated scheme or cost."""
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+def revoke_user_tokens(db: Session, user: models.User) -> None:
+    """Invalidate every access token issued to ``user`` so far."""
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+
+
 # -- Account helpers ---------------------------------------------------------
 def create_account(db: Session, account_in: schemas.AccountCreate) -> models.CloudAccount:
     account = models.CloudAccount(**account_in.model_dump())
@@ -69,16 +87,19 @@ def log_account_provisioning(db: Session, account: models.CloudAccount) -> None:
     ]
 
     now = datetime.utcnow()
-    for index, (title, message) in enumerate(steps):
-        notification = models.Notification(
-            title=title,
-            message=message,
-            type=models.NotificationType.PROVISIONING,
-            created_at=now + timedelta(seconds=index * 2),
-        )
-        db.add(notification)
-
-    db.commit()
+    fanout.insert_notifications(
+        db,
+        [
+            {
+                "title": title,
+                "message": message,
+                "type": models.NotificationType.PROVISIONING,
+                "created_at": now + timedelta(seconds=index * 2),
+                "owner_id": account.owner_id,
+            }
+            for index, (title, message) in enumerate(steps)
+        ],
+    )
 
 
 def get_accounts(db: Session) -> list[models.CloudAccount]:
@@ -189,33 +210,31 @@ def update_evaluation(
 
 
 def build_dashboard_snapshot(db: Session, current_user: models.User) -> schemas.DashboardSnapshot:
-    """Build dashboard snapshot for current user's accounts only."""
-    
-    # Total compliance summary - filter by user's accounts
-    total_stmt = (
-        select(
-            func.count(models.PolicyEvaluation.id),
-            func.sum(
-                case((models.PolicyEvaluation.status == models.ComplianceStatus.COMPLIANT, 1), else_=0)
-            ),
-            func.sum(
-                case((models.PolicyEvaluation.status == models.ComplianceStatus.NON_COMPLIANT, 1), else_=0)
-            ),
-            func.sum(
-                case((models.PolicyEvaluation.status == models.ComplianceStatus.UNKNOWN, 1), else_=0)
-            ),
-        )
-        .select_from(models.PolicyEvaluation)
-        .join(models.CloudAccount, models.PolicyEvaluation.account_id == models.CloudAccount.id)
-        .where(models.CloudAccount.owner_id == current_user.id)  # Filter by user
-    )
-    
-    total_result = db.execute(total_stmt).first()
+    """Build dashboard snapshot for current user's accounts only.
+
+    Served from the maintained ``compliance_rollups`` rows (one per provider)
+    rather than aggregating ``policy_evaluations`` on every request.
+    """
+    total_policies = compliant = non_compliant = unknown = 0
+    providers: list[schemas.ProviderBreakdown] = []
 
-    total_policies = total_result[0] or 0
-    compliant = total_result[1] or 0
-    non_compliant = total_result[2] or 0
-    unknown = total_result[3] or 0
+    for rollup in rollups.get_rollups(db, current_user.id):
+        evaluations = rollup.compliant + rollup.non_compliant + rollup.warning + rollup.unknown
+        if not evaluations:
+            continue
+        total_policies += evaluations
+        compliant += rollup.compliant
+        non_compliant += rollup.non_compliant
+        unknown += rollup.unknown
+        providers.append(
+            schemas.ProviderBreakdown(
+                provider=rollup.provider,
+                accounts=rollup.accounts,
+                compliant=rollup.compliant,
+                non_compliant=rollup.non_compliant,
+                unknown=rollup.unknown,
+            )
+        )
 
     summary = schemas.ComplianceSummary(
         total_policies=total_policies,
@@ -223,41 +242,24 @@ def build_dashboard_snapshot(db: Session, current_user: models.User) -> schemas.
         non_compliant=non_compliant,
         unknown=unknown,
     )
+    return schemas.DashboardSnapshot(summary=summary, providers=providers)
 
-    # Provider breakdown - filter by user's accounts
-    provider_stmt = (
-        select(
-            models.CloudAccount.provider,
-            func.count(func.distinct(models.CloudAccount.id)),
-            func.sum(
-                case((models.PolicyEvaluation.status == models.ComplianceStatus.COMPLIANT, 1), else_=0)
-            ),
-            func.sum(
-                case((models.PolicyEvaluation.status == models.ComplianceStatus.NON_COMPLIANT, 1), else_=0)
-            ),
-            func.sum(
-                case((models.PolicyEvaluation.status == models.ComplianceStatus.UNKNOWN, 1), else_=0)
-            ),
-        )
-        .select_from(models.PolicyEvaluation)
-        .join(models.PolicyEvaluation.account)
-        .where(models.CloudAccount.owner_id == current_user.id)  # Filter by user
-        .group_by(models.CloudAccount.provider)
-    )
-
-    providers: list[schemas.ProviderBreakdown] = []
-    for provider, accounts, ok, issues, pending in db.execute(provider_stmt).all():
-        providers.append(
-            schemas.ProviderBreakdown(
-                provider=provider,
-                accounts=accounts or 0,
-                compliant=ok or 0,
-                non_compliant=issues or 0,
-                unknown=pending or 0,
-            )
-        )
 
-    return schemas.DashboardSnapshot(summary=summary, providers=providers)
+def get_dashboard_body(db: Session, current_user: models.User) -> tuple[str, bytes]:
+    """Return ``(etag, json_body)`` for the user's snapshot, served from the cache when fresh."""
+    cached = dashboard_cache.get(current_user.id)
+    if cached is not None:
+        return cached
+    body = build_dashboard_snapshot(db, current_user).model_dump_json().encode("utf-8")
+    entry = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+    if getattr(db, "reads_replica", False):
+        # The replica may lag a write made since routing (or by another
+        # worker): never cache that past the read-your-writes window.
+        if not wrote_recently(current_user.id):
+            dashboard_cache.set(current_user.id, entry, ttl=settings.read_your_writes_seconds)
+    else:
+        dashboard_cache.set(current_user.id, entry)
+    return entry
 
 
 # -- Notification helpers ----------------------------------------------------
@@ -298,29 +300,32 @@ def mark_all_notifications_read(db: Session) -> int:
 
 # -- Utility helpers ---------------------------------------------------------
 def seed_demo_data(db: Session, *, dataset: Iterable[dict]) -> None:
-    for record in dataset:
-        model = record["model"]
-        payload = record["data"]
-        try:
-            instance = model(**payload)
-            db.add(instance)
-            db.commit()
-        except IntegrityError:
-            db.rollback()
+    from app.seed import insert_records  # deferred: only needed when seeding
+
+    insert_records(db, dataset)
 
 
 # ===========================
 # Policy CRUD Operations
 # ===========================
 
-def get_policies(db: Session, current_user: models.User, skip: int = 0, limit: int = 100) -> list[models.Policy]:
-    """Get all policies for current user with optional pagination."""
-    return (
-        db.query(models.Policy)
-        .filter(models.Policy.owner_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+def get_policies(
+    db: Session,
+    current_user: models.User,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Get one page of the current user's policies, oldest first."""
+    query = db.query(models.Policy).filter(models.Policy.owner_id == current_user.id)
+    return paginate(
+        query,
+        models.Policy.created_at,
+        models.Policy.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        descending=False,
     )
 
 
@@ -362,6 +367,7 @@ def create_policy(db: Session, current_user: models.User, policy_in: schemas.Pol
         policy_data["last_reviewed"] = date.fromisoformat(policy_data["last_reviewed"])
     
     db_policy = models.Policy(**policy_data)
+    db_policy.content_hash = policy_engine.content_hash(db_policy.policy_content)
     db.add(db_policy)
     db.commit()
     db.refresh(db_policy)
@@ -389,8 +395,12 @@ def update_policy(
     for field, value in update_data.items():
         setattr(db_policy, field, value)
     
+    previous_hash = db_policy.content_hash
+    db_policy.content_hash = policy_engine.content_hash(db_policy.policy_content)
     db_policy.updated_at = datetime.utcnow()
     db.commit()
+    if previous_hash != db_policy.content_hash:
+        invalidate_compiled_policy(previous_hash)
     db.refresh(db_policy)
     return db_policy
 
@@ -401,8 +411,10 @@ def delete_policy(db: Session, current_user: models.User, policy_id: int) -> boo
     if not db_policy:
         return False
     
+    rollups.on_policy_deleted(db, db_policy.id)
     db.delete(db_policy)
     db.commit()
+    invalidate_dashboard(current_user.id)
     return True
 
 
@@ -410,9 +422,15 @@ def delete_policy(db: Session, current_user: models.User, policy_id: int) -> boo
 # Policy Evaluation CRUD Operations
 # ===========================
 
-def get_evaluations_list(db: Session, current_user: models.User, skip: int = 0, limit: int = 1000) -> list[models.PolicyEvaluation]:
-    """Get all policy evaluations with optional pagination for current user's accounts only."""
-    return (
+def get_evaluations_list(
+    db: Session,
+    current_user: models.User,
+    skip: int = 0,
+    limit: int = 1000,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Get one page of policy evaluations for current user's accounts, most recently checked first."""
+    query = (
         db.query(models.PolicyEvaluation)
         .join(models.CloudAccount, models.PolicyEvaluation.account_id == models.CloudAccount.id)
         .options(
@@ -420,10 +438,67 @@ def get_evaluations_list(db: Session, current_user: models.User, skip: int = 0,
             selectinload(models.PolicyEvaluation.account),  # Changed from joinedload
         )
         .filter(models.CloudAccount.owner_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    return paginate(
+        query,
+        models.PolicyEvaluation.last_checked_at,
+        models.PolicyEvaluation.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+EXPORT_COLUMNS = (
+    "id",
+    "policy_id",
+    "policy_name",
+    "control_id",
+    "provider",
+    "account_id",
+    "account_name",
+    "external_id",
+    "status",
+    "resource_id",
+    "findings",
+    "last_checked_at",
+)
+
+
+def iter_evaluation_export_rows(db: Session, owner_id: int, *, batch_size: int = 1000) -> Iterator[dict]:
+    """Yield the owner's evaluations as flat dicts (keys = ``EXPORT_COLUMNS``).
+
+    Selects plain columns and fetches ``batch_size`` rows at a time (a
+    server-side cursor on PostgreSQL), so memory stays constant however
+    many evaluations the tenant has.
+    """
+    stmt = (
+        select(
+            models.PolicyEvaluation.id,
+            models.PolicyEvaluation.policy_id,
+            models.Policy.name,
+            models.Policy.control_id,
+            models.CloudAccount.provider,
+            models.PolicyEvaluation.account_id,
+            models.CloudAccount.display_name,
+            models.CloudAccount.external_id,
+            models.PolicyEvaluation.status,
+            models.PolicyEvaluation.resource_id,
+            models.PolicyEvaluation.findings,
+            models.PolicyEvaluation.last_checked_at,
+        )
+        .join(models.CloudAccount, models.PolicyEvaluation.account_id == models.CloudAccount.id)
+        .join(models.Policy, models.PolicyEvaluation.policy_id == models.Policy.id)
+        .where(models.CloudAccount.owner_id == owner_id)
+        .order_by(models.PolicyEvaluation.last_checked_at.desc(), models.PolicyEvaluation.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    for row in db.execute(stmt):
+        record = dict(zip(EXPORT_COLUMNS, row))
+        record["provider"] = record["provider"].value
+        record["status"] = record["status"].value
+        record["last_checked_at"] = record["last_checked_at"].isoformat() if record["last_checked_at"] else None
+        yield record
 
 
 def get_evaluation(db: Session, current_user: models.User, evaluation_id: int) -> Optional[models.PolicyEvaluation]:
@@ -489,11 +564,179 @@ def create_evaluation(
     
     db_evaluation = models.PolicyEvaluation(**evaluation_in.model_dump())
     db.add(db_evaluation)
+    db.flush()
+    rollups.on_evaluation_created(db, account, db_evaluation.status)
     db.commit()
+    invalidate_dashboard(account.owner_id)
     db.refresh(db_evaluation)
     return db_evaluation
 
 
+def bulk_upsert_evaluations(
+    db: Session,
+    owner_id: int,
+    items: list[schemas.EvaluationCreate],
+    *,
+    batch_size: int = 500,
+    positions: Optional[list[int]] = None,
+) -> list[schemas.BulkEvaluationResult]:
+    """Insert or update many evaluations, returning one result per item (same order).
+
+    Ownership is checked once per distinct account/policy, and each batch is a
+    single ``INSERT ... ON CONFLICT (policy_id, account_id) DO UPDATE``. When
+    the same pair appears more than once, the last occurrence wins.
+    ``positions`` gives each item's index in the caller's request (default:
+    its index in ``items``); result ``index`` and details refer to those.
+    """
+    results: list[Optional[schemas.BulkEvaluationResult]] = [None] * len(items)
+    note_write_owners(db, [owner_id])
+    positions = positions if positions is not None else list(range(len(items)))
+
+    account_ids = {item.account_id for item in items}
+    policy_ids = {item.policy_id for item in items}
+    accounts = {
+        account.id: account
+        for account in db.execute(
+            select(models.CloudAccount).where(
+                models.CloudAccount.id.in_(account_ids),
+                models.CloudAccount.owner_id == owner_id,
+            )
+        ).scalars()
+    }
+    owned_policies = set(
+        db.execute(
+            select(models.Policy.id).where(
+                models.Policy.id.in_(policy_ids),
+                models.Policy.owner_id == owner_id,
+            )
+        ).scalars()
+    )
+
+    latest: dict[tuple[int, int], int] = {}
+    for index, item in enumerate(items):
+        if item.account_id not in accounts:
+            detail = f"Account {item.account_id} not found or not owned by user"
+        elif item.policy_id not in owned_policies:
+            detail = f"Policy {item.policy_id} not found or not owned by user"
+        else:
+            key = (item.policy_id, item.account_id)
+            if key in latest:
+                results[latest[key]] = schemas.BulkEvaluationResult(
+                    index=positions[latest[key]], status="skipped", detail=f"Superseded by item {positions[index]}"
+                )
+            latest[key] = index
+            continue
+        results[index] = schemas.BulkEvaluationResult(index=positions[index], status="error", detail=detail)
+
+    table = models.PolicyEvaluation.__table__
+    insert = upsert_insert(db.get_bind())
+    pending = sorted(latest.items(), key=lambda entry: entry[1])
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        pairs = [key for key, _ in batch]
+        batch_accounts = {account_id for _, account_id in pairs}
+        rollups.lock_accounts(db, batch_accounts)
+
+        existing = {
+            (row.policy_id, row.account_id): row.status
+            for row in db.execute(
+                select(table.c.policy_id, table.c.account_id, table.c.status).where(
+                    tuple_(table.c.policy_id, table.c.account_id).in_(pairs)
+                )
+            )
+        }
+        populated_accounts = set(
+            db.execute(
+                select(table.c.account_id).where(table.c.account_id.in_(batch_accounts)).distinct()
+            ).scalars()
+        )
+
+        now = datetime.utcnow()
+        rows = []
+        for _, index in batch:
+            item = items[index]
+            rows.append(
+                {
+                    "policy_id": item.policy_id,
+                    "account_id": item.account_id,
+                    "status": models.ComplianceStatus(item.status),
+                    "findings": item.findings,
+                    "resource_id": item.resource_id,
+                    "affected_resources": item.affected_resources,
+                    "last_checked_at": now,
+                }
+            )
+
+        if insert is not None:
+            stmt = insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.policy_id, table.c.account_id],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in ("status", "findings", "resource_id", "affected_resources", "last_checked_at")
+                },
+            )
+            db.execute(stmt)
+        else:
+            for row in rows:
+                key = (row["policy_id"], row["account_id"])
+                if key in existing:
+                    db.execute(
+                        table.update()
+                        .where(table.c.policy_id == key[0], table.c.account_id == key[1])
+                        .values(**row)
+                    )
+                else:
+                    db.execute(table.insert().values(**row))
+
+        ids = {
+            (row.policy_id, row.account_id): row.id
+            for row in db.execute(
+                select(table.c.id, table.c.policy_id, table.c.account_id).where(
+                    tuple_(table.c.policy_id, table.c.account_id).in_(pairs)
+                )
+            )
+        }
+
+        changes = []
+        first_evaluation_accounts = set()
+        for key, index in batch:
+            new_status = models.ComplianceStatus(items[index].status)
+            old_status = existing.get(key)
+            changes.append((key[1], old_status, new_status))
+            if old_status is None and key[1] not in populated_accounts:
+                first_evaluation_accounts.add(key[1])
+            results[index] = schemas.BulkEvaluationResult(
+                index=positions[index],
+                status="updated" if old_status is not None else "created",
+                id=ids.get(key),
+            )
+        rollups.on_evaluations_upserted(db, accounts, changes, first_evaluation_accounts)
+        db.commit()
+
+    if pending:
+        invalidate_dashboard(owner_id)
+    return results
+
+
+def refresh_policy_affected_resources(db: Session, policy_ids: Iterable[int]) -> None:
+    """Set ``Policy.affected_resources`` to the sum over each policy's evaluations."""
+    policy_ids = list(policy_ids)
+    if not policy_ids:
+        return
+    total = (
+        select(func.coalesce(func.sum(models.PolicyEvaluation.affected_resources), 0))
+        .where(models.PolicyEvaluation.policy_id == models.Policy.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        models.Policy.__table__.update()
+        .where(models.Policy.id.in_(policy_ids))
+        .values(affected_resources=total)
+    )
+
+
 def update_evaluation(
     db: Session,
     current_user: models.User,
@@ -505,12 +748,15 @@ def update_evaluation(
     if not db_evaluation:
         return None
     
+    previous_status = db_evaluation.status
     update_data = evaluation_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_evaluation, field, value)
     
     db_evaluation.last_checked_at = datetime.utcnow()
+    rollups.on_evaluation_status_changed(db, db_evaluation.account, previous_status, db_evaluation.status)
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(db_evaluation)
     return db_evaluation
 
@@ -521,8 +767,12 @@ def delete_evaluation(db: Session, current_user: models.User, evaluation_id: int
     if not db_evaluation:
         return False
     
+    account, status = db_evaluation.account, db_evaluation.status
     db.delete(db_evaluation)
+    db.flush()
+    rollups.on_evaluation_deleted(db, account, status)
     db.commit()
+    invalidate_dashboard(current_user.id)
     return True
 
 
@@ -540,14 +790,22 @@ from app import models, schemas
 # Cloud Account CRUD Operations
 # ===========================
 
-def get_accounts(db: Session, current_user: models.User, skip: int = 0, limit: int = 100) -> list[models.CloudAccount]:
-    """Get all cloud accounts for current user."""
-    return (
-        db.query(models.CloudAccount)
-        .filter(models.CloudAccount.owner_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+def get_accounts(
+    db: Session,
+    current_user: models.User,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Get one page of cloud accounts for current user, newest first."""
+    query = db.query(models.CloudAccount).filter(models.CloudAccount.owner_id == current_user.id)
+    return paginate(
+        query,
+        models.CloudAccount.created_at,
+        models.CloudAccount.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
 
 
@@ -630,10 +888,91 @@ def delete_account(db: Session, current_user: models.User, account_id: int) -> b
     if not db_account:
         return False
     
+    rollups.on_account_deleted(db, db_account)
     db.delete(db_account)
     db.commit()
+    invalidate_dashboard(current_user.id)
     return True
 
+# ===========================
+# Sync Job Operations
+# ===========================
+
+ACTIVE_SYNC_STATUSES = (models.SyncJobStatus.QUEUED, models.SyncJobStatus.RUNNING)
+
+
+def fail_stale_sync_jobs(
+    db: Session, *, account_id: Optional[int] = None, now: Optional[datetime] = None
+) -> int:
+    """Fail queued/running jobs with no heartbeat for ``SYNC_JOB_STALE_SECONDS``.
+
+    Jobs run on an in-process thread pool after the 202 response; a restart,
+    deploy or serverless freeze leaves them active with nothing working on
+    them, which would block every later sync of the account.
+    """
+    now = now or datetime.utcnow()
+    table = models.SyncJob.__table__
+    last_seen = func.coalesce(table.c.heartbeat_at, table.c.started_at, table.c.created_at)
+    stmt = (
+        table.update()
+        .where(
+            table.c.status.in_(ACTIVE_SYNC_STATUSES),
+            last_seen < now - timedelta(seconds=settings.sync_job_stale_seconds),
+        )
+        .values(status=models.SyncJobStatus.FAILED, error="Sync worker stopped responding", finished_at=now)
+    )
+    if account_id is not None:
+        stmt = stmt.where(table.c.account_id == account_id)
+    failed = db.execute(stmt).rowcount or 0
+    if failed:
+        db.commit()
+    return failed
+
+
+def create_sync_job(db: Session, account: models.CloudAccount) -> tuple[models.SyncJob, bool]:
+    """Queue a sync job for ``account``; returns ``(job, created)``.
+
+    An account already queued or running reuses its active job instead of
+    stacking another one, unless that job went stale.
+    """
+    fail_stale_sync_jobs(db, account_id=account.id)
+    active = (
+        db.query(models.SyncJob)
+        .filter(
+            models.SyncJob.account_id == account.id,
+            models.SyncJob.status.in_(ACTIVE_SYNC_STATUSES),
+        )
+        .order_by(models.SyncJob.id.desc())
+        .first()
+    )
+    if active:
+        return active, False
+
+    job = models.SyncJob(account_id=account.id, owner_id=account.owner_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job, True
+
+
+def get_sync_job(
+    db: Session,
+    current_user: models.User,
+    account_id: int,
+    job_id: int
+) -> Optional[models.SyncJob]:
+    """Get a sync job for an account (only if user owns it)."""
+    return (
+        db.query(models.SyncJob)
+        .filter(
+            models.SyncJob.id == job_id,
+            models.SyncJob.account_id == account_id,
+            models.SyncJob.owner_id == current_user.id
+        )
+        .first()
+    )
+
+
 # ===========================
 # Notification CRUD Operations
 # ===========================
@@ -642,16 +981,18 @@ def get_notifications(
     db: Session, 
     current_user: models.User, 
     skip: int = 0, 
-    limit: int = 100
-) -> list[models.Notification]:
-    """Get all notifications for current user."""
-    return (
-        db.query(models.Notification)
-        .filter(models.Notification.owner_id == current_user.id)
-        .order_by(models.Notification.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Get one page of notifications for current user, newest first."""
+    query = db.query(models.Notification).filter(models.Notification.owner_id == current_user.id)
+    return paginate(
+        query,
+        models.Notification.created_at,
+        models.Notification.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
 
 
@@ -666,8 +1007,10 @@ def create_notification(
     
     db_notification = models.Notification(**notification_data)
     db.add(db_notification)
+    notification_counts.on_notifications_created(db, [db_notification])
     db.commit()
     db.refresh(db_notification)
+    publish_notifications([db_notification])
     return db_notification
 
 
@@ -677,7 +1020,20 @@ def mark_notification_read(
     notification_id: int
 ) -> Optional[models.Notification]:
     """Mark a notification as read (only if user owns it)."""
-    db_notification = (
+    # Conditional update so concurrent requests decrement the unread counter once.
+    flipped = (
+        db.query(models.Notification)
+        .filter(
+            models.Notification.id == notification_id,
+            models.Notification.owner_id == current_user.id,
+            models.Notification.is_read == False
+        )
+        .update({"is_read": True}, synchronize_session=False)
+    )
+    notification_counts.on_notifications_read(db, current_user.id, flipped)
+    db.commit()
+
+    return (
         db.query(models.Notification)
         .filter(
             models.Notification.id == notification_id,
@@ -685,14 +1041,6 @@ def mark_notification_read(
         )
         .first()
     )
-    
-    if not db_notification:
-        return None
-    
-    db_notification.is_read = True
-    db.commit()
-    db.refresh(db_notification)
-    return db_notification
 
 
 def mark_all_notifications_read(db: Session, current_user: models.User) -> int:
@@ -705,5 +1053,25 @@ def mark_all_notifications_read(db: Session, current_user: models.User) -> int:
         )
         .update({"is_read": True})
     )
+    notification_counts.on_notifications_read(db, current_user.id, updated)
     db.commit()
     return updated
+
+
+def delete_notification(db: Session, current_user: models.User, notification_id: int) -> bool:
+    """Delete a notification (only if user owns it); False when not found."""
+    db_notification = (
+        db.query(models.Notification)
+        .filter(
+            models.Notification.id == notification_id,
+            models.Notification.owner_id == current_user.id
+        )
+        .first()
+    )
+    if not db_notification:
+        return False
+
+    db.delete(db_notification)
+    notification_counts.on_notification_deleted(db, db_notification)
+    db.commit()
+    return True
@@ -0,0 +1,106 @@
+"""``AsyncSession`` variants of the read paths in :mod:`app.crud`.
+
+Writes keep a single implementation: async handlers run the sync crud
+function on the async session's underlying ``Session`` with
+``await db.run_sync(crud.<fn>, ...)``, so rollups and cache invalidation
+behave exactly as on the sync routes.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.pagination import Page, paginate_async
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    stmt = select(models.User).where(models.User.email == email)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_accounts(
+    db: AsyncSession,
+    current_user: models.User,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Get one page of cloud accounts for current user, newest first."""
+    stmt = select(models.CloudAccount).where(models.CloudAccount.owner_id == current_user.id)
+    return await paginate_async(
+        db,
+        stmt,
+        models.CloudAccount.created_at,
+        models.CloudAccount.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_account(db: AsyncSession, current_user: models.User, account_id: int) -> Optional[models.CloudAccount]:
+    """Get a specific account by ID (only if user owns it)."""
+    stmt = select(models.CloudAccount).where(
+        models.CloudAccount.id == account_id,
+        models.CloudAccount.owner_id == current_user.id,
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_sync_job(
+    db: AsyncSession,
+    current_user: models.User,
+    account_id: int,
+    job_id: int,
+) -> Optional[models.SyncJob]:
+    """Get a sync job for an account (only if user owns it)."""
+    stmt = select(models.SyncJob).where(
+        models.SyncJob.id == job_id,
+        models.SyncJob.account_id == account_id,
+        models.SyncJob.owner_id == current_user.id,
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_notifications(
+    db: AsyncSession,
+    current_user: models.User,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Page:
+    """Get one page of notifications for current user, newest first."""
+    stmt = select(models.Notification).where(models.Notification.owner_id == current_user.id)
+    return await paginate_async(
+        db,
+        stmt,
+        models.Notification.created_at,
+        models.Notification.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_notifications_after(
+    db: AsyncSession,
+    owner_id: int,
+    after_id: int,
+    limit: int = 100,
+) -> list[models.Notification]:
+    """Notifications newer than ``after_id``, oldest first (stream resume)."""
+    stmt = (
+        select(models.Notification)
+        .where(models.Notification.owner_id == owner_id, models.Notification.id > after_id)
+        .order_by(models.Notification.id)
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).scalars())
+
+
+async def get_unread_count(db: AsyncSession, current_user: models.User) -> int:
+    counter = await db.get(models.NotificationCounter, current_user.id)
+    return counter.unread if counter else 0
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import threading
+from typing import Any
 
-from app.config import settings
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.cache import mark_recent_write
+from app.config import running_serverless, settings
 
 
 class Base(DeclarativeBase):
@@ -14,21 +21,259 @@ class Base(DeclarativeBase):
 database_url = settings.database_url
 
 # 2. VERCEL FIX: SQLAlchemy requires 'postgresql://', but Vercel provides 'postgres://'
-if database_url and database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
+def _normalize_url(url: str | None) -> str | None:
+    if url and url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+database_url = _normalize_url(database_url)
+database_read_url = _normalize_url(settings.database_read_url)
+
+# 3. Configure engine arguments (keep SQLite logic for local dev safety).
+# Computed per URL: the replica may use a different backend than the primary.
+def _is_sqlite(url: str | None) -> bool:
+    return bool(url) and url.startswith("sqlite")
+
+
+def _is_memory(url: str | None) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def pool_mode() -> str:
+    """``queue`` (a pool per process) or ``null`` (connect per checkout, for serverless)."""
+    if settings.db_pool_mode != "auto":
+        return settings.db_pool_mode
+    # Serverless functions are frozen between invocations; pooled connections
+    # there just go stale, so open one per request (or rely on an external pooler).
+    return "null" if running_serverless() else "queue"
+
+
+def _pool_kwargs(url: str | None, *, is_async: bool = False) -> dict[str, Any]:
+    if _is_memory(url):
+        return {}
+    if pool_mode() == "null":
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": AsyncAdaptedQueuePool if is_async else QueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+
+
+def _engine_kwargs(url: str | None) -> dict[str, Any]:
+    kwargs = _pool_kwargs(url)
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    return kwargs
+
+
+def _sqlite_pragmas(url: str):
+    memory = _is_memory(url)
 
-# 3. Configure engine arguments (keep SQLite logic for local dev safety)
-_engine_kwargs: dict[str, object] = {}
+    def apply(dbapi_connection, connection_record) -> None:
+        # WAL lets readers proceed during a write and busy_timeout makes writers
+        # wait for the lock instead of failing with "database is locked".
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+            if not memory:
+                cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+                cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+            cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        finally:
+            cursor.close()
+
+    return apply
+
+
+class PoolStats:
+    """Connection lifecycle counters for one engine's pool."""
+
+    def __init__(self, name: str, engine: Engine) -> None:
+        self.name = name
+        self.engine = engine
+        self.counts = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidated": 0}
+        self._lock = threading.Lock()
+        for event_name, counter in (
+            ("connect", "connects"),
+            ("checkout", "checkouts"),
+            ("checkin", "checkins"),
+            ("invalidate", "invalidated"),
+        ):
+            event.listen(engine, event_name, self._counter(counter))
+
+    def _counter(self, key: str):
+        def increment(*args) -> None:
+            with self._lock:
+                self.counts[key] += 1
+        return increment
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        stats: dict[str, Any] = {"pool": type(pool).__name__, **self.counts}
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+_pool_stats: list[PoolStats] = []
+
+
+def pool_status() -> dict[str, Any]:
+    return {"mode": pool_mode(), "engines": {stats.name: stats.snapshot() for stats in _pool_stats}}
 
-if database_url and database_url.startswith("sqlite"):
-    _engine_kwargs["connect_args"] = {"check_same_thread": False}
 
 # 4. Create the engine with the FIXED url
 # We use 'pool_pre_ping=True' to handle dropped connections in cloud environments gracefully
-engine = create_engine(database_url, pool_pre_ping=True, **_engine_kwargs)
+engine = create_engine(database_url, pool_pre_ping=True, **_engine_kwargs(database_url))
+if _is_sqlite(database_url):
+    event.listen(engine, "connect", _sqlite_pragmas(database_url))
+_pool_stats.append(PoolStats("primary", engine))
+
+# Optional read replica for list and dashboard queries. Only sessions marked
+# ``info["read_only"]`` (see deps.get_read_db) are routed there.
+read_engine: Engine | None = None
+if database_read_url:
+    read_engine = create_engine(database_read_url, pool_pre_ping=True, **_engine_kwargs(database_read_url))
+    if _is_sqlite(database_read_url):
+        event.listen(read_engine, "connect", _sqlite_pragmas(database_read_url))
+    _pool_stats.append(PoolStats("replica", read_engine))
+
+
+class RoutingSession(Session):
+    """Session that reads from ``replica`` while ``info["read_only"]`` is set.
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Only SELECTs go there: flushes and Core ``insert()``/``update()``/``delete()``
+    statements always use the primary, so a read-only session that does end up
+    writing never sends the write to the replica.
+    """
+
+    def __init__(self, *args: Any, replica: Engine | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        reads = clause is None or getattr(clause, "is_select", False)
+        if self.reads_replica and reads and not self._flushing:
+            return self.replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    @property
+    def reads_replica(self) -> bool:
+        return self.replica is not None and bool(self.info.get("read_only"))
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replica=read_engine
+)
 
 
 def get_db_session():
-    return SessionLocal()
\ No newline at end of file
+    return SessionLocal()
+
+
+# 5. Async engine for the async route handlers: same database, async driver
+# (aiosqlite locally, asyncpg for Postgres). ``None`` when the driver is not
+# installed, in which case only the sync session is available.
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    query = dict(parsed.query)
+    if driver.endswith("asyncpg") and "sslmode" in query:
+        # asyncpg spells libpq's ``sslmode`` as ``ssl``.
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=driver, query=query).render_as_string(hide_password=False)
+
+
+def _create_async_engine(sync_url: str | None, name: str) -> AsyncEngine | None:
+    kwargs: dict[str, Any] = _pool_kwargs(sync_url, is_async=True)
+    url = async_database_url(sync_url) if sync_url else ""
+    if url.startswith("postgresql+asyncpg") and settings.db_external_pooler:
+        # PgBouncer in transaction mode cannot keep asyncpg's prepared statements.
+        kwargs["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    try:
+        async_engine = create_async_engine(url, pool_pre_ping=True, **kwargs)
+    except (ImportError, ValueError):
+        return None
+    if url.startswith("sqlite"):
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas(url))
+    _pool_stats.append(PoolStats(name, async_engine.sync_engine))
+    return async_engine
+
+
+async_engine = _create_async_engine(database_url, "async")
+async_read_engine = _create_async_engine(database_read_url, "async_replica") if database_read_url else None
+
+AsyncSessionLocal = (
+    async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        replica=async_read_engine.sync_engine if async_read_engine is not None else None,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    if async_engine is not None
+    else None
+)
+
+
+# Read-your-writes: a user who just committed a change keeps reading from the
+# primary for ``READ_YOUR_WRITES_SECONDS`` so replica lag never hides it.
+# Sessions learn their user from deps.get_current_user (``info["user_id"]``);
+# sessions writing on behalf of other owners (sync engine, bulk ingest,
+# fan-out) name them with :func:`note_write_owners`.
+def note_write_owners(session: Session, owner_ids) -> None:
+    session.info.setdefault("write_owners", set()).update(
+        owner_id for owner_id in owner_ids if owner_id is not None
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_write(session: Session) -> None:
+    owners = session.info.pop("write_owners", set())
+    if session.info.pop("wrote", False):
+        for owner_id in {session.info.get("user_id"), *owners}:
+            mark_recent_write(owner_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+    session.info.pop("write_owners", None)
+
+
+def upsert_insert(bind):
+    """Return the dialect ``insert`` construct supporting ON CONFLICT, or None."""
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
\ No newline at end of file
@@ -1,21 +1,23 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, SessionLocal
 from app import models
-from app.security import PasswordManager
+from app.cache import invalidate_principal, principal_cache, wrote_recently
+from app.security import PasswordManager, password_manager
 from app.config import settings  # SECRET_KEY, ALGORITHM
 
-_password_manager = PasswordManager()
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
 
@@ -27,34 +29,131 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver not installed (aiosqlite / asyncpg)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _read_only_for(token: str) -> bool:
+    """Route to the replica unless the token's user committed a write recently."""
+    try:
+        user_id, _ = _decode_token(token)
+    except HTTPException:
+        return True  # get_current_user rejects the request anyway
+    return not wrote_recently(user_id)
+
+
+def get_read_db(token: Annotated[str, Depends(oauth2_scheme)]) -> Generator[Session, None, None]:
+    """:func:`get_db` for read-only handlers; queries go to ``DATABASE_READ_URL`` when set."""
+    db = SessionLocal(info={"read_only": _read_only_for(token)})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(token: Annotated[str, Depends(oauth2_scheme)]) -> AsyncGenerator[AsyncSession, None]:
+    """:func:`get_async_db` counterpart of :func:`get_read_db`."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver not installed (aiosqlite / asyncpg)")
+    async with AsyncSessionLocal(info={"read_only": _read_only_for(token)}) as db:
+        yield db
+
+
 def get_password_manager() -> PasswordManager:
-    return _password_manager
+    return password_manager
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
-) -> models.User:
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str) -> tuple[int, int]:
+    """Return ``(user_id, token_version)`` from an access token."""
     try:
         payload = jwt.decode(
             token,
             settings.jwt_secret,
             algorithms=[settings.jwt_algorithm],
         )
-        user_id: int | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        return int(payload["sub"]), int(payload.get("ver", 0))
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise _credentials_exception()
+
+
+def _check_snapshot(snapshot: models.User, token_version: int) -> None:
+    if not snapshot.is_active or (snapshot.token_version or 0) != token_version:
+        raise _credentials_exception()
+
+
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db),
+) -> models.User:
+    user_id, token_version = _decode_token(token)
+
+    snapshot = principal_cache.get(user_id)
+    if snapshot is None:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if user is None:
+            raise _credentials_exception()
+        snapshot = _snapshot(user)
+        principal_cache.set(user_id, snapshot)
+    _check_snapshot(snapshot, token_version)
+    db.info["user_id"] = user_id
+
+    # Attach a per-request copy without querying; relationships still lazy-load.
+    return db.merge(snapshot, load=False)
+
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """:func:`get_current_user` for handlers using :func:`get_async_db`."""
+    user_id, token_version = _decode_token(token)
+
+    snapshot = principal_cache.get(user_id)
+    if snapshot is None:
+        user = await db.get(models.User, user_id)
+        if user is None:
+            raise _credentials_exception()
+        snapshot = _snapshot(user)
+        principal_cache.set(user_id, snapshot)
+    _check_snapshot(snapshot, token_version)
+    db.sync_session.info["user_id"] = user_id
+
+    return await db.merge(snapshot, load=False)
+
+
+async def get_current_user_stream(
+    header_token: Annotated[str | None, Depends(oauth2_scheme_optional)],
+    token: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """:func:`get_current_user_async` that also accepts ``?token=``, since
+    EventSource clients cannot set an ``Authorization`` header."""
+    token = header_token or token
+    if not token:
+        raise _credentials_exception()
+    return await get_current_user_async(token, db)
+
+
+def _snapshot(user: models.User) -> models.User:
+    """Detached, fully loaded copy of ``user`` that is safe to share between requests."""
+    copy = models.User(**{attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
 
-    return user
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _evict_principal(mapper, connection, target: models.User) -> None:
+    invalidate_principal(target.id)
 
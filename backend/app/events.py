@@ -0,0 +1,110 @@
+"""In-process pub/sub that pushes new notifications to open streams.
+
+crud publishes after a notification is committed; ``GET
+/notifications/stream`` (SSE) and ``/notifications/ws`` subscribe per
+owner. Publishing is thread-safe, so sync handlers, ``run_sync`` and the
+sync engine threads can all feed subscribers living on the event loop.
+
+The hub only sees notifications written by this process. Clients resume
+with ``Last-Event-ID`` (the last notification id they received), which is
+served from the database. A reconnect therefore also picks up anything
+another worker wrote meanwhile.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+from app import models, schemas
+
+# Events buffered per subscriber before it is considered too slow and closed;
+# the client reconnects and catches up from the database.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """One open stream: an asyncio queue bound to the loop that created it."""
+
+    def __init__(self, hub: NotificationHub, owner_id: int) -> None:
+        self.hub = hub
+        self.owner_id = owner_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[Optional[dict[str, Any]]] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _push(self, event: dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)  # wake the reader so it closes the stream
+
+    async def next(self, timeout: float) -> Optional[dict[str, Any]]:
+        """Next event, or None on timeout (time for a heartbeat)."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NotificationHub:
+    def __init__(self) -> None:
+        self._subscribers: defaultdict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, owner_id: int) -> Subscription:
+        subscription = Subscription(self, owner_id)
+        with self._lock:
+            self._subscribers[owner_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.owner_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.owner_id]
+
+    def subscriber_count(self, owner_id: Optional[int] = None) -> int:
+        with self._lock:
+            if owner_id is not None:
+                return len(self._subscribers.get(owner_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, owner_id: int, event: dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(owner_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._push, event)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(subscription)
+
+
+notification_hub = NotificationHub()
+
+
+def notification_event(notification: models.Notification) -> dict[str, Any]:
+    return schemas.NotificationRead.model_validate(notification).model_dump(mode="json")
+
+
+def publish_notifications(notifications: Iterable[models.Notification]) -> None:
+    """Push committed notifications to their owners' open streams."""
+    for notification in notifications:
+        if notification.owner_id is not None and notification_hub.subscriber_count(notification.owner_id):
+            notification_hub.publish(notification.owner_id, notification_event(notification))
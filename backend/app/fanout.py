@@ -0,0 +1,188 @@
+"""Notification fan-out: one notification to many recipients in a few statements.
+
+Rows are written as executemany batches of ``FANOUT_BATCH_SIZE`` (sent as
+multi-row ``INSERT ... VALUES``) instead of one ORM insert each, the unread
+counters are bumped with one upsert batch per chunk, and the committed rows
+are pushed to open streams.
+
+Broadcasts to at least ``FANOUT_TEMPLATE_MIN_RECIPIENTS`` users store the
+title and body once in ``notification_templates``; each recipient only gets
+a light delivery row (empty title/message, ``template_id`` set) which
+``models.Notification`` resolves on read.
+
+Run ``python -m app.fanout broadcast --title ... --message ...`` to notify
+every active user.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from app import models, notification_counts, schemas
+from app.config import settings
+from app.database import note_write_owners
+from app.events import notification_hub
+
+_ROW_DEFAULTS = {
+    "type": models.NotificationType.BROADCAST,
+    "is_read": False,
+    "template_id": None,
+}
+
+
+def _publish(rows: Iterable[Any], templates: dict[int, dict[str, str]]) -> None:
+    for row in rows:
+        if not notification_hub.subscriber_count(row.owner_id):
+            continue
+        template = templates.get(row.template_id) if row.template_id is not None else None
+        event = schemas.NotificationRead.model_construct(
+            id=row.id,
+            title=template["title"] if template else row.title,
+            message=template["message"] if template else row.message,
+            type=models.NotificationType(row.type),
+            is_read=row.is_read,
+            created_at=row.created_at,
+        ).model_dump(mode="json")
+        notification_hub.publish(row.owner_id, event)
+
+
+def insert_notifications(
+    db: Session,
+    rows: list[dict[str, Any]],
+    *,
+    templates: Optional[dict[int, dict[str, str]]] = None,
+) -> int:
+    """Insert notification rows (``owner_id``, ``title``, ``message`` and
+    optionally ``type``, ``is_read``, ``created_at``, ``template_id``),
+    update the counters, commit and publish. Returns the number of rows."""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    rows = [{**_ROW_DEFAULTS, "created_at": now, **row} for row in rows]
+    table = models.Notification.__table__
+    returning = db.get_bind().dialect.insert_returning
+    batch_size = max(1, settings.fanout_batch_size)
+
+    # executemany: SQLAlchemy batches these into multi-row INSERT ... VALUES
+    # ("insertmanyvalues") from one cached compiled statement.
+    stmt = table.insert().returning(*table.c) if returning else table.insert()
+    inserted = []
+    for start in range(0, len(rows), batch_size):
+        result = db.execute(stmt, rows[start : start + batch_size])
+        if returning:
+            inserted.extend(result.all())
+    note_write_owners(db, {row["owner_id"] for row in rows})
+    notification_counts.apply_deltas(
+        db,
+        notification_counts.deltas_for((row["owner_id"], row["is_read"]) for row in rows),
+        batch_size=batch_size,
+    )
+    db.commit()
+    # Without RETURNING the new ids are unknown; clients pick the rows up on reconnect.
+    _publish(inserted, templates or {})
+    return len(rows)
+
+
+def fan_out(
+    db: Session,
+    owner_ids: Iterable[int],
+    *,
+    title: str,
+    message: str,
+    type: models.NotificationType = models.NotificationType.BROADCAST,
+    use_template: Optional[bool] = None,
+) -> int:
+    """Send the same notification to every owner in ``owner_ids``.
+
+    ``use_template`` defaults to whether there are at least
+    ``FANOUT_TEMPLATE_MIN_RECIPIENTS`` distinct recipients. Raises
+    ``pydantic.ValidationError`` for content ``NotificationRead`` would reject.
+    """
+    # Validate against the rules the read schema enforces, so nothing is
+    # stored that GET /notifications/ cannot serialize.
+    validated = schemas.NotificationBase(title=title, message=message, type=type)
+    title, message = validated.title, validated.message
+    owner_ids = list(dict.fromkeys(owner_ids))
+    if not owner_ids:
+        return 0
+    if use_template is None:
+        use_template = len(owner_ids) >= settings.fanout_template_min_recipients
+
+    templates = {}
+    content = {"title": title, "message": message}
+    if use_template:
+        template = models.NotificationTemplate(type=type, title=title, message=message, recipients=len(owner_ids))
+        db.add(template)
+        db.flush()
+        templates[template.id] = {"title": title, "message": message}
+        content = {"title": "", "message": "", "template_id": template.id}
+
+    return insert_notifications(
+        db,
+        [{"owner_id": owner_id, "type": type, **content} for owner_id in owner_ids],
+        templates=templates,
+    )
+
+
+def broadcast(
+    db: Session,
+    *,
+    title: str,
+    message: str,
+    type: models.NotificationType = models.NotificationType.BROADCAST,
+    use_template: Optional[bool] = None,
+) -> int:
+    """Fan out to every active user."""
+    owner_ids = db.execute(select(models.User.id).where(models.User.is_active.is_(True))).scalars()
+    return fan_out(db, owner_ids, title=title, message=message, type=type, use_template=use_template)
+
+
+def prune_templates(db: Session) -> int:
+    """Delete templates no delivery row points at any more (after retention)."""
+    template = models.NotificationTemplate.__table__
+    notification = models.Notification.__table__
+    result = db.execute(
+        delete(template).where(~exists().where(notification.c.template_id == template.c.id))
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send a notification to every active user")
+    parser.add_argument("command", choices=["broadcast"])
+    parser.add_argument("--title", required=True)
+    parser.add_argument("--message", required=True)
+    parser.add_argument(
+        "--type", choices=[t.value for t in models.NotificationType], default=models.NotificationType.BROADCAST.value
+    )
+    template = parser.add_mutually_exclusive_group()
+    template.add_argument("--template", dest="use_template", action="store_true", default=None)
+    template.add_argument("--no-template", dest="use_template", action="store_false")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        sent = broadcast(
+            db,
+            title=args.title,
+            message=args.message,
+            type=models.NotificationType(args.type),
+            use_template=args.use_template,
+        )
+    except ValidationError as exc:
+        parser.error("; ".join(f"--{error['loc'][0]}: {error['msg']}" for error in exc.errors()))
+    finally:
+        db.close()
+    print(f"Sent {sent} notifications")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,20 +10,16 @@ from fastapi import APIRouter, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import inspect, text
-from passlib.context import CryptContext
 
 # Imports
 from app.config import settings
-from app.database import Base, SessionLocal, engine
+from app.database import SessionLocal, pool_status
+from app.pagination import NEXT_CURSOR_HEADER
+from app.sync import sync_engine
+from app.scheduler import sync_scheduler
 from app.routers import accounts, auth, dashboard, notifications, policies
-from app import crud, schemas
-from app.security import PasswordManager
-
-# ============ DEMO SEED IMPORT - REMOVE THIS LINE FOR PRODUCTION ============
-from app.seed import demo_records
-# ============================================================================
+from app import bootstrap, profiling
+from app.security import password_manager
 
 app = FastAPI(title=settings.app_name)
 
@@ -34,7 +30,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+# Statement counts and DB time per request (QUERY_PROFILING)
+app.add_middleware(profiling.QueryProfilingMiddleware)
 
 # --- DEBUGGING: Log Validation Errors to Vercel Console ---
 @app.exception_handler(RequestValidationError)
@@ -61,177 +60,39 @@ app.include_router(api_router)
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
-def create_admin_user(db: Session):
-    """Helper to ensure admin exists."""
-    try:
-        admin_email = "admin@cloudguard.dev"
-        from app.models import User
-        user = db.query(User).filter(User.email == admin_email).first()
-        
-        if not user:
-            print(f"Creating admin user: {admin_email}")
-            
-            pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-            try:
-                user_in = schemas.UserCreate(
-                    email=admin_email, 
-                    password="changeme123", 
-                    full_name="Cloud Guard Admin"
-                )
-                crud.create_user(db, user_in, pwd_context.hash)
-            except AttributeError:
-                hashed_pw = pwd_context.hash("changeme123")
-                new_user = User(email=admin_email, hashed_password=hashed_pw, full_name="Cloud Guard Admin", is_active=True)
-                db.add(new_user)
-                db.commit()
-            print("✅ Admin user created successfully.")
-        else:
-            print("ℹ️  Admin user already exists.")
-    except Exception as e:
-        print(f"❌ Error creating admin user: {e}")
 
+@app.get("/health/pool")
+def pool_health() -> dict:
+    """Connection pool mode, occupancy and lifetime counters per engine."""
+    return pool_status()
 
 
-def ensure_sqlite_schema() -> None:
-    """Backfill missing sqlite columns for local dev schema drift."""
-    if not engine.url.get_backend_name().startswith("sqlite"):
-        return
-    inspector = inspect(engine)
-    existing_tables = set(inspector.get_table_names())
-    if not existing_tables:
-        return
-    with engine.begin() as conn:
-        for table in Base.metadata.sorted_tables:
-            if table.name not in existing_tables:
-                continue
-            columns = {col["name"] for col in inspector.get_columns(table.name)}
-            for column in table.columns:
-                if column.name in columns:
-                    continue
-                col_type = column.type.compile(dialect=engine.dialect)
-                conn.execute(
-                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
-                )
-
-# ============ DEMO SEED FUNCTION - REMOVE THIS FUNCTION FOR PRODUCTION ============
-def seed_demo_data(db: Session):
-    """Seed demo data from seed.py"""
-    try:
-        from app.models import User, CloudAccount, Policy, PolicyEvaluation, Notification
-        
-        # Check if demo data already exists by checking for cloud accounts
-        account_count = db.query(CloudAccount).count()
-        if account_count >= 3:  # We create 3 accounts
-            print("ℹ️  Demo data already seeded.")
-            return
-        
-        print("🌱 Seeding demo data...")
-        
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        records = demo_records(password_hasher=pwd_context.hash)
-        
-        # Group records by model type
-        accounts = []
-        policies = []
-        evaluations = []
-        notifications = []
-        
-        for record in records:
-            model = record["model"]
-            data = record["data"]
-            
-            # Skip user creation - admin already exists
-            if model == User:
-                print("ℹ️  Skipping user creation (admin already exists)")
-                continue
-            
-            if model == CloudAccount:
-                accounts.append(data)
-            elif model == Policy:
-                policies.append(data)
-            elif model == PolicyEvaluation:
-                evaluations.append(data)
-            elif model == Notification:
-                notifications.append(data)
-        
-        # Insert in correct order
-        print(f"📦 Creating {len(accounts)} cloud accounts...")
-        created_accounts = []
-        for data in accounts:
-            instance = CloudAccount(**data)
-            db.add(instance)
-            db.flush()  # Get ID immediately
-            created_accounts.append(instance)
-        db.commit()
-        print(f"✅ Created {len(created_accounts)} cloud accounts")
-        
-        print(f"📋 Creating {len(policies)} policies...")
-        created_policies = []
-        for data in policies:
-            instance = Policy(**data)
-            db.add(instance)
-            db.flush()  # Get ID immediately
-            created_policies.append(instance)
-        db.commit()
-        print(f"✅ Created {len(created_policies)} policies")
-        
-        # Map old IDs to new IDs
-        policy_id_map = {i+1: policy.id for i, policy in enumerate(created_policies)}
-        account_id_map = {i+1: account.id for i, account in enumerate(created_accounts)}
-        
-        print(f"🔍 Creating {len(evaluations)} policy evaluations...")
-        for data in evaluations:
-            # Replace hardcoded IDs with actual IDs
-            eval_data = data.copy()
-            eval_data['policy_id'] = policy_id_map[data['policy_id']]
-            eval_data['account_id'] = account_id_map[data['account_id']]
-            instance = PolicyEvaluation(**eval_data)
-            db.add(instance)
-        db.commit()
-        print(f"✅ Created {len(evaluations)} policy evaluations")
-        
-        print(f"🔔 Creating {len(notifications)} notifications...")
-        for data in notifications:
-            instance = Notification(**data)
-            db.add(instance)
-        db.commit()
-        print(f"✅ Created {len(notifications)} notifications")
-        
-        print("✅ Demo data seeded successfully!")
-        
-    except Exception as e:
-        print(f"❌ Error seeding demo data: {e}")
-        import traceback
-        traceback.print_exc()
-        db.rollback()
-# ===================================================================================
+@app.get("/health/queries")
+def query_health(limit: int = 10) -> dict:
+    """Routes issuing the most statements per request (``QUERY_PROFILING``)."""
+    return {"enabled": settings.query_profiling, "routes": profiling.route_stats.top(limit)}
 
 @app.on_event("startup")
 def on_startup() -> None:
-    # if settings.database_url and not settings.database_url.startswith('sqlite'):
+    if bootstrap.startup_mode() == "full":
         try:
-            # 1. Create Tables
-            Base.metadata.create_all(bind=engine)
-            ensure_sqlite_schema()
-            print("📊 Database tables created.")
-
-            # 2. Create Admin User & Seed Data
-            db = SessionLocal()
-            try:
-                create_admin_user(db)
-                
-                # ============ DEMO SEED - REMOVE THESE 2 LINES FOR PRODUCTION ============
-                seed_demo_data(db)
-                # ==========================================================================
-                
-            finally:
-                db.close()
-
+            bootstrap.initialize()
         except Exception as e:
             print(f"⚠️  Warning: Database initialization error: {e}")
-    # else:
-    #     print("⏭️  Skipping database initialization (Build mode)")
+    else:
+        print("⏭️  Lazy startup: run `python -m app.bootstrap init` to create tables and seed data")
+
+    if settings.scheduler_enabled:
+        sync_scheduler.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    if settings.scheduler_enabled:
+        sync_scheduler.stop()
+    sync_engine.shutdown(wait=False)
+    password_manager.shutdown()
+
 
 @app.get("/debug/counts")
 def debug_counts():
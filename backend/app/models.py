@@ -9,12 +9,16 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     Date,
     UniqueConstraint,
+    func,
+    select,
 )
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -54,6 +58,13 @@ class NotificationType(str, enum.Enum):
     BROADCAST = "broadcast"
 
 
+class SyncJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -62,6 +73,7 @@ class User(Base):
     full_name: Mapped[str] = mapped_column(String(255), nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    token_version: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     accounts: Mapped[list[CloudAccount]] = relationship(
@@ -79,7 +91,11 @@ class User(Base):
 
 class CloudAccount(Base):
     __tablename__ = "cloud_accounts"
-    __table_args__ = (UniqueConstraint("provider", "external_id", name="uq_provider_account"),)
+    __table_args__ = (
+        UniqueConstraint("provider", "external_id", name="uq_provider_account"),
+        Index("ix_cloud_accounts_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_cloud_accounts_owner_provider", "owner_id", "provider"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     provider: Mapped[CloudProvider] = mapped_column(Enum(CloudProvider), index=True)
@@ -104,11 +120,18 @@ class CloudAccount(Base):
     evaluations: Mapped[list[PolicyEvaluation]] = relationship(
         "PolicyEvaluation", back_populates="account", cascade="all, delete-orphan"
     )
+    sync_jobs: Mapped[list[SyncJob]] = relationship(
+        "SyncJob", back_populates="account", cascade="all, delete-orphan"
+    )
 
 
 class Policy(Base):
     __tablename__ = "policies"
-    __table_args__ = (UniqueConstraint("provider", "control_id", "owner_id", name="uq_policy_provider_control_owner"),)  # Updated constraint
+    __table_args__ = (
+        UniqueConstraint("provider", "control_id", "owner_id", name="uq_policy_provider_control_owner"),  # Updated constraint
+        Index("ix_policies_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_policies_owner_provider", "owner_id", "provider"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     provider: Mapped[CloudProvider] = mapped_column(Enum(CloudProvider), index=True)
@@ -129,6 +152,7 @@ class Policy(Base):
     affected_resources: Mapped[int] = mapped_column(Integer, default=0)
     last_reviewed: Mapped[datetime | None] = mapped_column(Date, nullable=True)
     policy_content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     tags: Mapped[str | None] = mapped_column(String(500), nullable=True)
     
     owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -145,7 +169,12 @@ class Policy(Base):
 
 class PolicyEvaluation(Base):
     __tablename__ = "policy_evaluations"
-    __table_args__ = (UniqueConstraint("policy_id", "account_id", name="uq_policy_account"),)
+    __table_args__ = (
+        UniqueConstraint("policy_id", "account_id", name="uq_policy_account"),
+        Index("ix_policy_evaluations_checked", "last_checked_at", "id"),
+        Index("ix_policy_evaluations_account_checked", "account_id", "last_checked_at", "id"),
+        Index("ix_policy_evaluations_account_status", "account_id", "status"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     policy_id: Mapped[int] = mapped_column(Integer, ForeignKey("policies.id"), nullable=False)
@@ -154,6 +183,7 @@ class PolicyEvaluation(Base):
     last_checked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     findings: Mapped[str | None] = mapped_column(Text, nullable=True)
     resource_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    affected_resources: Mapped[int] = mapped_column(Integer, default=0)
 
     policy: Mapped[Policy] = relationship("Policy", back_populates="evaluations")
     account: Mapped[CloudAccount] = relationship("CloudAccount", back_populates="evaluations")
@@ -161,13 +191,145 @@ class PolicyEvaluation(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_notifications_owner_read", "owner_id", "is_read"),
+        Index("ix_notifications_type_created", "type", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    title: Mapped[str] = mapped_column(String(255), nullable=False)
-    message: Mapped[str] = mapped_column(Text, nullable=False)
+    # Empty on fan-out delivery rows, which read both from their template.
+    stored_title: Mapped[str] = mapped_column("title", String(255), nullable=False)
+    stored_message: Mapped[str] = mapped_column("message", Text, nullable=False)
     type: Mapped[NotificationType] = mapped_column(Enum(NotificationType), default=NotificationType.BROADCAST)
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
     owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
-    owner: Mapped[User] = relationship("User", back_populates="notifications")
\ No newline at end of file
+    owner: Mapped[User] = relationship("User", back_populates="notifications")
+
+    template_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("notification_templates.id"), nullable=True, index=True
+    )
+    # Loaded with a second IN query so async sessions never lazy load it,
+    # without joining templates into every notification query.
+    template: Mapped[NotificationTemplate | None] = relationship("NotificationTemplate", lazy="selectin")
+
+    @hybrid_property
+    def title(self) -> str:
+        return self.template.title if self.template is not None else self.stored_title
+
+    @title.inplace.setter
+    def _title_setter(self, value: str) -> None:
+        self.stored_title = value
+
+    @title.inplace.expression
+    @classmethod
+    def _title_expression(cls):
+        return func.coalesce(_template_column(cls, NotificationTemplate.title), cls.stored_title)
+
+    @hybrid_property
+    def message(self) -> str:
+        return self.template.message if self.template is not None else self.stored_message
+
+    @message.inplace.setter
+    def _message_setter(self, value: str) -> None:
+        self.stored_message = value
+
+    @message.inplace.expression
+    @classmethod
+    def _message_expression(cls):
+        return func.coalesce(_template_column(cls, NotificationTemplate.message), cls.stored_message)
+
+
+def _template_column(notification, column):
+    """``column`` of the notification's template, NULL without one."""
+    return select(column).where(NotificationTemplate.id == notification.template_id).scalar_subquery()
+
+
+class NotificationTemplate(Base):
+    """Shared title and body of a fan-out broadcast; each recipient gets a
+    delivery row in ``notifications`` pointing here."""
+
+    __tablename__ = "notification_templates"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    type: Mapped[NotificationType] = mapped_column(Enum(NotificationType), default=NotificationType.BROADCAST)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    recipients: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class NotificationCounter(Base):
+    """Per owner notification counts maintained alongside notifications."""
+
+    __tablename__ = "notification_counters"
+
+    owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ComplianceRollup(Base):
+    """Per owner/provider evaluation counts maintained alongside policy_evaluations."""
+
+    __tablename__ = "compliance_rollups"
+    __table_args__ = (UniqueConstraint("owner_id", "provider", name="uq_rollup_owner_provider"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    provider: Mapped[CloudProvider] = mapped_column(Enum(CloudProvider), nullable=False)
+    accounts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    compliant: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    non_compliant: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    warning: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    unknown: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SyncJob(Base):
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        Index("ix_sync_jobs_account_status", "account_id", "status"),
+        Index("ix_sync_jobs_account_created", "account_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    account_id: Mapped[int] = mapped_column(Integer, ForeignKey("cloud_accounts.id"), nullable=False)
+    owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    status: Mapped[SyncJobStatus] = mapped_column(Enum(SyncJobStatus), default=SyncJobStatus.QUEUED)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    processed: Mapped[int] = mapped_column(Integer, default=0)
+    created: Mapped[int] = mapped_column(Integer, default=0)
+    updated: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Bumped by the worker on every committed batch; see crud.fail_stale_sync_jobs.
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    account: Mapped[CloudAccount] = relationship("CloudAccount", back_populates="sync_jobs")
+
+
+class SchedulerLease(Base):
+    """Leader lock so only one app instance runs a given background loop."""
+
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class SchemaMeta(Base):
+    """Small key/value store for schema bookkeeping, e.g. the metadata
+    fingerprint that lets startup skip reflection when nothing changed."""
+
+    __tablename__ = "schema_meta"
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,220 @@
+"""Maintained per-owner notification counters backing ``GET /notifications/unread-count``.
+
+Every insert, read-flag change and delete of ``notifications`` goes through
+one of the ``on_*`` hooks below inside the same transaction, so the unread
+badge is a single primary-key lookup however long the history grows.
+
+Run ``python -m app.notification_counts verify`` to compare the counters
+with the source table and ``python -m app.notification_counts rebuild`` to
+recompute them.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, exists, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import upsert_insert
+
+COUNT_COLUMNS = ("unread", "total")
+
+
+def apply_delta(db: Session, owner_id: Optional[int], *, unread: int = 0, total: int = 0) -> None:
+    """Add ``unread`` / ``total`` to the owner's counter row, creating it if needed."""
+    deltas = {column: value for column, value in (("unread", unread), ("total", total)) if value}
+    if owner_id is None or not deltas:
+        return
+
+    table = models.NotificationCounter.__table__
+    now = datetime.utcnow()
+    insert = upsert_insert(db.get_bind())
+
+    if insert is not None:
+        stmt = insert(table).values(owner_id=owner_id, unread=unread, total=total, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.owner_id],
+            set_={
+                **{column: table.c[column] + value for column, value in deltas.items()},
+                "updated_at": now,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    updated = db.execute(
+        table.update()
+        .where(table.c.owner_id == owner_id)
+        .values(updated_at=now, **{column: table.c[column] + value for column, value in deltas.items()})
+    )
+    if not updated.rowcount:
+        db.add(models.NotificationCounter(owner_id=owner_id, unread=unread, total=total))
+        db.flush()
+
+
+def apply_deltas(db: Session, deltas: dict[int, tuple[int, int]], *, batch_size: int = 1000) -> None:
+    """Apply many ``owner_id -> (unread, total)`` increments as executemany
+    upserts of ``batch_size`` owners where the dialect supports it."""
+    deltas = {owner_id: delta for owner_id, delta in deltas.items() if owner_id is not None and any(delta)}
+    insert = upsert_insert(db.get_bind())
+    if insert is None or len(deltas) == 1:
+        for owner_id, (unread, total) in deltas.items():
+            apply_delta(db, owner_id, unread=unread, total=total)
+        return
+
+    table = models.NotificationCounter.__table__
+    now = datetime.utcnow()
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.owner_id],
+        set_={
+            "unread": table.c.unread + stmt.excluded.unread,
+            "total": table.c.total + stmt.excluded.total,
+            "updated_at": now,
+        },
+    )
+    params = [
+        {"owner_id": owner_id, "unread": unread, "total": total, "updated_at": now}
+        for owner_id, (unread, total) in deltas.items()
+    ]
+    for start in range(0, len(params), batch_size):
+        db.execute(stmt, params[start : start + batch_size])
+
+
+def deltas_for(rows: Iterable[tuple[int, bool]], sign: int = 1) -> dict[int, tuple[int, int]]:
+    """``owner_id -> (unread, total)`` for ``(owner_id, is_read)`` pairs."""
+    unread: Counter = Counter()
+    total: Counter = Counter()
+    for owner_id, is_read in rows:
+        total[owner_id] += sign
+        if not is_read:
+            unread[owner_id] += sign
+    return {owner_id: (unread[owner_id], count) for owner_id, count in total.items()}
+
+
+# -- Hooks called from crud ----------------------------------------------------
+def on_notifications_created(db: Session, notifications: Iterable[models.Notification]) -> None:
+    """Count new notifications (any number of owners) before they are committed."""
+    apply_deltas(db, deltas_for((n.owner_id, n.is_read) for n in notifications))
+
+
+def on_notifications_read(db: Session, owner_id: int, count: int) -> None:
+    """``count`` unread notifications of ``owner_id`` were just marked read."""
+    apply_delta(db, owner_id, unread=-count)
+
+
+def on_notification_deleted(db: Session, notification: models.Notification) -> None:
+    apply_delta(db, notification.owner_id, unread=-1 if not notification.is_read else 0, total=-1)
+
+
+def get_counts(db: Session, owner_id: int) -> dict[str, int]:
+    counter = db.get(models.NotificationCounter, owner_id)
+    return {column: getattr(counter, column) if counter else 0 for column in COUNT_COLUMNS}
+
+
+# -- Maintenance ---------------------------------------------------------------
+def _aggregate_stmt(owner_id: Optional[int] = None):
+    notification = models.Notification
+    stmt = select(
+        notification.owner_id,
+        func.sum(case((notification.is_read == False, 1), else_=0)).label("unread"),  # noqa: E712
+        func.count(notification.id).label("total"),
+    ).group_by(notification.owner_id)
+    if owner_id is not None:
+        stmt = stmt.where(notification.owner_id == owner_id)
+    return stmt
+
+
+def _expected_counts(db: Session, owner_id: Optional[int] = None) -> dict[int, dict[str, int]]:
+    return {
+        row["owner_id"]: {column: row[column] or 0 for column in COUNT_COLUMNS}
+        for row in db.execute(_aggregate_stmt(owner_id)).mappings()
+    }
+
+
+def rebuild(db: Session, owner_id: Optional[int] = None) -> int:
+    """Recompute counters from ``notifications``; returns the number of rows written."""
+    table = models.NotificationCounter.__table__
+    clear = delete(table)
+    if owner_id is not None:
+        clear = clear.where(table.c.owner_id == owner_id)
+    db.execute(clear)
+
+    now = datetime.utcnow()
+    rows = [
+        {"owner_id": owner, "updated_at": now, **counts}
+        for owner, counts in _expected_counts(db, owner_id).items()
+    ]
+    if rows:
+        db.execute(table.insert(), rows)
+    db.commit()
+    return len(rows)
+
+
+def verify(db: Session, owner_id: Optional[int] = None) -> list[dict]:
+    """Return one entry per owner whose counter differs from the source table."""
+    expected = _expected_counts(db, owner_id)
+    stmt = select(models.NotificationCounter)
+    if owner_id is not None:
+        stmt = stmt.where(models.NotificationCounter.owner_id == owner_id)
+    actual = {
+        counter.owner_id: {column: getattr(counter, column) for column in COUNT_COLUMNS}
+        for counter in db.execute(stmt).scalars()
+        if counter.unread or counter.total
+    }
+
+    zero = dict.fromkeys(COUNT_COLUMNS, 0)
+    return [
+        {"owner_id": owner, "expected": expected.get(owner, zero), "actual": actual.get(owner, zero)}
+        for owner in sorted(set(expected) | set(actual))
+        if expected.get(owner, zero) != actual.get(owner, zero)
+    ]
+
+
+def ensure_backfilled(db: Session) -> bool:
+    """Rebuild once when notifications exist but no counters were ever written."""
+    if db.execute(select(exists().where(models.NotificationCounter.owner_id.is_not(None)))).scalar():
+        return False
+    if not db.execute(select(exists().where(models.Notification.id.is_not(None)))).scalar():
+        return False
+    rebuild(db)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild or verify notification counters")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--owner-id", type=int, default=None, help="Limit to a single user")
+    parser.add_argument("--repair", action="store_true", help="Rebuild when verify finds drift")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = rebuild(db, owner_id=args.owner_id)
+            print(f"Rebuilt {written} counter rows")
+            return
+
+        drift = verify(db, owner_id=args.owner_id)
+        if not drift:
+            print("Counters match notifications")
+            return
+        for entry in drift:
+            print(f"owner={entry['owner_id']} expected={entry['expected']} actual={entry['actual']}")
+        if args.repair:
+            rebuild(db, owner_id=args.owner_id)
+            print(f"Repaired {len(drift)} drifted counters")
+            return
+        raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
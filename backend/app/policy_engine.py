@@ -0,0 +1,634 @@
+"""Local evaluation of ``Policy.policy_content`` documents against resource records.
+
+Each document is compiled once into a matcher and then run against
+:class:`ResourceBatch` objects, which are columnar views over collected
+resource records (plain dicts keyed by field name). Three document formats
+are understood:
+
+* Azure Policy definitions (``properties.policyRule``): a resource violates
+  the policy when the ``if`` condition matches and the effect is not
+  ``disabled``.
+* AWS IAM/SCP documents (``Statement``): a resource violates the policy
+  when it matches a ``Deny`` statement's action, resource and conditions.
+  Records carry the request context keys plus ``action`` and ``resource``.
+* GCP organization policies (``constraint`` with ``listPolicy`` or
+  ``booleanPolicy``): the record field named after the constraint holds the
+  value to check.
+
+Each column is dictionary-encoded once per batch. Leaf predicates run on the
+distinct values only and are broadcast back to rows, with NumPy when it is
+installed and plain lists otherwise.
+"""
+from __future__ import annotations
+
+import fnmatch
+import functools
+import hashlib
+import importlib.util
+import json
+import math
+import operator
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from app import models
+from app.cache import compiled_policy_cache
+
+# numpy is imported on first evaluation rather than with the module: the API
+# imports this module at startup but only sync jobs evaluate policies.
+_HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+@functools.cache
+def _np() -> Any:
+    import numpy  # type: ignore
+
+    return numpy
+
+
+class PolicyCompileError(ValueError):
+    """Raised when a policy document cannot be compiled into a matcher."""
+
+
+# -- columnar batches ----------------------------------------------------------
+
+def _normalize(value: Any) -> Any:
+    """Hashable string form of a record value; lists become tuples, missing stays ``None``."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_normalize(item) for item in value if item is not None)
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True)
+    return str(value)
+
+
+def _to_number(value: Any) -> float:
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ResourceBatch:
+    """Columnar view over resource records.
+
+    Field names are case-insensitive (Azure aliases and AWS condition keys
+    both are), so columns are keyed by the lower-cased name.
+    """
+
+    def __init__(self, records: Sequence[Mapping[str, Any]]) -> None:
+        self.size = len(records)
+        self.ids = [str(record.get("id", index)) for index, record in enumerate(records)]
+        self._columns: dict[str, list[Any]] = {}
+        for index, record in enumerate(records):
+            for key, value in record.items():
+                column = self._columns.get(key.lower())
+                if column is None:
+                    column = self._columns[key.lower()] = [None] * self.size
+                column[index] = value
+        self._encoded: dict[str, tuple[list[Any], Any]] = {}
+        self._numbers: dict[str, Any] = {}
+
+    def encoded(self, name: str) -> tuple[list[Any], Any]:
+        """``(distinct values, per-row codes)`` for a column, cached per batch."""
+        name = name.lower()
+        cached = self._encoded.get(name)
+        if cached is None:
+            raw = self._columns.get(name)
+            if raw is None:
+                cached = ([None], _codes([0] * self.size))
+            else:
+                index: dict[Any, int] = {}
+                codes = [index.setdefault(_normalize(value), len(index)) for value in raw]
+                cached = (list(index), _codes(codes))
+            self._encoded[name] = cached
+        return cached
+
+    def numbers(self, name: str) -> Any:
+        """Column as floats with NaN for missing/non-numeric values."""
+        name = name.lower()
+        cached = self._numbers.get(name)
+        if cached is None:
+            raw = self._columns.get(name) or [None] * self.size
+            values = [_to_number(value) for value in raw]
+            cached = self._numbers[name] = _np().asarray(values, dtype=float) if _HAS_NUMPY else values
+        return cached
+
+
+# -- mask helpers (NumPy arrays when available, lists of bools otherwise) -------
+
+Mask = Any
+Matcher = Callable[[ResourceBatch], Mask]
+
+if _HAS_NUMPY:
+
+    def _codes(codes: list[int]) -> Any:
+        return _np().asarray(codes, dtype=_np().intp)
+
+    def _full(size: int, value: bool) -> Mask:
+        return _np().full(size, value, dtype=bool)
+
+    def _broadcast(table: list[bool], codes: Any) -> Mask:
+        return _np().asarray(table, dtype=bool)[codes]
+
+    def _and(left: Mask, right: Mask) -> Mask:
+        return left & right
+
+    def _or(left: Mask, right: Mask) -> Mask:
+        return left | right
+
+    def _not(mask: Mask) -> Mask:
+        return ~mask
+
+    def _compare(values: Any, op: Callable[[Any, Any], Any], target: float) -> Mask:
+        with _np().errstate(invalid="ignore"):
+            return op(values, target)
+
+    def _count(mask: Mask) -> int:
+        return int(_np().count_nonzero(mask))
+
+    def _positions(mask: Mask, limit: int) -> list[int]:
+        return _np().flatnonzero(mask)[:limit].tolist()
+
+else:  # pragma: no cover - exercised only without numpy
+
+    def _codes(codes: list[int]) -> Any:
+        return codes
+
+    def _full(size: int, value: bool) -> Mask:
+        return [value] * size
+
+    def _broadcast(table: list[bool], codes: Any) -> Mask:
+        return [table[code] for code in codes]
+
+    def _and(left: Mask, right: Mask) -> Mask:
+        return [a and b for a, b in zip(left, right)]
+
+    def _or(left: Mask, right: Mask) -> Mask:
+        return [a or b for a, b in zip(left, right)]
+
+    def _not(mask: Mask) -> Mask:
+        return [not value for value in mask]
+
+    def _compare(values: Any, op: Callable[[Any, Any], Any], target: float) -> Mask:
+        return [value == value and op(value, target) for value in values]
+
+    def _count(mask: Mask) -> int:
+        return sum(mask)
+
+    def _positions(mask: Mask, limit: int) -> list[int]:
+        return list(islice((index for index, value in enumerate(mask) if value), limit))
+
+
+def _all_of(matchers: list[Matcher]) -> Matcher:
+    def match(batch: ResourceBatch) -> Mask:
+        result = _full(batch.size, True)
+        for matcher in matchers:
+            result = _and(result, matcher(batch))
+        return result
+    return match
+
+
+def _any_of(matchers: list[Matcher]) -> Matcher:
+    def match(batch: ResourceBatch) -> Mask:
+        result = _full(batch.size, False)
+        for matcher in matchers:
+            result = _or(result, matcher(batch))
+        return result
+    return match
+
+
+def _negate(matcher: Matcher) -> Matcher:
+    return lambda batch: _not(matcher(batch))
+
+
+def _constant(value: bool) -> Matcher:
+    return lambda batch: _full(batch.size, value)
+
+
+def _field(name: str, predicate: Callable[[Any], bool], *, missing: bool = False, multi: str = "any") -> Matcher:
+    """Row-wise ``predicate`` over a column, evaluated once per distinct value.
+
+    ``missing`` is the result for rows without the field; list values match
+    when ``any``/``all`` of their items do.
+    """
+    combine = any if multi == "any" else all
+
+    def evaluate(value: Any) -> bool:
+        if value is None:
+            return missing
+        if isinstance(value, tuple):
+            return combine(predicate(item) for item in value) if value else missing
+        return predicate(value)
+
+    def match(batch: ResourceBatch) -> Mask:
+        distinct, codes = batch.encoded(name)
+        return _broadcast([evaluate(value) for value in distinct], codes)
+    return match
+
+
+def _numeric(name: str, op: Callable[[Any, Any], Any], target: Any) -> Matcher:
+    number = _to_number(target)
+    if math.isnan(number):
+        raise PolicyCompileError(f"Expected a number for '{name}', got {target!r}")
+    return lambda batch: _compare(batch.numbers(name), op, number)
+
+
+def _glob(pattern: str, *, ignore_case: bool) -> re.Pattern[str]:
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE if ignore_case else 0)
+
+
+# -- Azure Policy ----------------------------------------------------------------
+
+_AZURE_PARAMETER = re.compile(r"^\[parameters\('([^']+)'\)\]$", re.IGNORECASE)
+
+_NUMERIC_OPERATORS = {
+    "less": operator.lt,
+    "lessorequals": operator.le,
+    "greater": operator.gt,
+    "greaterorequals": operator.ge,
+}
+
+
+def _azure_match_pattern(pattern: str) -> re.Pattern[str]:
+    # Azure ``match``: '#' is a digit, '?' a letter, '.' any character.
+    translated = "".join(
+        r"\d" if char == "#" else "[A-Za-z]" if char == "?" else "." if char == "." else re.escape(char)
+        for char in pattern
+    )
+    return re.compile(f"^{translated}$", re.IGNORECASE)
+
+
+def _azure_field(name: str, op: str, value: Any) -> Matcher:
+    if op in _NUMERIC_OPERATORS:
+        return _numeric(name, _NUMERIC_OPERATORS[op], value)
+    if op == "exists":
+        present = str(value).lower() == "true"
+        return _field(name, lambda _: present, missing=not present)
+
+    if op in ("in", "notin"):
+        if not isinstance(value, list):
+            raise PolicyCompileError(f"'{op}' on '{name}' expects a list")
+        targets = {str(item).casefold() for item in value}
+        predicate = lambda item: item.casefold() in targets  # noqa: E731
+    elif op in ("equals", "notequals"):
+        target = str(_normalize(value)).casefold()
+        predicate = lambda item: item.casefold() == target  # noqa: E731
+    elif op in ("like", "notlike"):
+        pattern = _glob(str(value), ignore_case=True)
+        predicate = lambda item: pattern.match(item) is not None  # noqa: E731
+    elif op in ("match", "notmatch", "matchinsensitively", "notmatchinsensitively"):
+        pattern = _azure_match_pattern(str(value))
+        predicate = lambda item: pattern.match(item) is not None  # noqa: E731
+    elif op in ("contains", "notcontains"):
+        needle = str(value).casefold()
+        predicate = lambda item: needle in item.casefold()  # noqa: E731
+    else:
+        raise PolicyCompileError(f"Unsupported Azure condition operator '{op}'")
+
+    matcher = _field(name, predicate)
+    return _negate(matcher) if op.startswith("not") else matcher
+
+
+def _azure_condition(node: Any, parameters: Mapping[str, Any]) -> Matcher:
+    if not isinstance(node, Mapping):
+        raise PolicyCompileError("Azure policy conditions must be objects")
+    lowered = {key.lower(): value for key, value in node.items()}
+
+    if "allof" in lowered:
+        return _all_of([_azure_condition(child, parameters) for child in lowered["allof"]])
+    if "anyof" in lowered:
+        return _any_of([_azure_condition(child, parameters) for child in lowered["anyof"]])
+    if "not" in lowered:
+        return _negate(_azure_condition(lowered["not"], parameters))
+    if "field" not in lowered:
+        raise PolicyCompileError("Only 'field' conditions are supported in Azure policy rules")
+
+    name = lowered.pop("field")
+    if len(lowered) != 1:
+        raise PolicyCompileError(f"Condition on '{name}' must have exactly one operator")
+    op, value = next(iter(lowered.items()))
+    return _azure_field(name, op, _azure_resolve(value, parameters))
+
+
+def _azure_resolve(value: Any, parameters: Mapping[str, Any]) -> Any:
+    if isinstance(value, str):
+        reference = _AZURE_PARAMETER.match(value.strip())
+        if reference:
+            name = reference.group(1)
+            if name not in parameters:
+                raise PolicyCompileError(f"Parameter '{name}' has no defaultValue")
+            return parameters[name]
+    return value
+
+
+def _compile_azure(document: Mapping[str, Any]) -> tuple[Matcher, Matcher, str]:
+    properties = document.get("properties", document)
+    rule = properties.get("policyRule") or {}
+    parameters = {
+        name: spec.get("defaultValue")
+        for name, spec in (properties.get("parameters") or {}).items()
+        if isinstance(spec, Mapping) and "defaultValue" in spec
+    }
+    if "if" not in rule:
+        raise PolicyCompileError("Azure policyRule has no 'if' condition")
+
+    effect = str(_azure_resolve((rule.get("then") or {}).get("effect", "audit"), parameters))
+    if effect.lower() == "disabled":
+        return _constant(False), _constant(False), effect
+    return _azure_condition(rule["if"], parameters), _azure_scope(rule["if"], parameters), effect
+
+
+def _azure_scope(condition: Any, parameters: Mapping[str, Any]) -> Matcher:
+    """Resources a rule applies to: its top-level ``type`` conditions, else everything."""
+    lowered = {key.lower(): value for key, value in condition.items()} if isinstance(condition, Mapping) else {}
+    children = lowered.get("allof", [condition])
+    type_conditions = [
+        _azure_condition(child, parameters)
+        for child in children
+        if isinstance(child, Mapping) and str(child.get("field", "")).lower() == "type"
+    ]
+    return _all_of(type_conditions) if type_conditions else _constant(True)
+
+
+# -- AWS IAM / SCP ---------------------------------------------------------------
+
+_AWS_NEGATED = {"stringnotequals", "stringnotequalsignorecase", "stringnotlike", "numericnotequals", "arnnotequals", "arnnotlike"}
+
+_AWS_NUMERIC = {
+    "numericequals": operator.eq,
+    "numericnotequals": operator.eq,
+    "numericlessthan": operator.lt,
+    "numericlessthanequals": operator.le,
+    "numericgreaterthan": operator.gt,
+    "numericgreaterthanequals": operator.ge,
+}
+
+
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _aws_patterns(name: str, patterns: list[Any], *, negate: bool) -> Matcher:
+    if "*" in patterns and not negate:
+        return _constant(True)
+    compiled = [_glob(str(pattern), ignore_case=True) for pattern in patterns]
+    matcher = _field(name, lambda item: any(pattern.match(item) for pattern in compiled))
+    # NotAction/NotResource only apply to records that carry the field.
+    return _and_present(name, _negate(matcher)) if negate else matcher
+
+
+def _and_present(name: str, matcher: Matcher) -> Matcher:
+    present = _field(name, lambda _: True)
+    return lambda batch: _and(present(batch), matcher(batch))
+
+
+def _aws_condition(op_name: str, key: str, values: list[Any]) -> Matcher:
+    op = op_name.lower()
+    multi = "any"
+    if op.startswith("foranyvalue:"):
+        op = op.split(":", 1)[1]
+    elif op.startswith("forallvalues:"):
+        op, multi = op.split(":", 1)[1], "all"
+    if_exists = op.endswith("ifexists")
+    if if_exists:
+        op = op[: -len("ifexists")]
+    negated = op in _AWS_NEGATED
+    missing = if_exists or negated
+
+    if op == "null":
+        expect_missing = str(values[0]).lower() == "true"
+        return _field(key, lambda _: not expect_missing, missing=expect_missing)
+    if op in _AWS_NUMERIC:
+        matcher = _any_of([_numeric(key, _AWS_NUMERIC[op], value) for value in values])
+        if negated:
+            matcher = _negate(matcher)
+        if if_exists:
+            absent = _field(key, lambda _: False, missing=True)
+            matcher = _any_of([matcher, absent])
+        return matcher
+
+    if op in ("stringequals", "stringnotequals", "arnequals", "arnnotequals"):
+        targets = {str(value) for value in values}
+        predicate = lambda item: item in targets  # noqa: E731
+    elif op in ("stringequalsignorecase", "stringnotequalsignorecase"):
+        targets = {str(value).casefold() for value in values}
+        predicate = lambda item: item.casefold() in targets  # noqa: E731
+    elif op in ("stringlike", "stringnotlike", "arnlike", "arnnotlike"):
+        patterns = [_glob(str(value), ignore_case=False) for value in values]
+        predicate = lambda item: any(pattern.match(item) for pattern in patterns)  # noqa: E731
+    elif op == "bool":
+        targets = {str(value).lower() for value in values}
+        predicate = lambda item: item.lower() in targets  # noqa: E731
+    else:
+        raise PolicyCompileError(f"Unsupported IAM condition operator '{op_name}'")
+
+    if negated:
+        return _field(key, lambda item: not predicate(item), missing=missing, multi="all" if multi == "any" else "any")
+    return _field(key, predicate, missing=missing, multi=multi)
+
+
+def _compile_aws(document: Mapping[str, Any]) -> tuple[Matcher, Matcher, str]:
+    statements = _as_list(document.get("Statement"))
+    violations: list[Matcher] = []
+    scopes: list[Matcher] = []
+    for statement in statements:
+        if not isinstance(statement, Mapping) or statement.get("Effect") != "Deny":
+            continue
+        if "Action" in statement:
+            action = _aws_patterns("action", _as_list(statement["Action"]), negate=False)
+        elif "NotAction" in statement:
+            action = _aws_patterns("action", _as_list(statement["NotAction"]), negate=True)
+        else:
+            action = _constant(True)
+        if "NotResource" in statement:
+            resource = _aws_patterns("resource", _as_list(statement["NotResource"]), negate=True)
+        else:
+            resource = _aws_patterns("resource", _as_list(statement.get("Resource", "*")), negate=False)
+
+        conditions = [
+            _aws_condition(op_name, key, _as_list(values))
+            for op_name, block in (statement.get("Condition") or {}).items()
+            for key, values in block.items()
+        ]
+        scope = _all_of([action, resource])
+        scopes.append(scope)
+        violations.append(_all_of([scope, *conditions]))
+
+    if not violations:
+        raise PolicyCompileError("IAM policy has no Deny statements to evaluate")
+    return _any_of(violations), _any_of(scopes), "deny"
+
+
+# -- GCP organization policy ---------------------------------------------------
+
+def _gcp_value_matcher(values: list[Any]) -> Callable[[str], bool]:
+    exact, prefixes = set(), []
+    for value in values:
+        value = str(value)
+        if value.startswith("under:"):
+            prefixes.append(value[len("under:"):])
+        else:
+            exact.add(value[len("is:"):] if value.startswith("is:") else value)
+    return lambda item: item in exact or any(item == prefix or item.startswith(prefix + "/") for prefix in prefixes)
+
+
+def _compile_gcp(document: Mapping[str, Any]) -> tuple[Matcher, Matcher, str]:
+    constraint = str(document["constraint"]).removeprefix("constraints/")
+    applies = _field(constraint, lambda _: True)
+
+    if "booleanPolicy" in document:
+        if not (document["booleanPolicy"] or {}).get("enforced", False):
+            return _constant(False), applies, "not_enforced"
+        return _field(constraint, lambda item: item.lower() != "true"), applies, "enforced"
+
+    if "listPolicy" in document:
+        policy = document["listPolicy"] or {}
+        all_values = str(policy.get("allValues", "")).upper()
+        if all_values == "DENY":
+            return applies, applies, "deny_all"
+        if all_values == "ALLOW":
+            return _constant(False), applies, "allow_all"
+        denied = _gcp_value_matcher(_as_list(policy.get("deniedValues")))
+        allowed_values = _as_list(policy.get("allowedValues"))
+        allowed = _gcp_value_matcher(allowed_values)
+        if allowed_values:
+            predicate = lambda item: denied(item) or not allowed(item)  # noqa: E731
+        else:
+            predicate = denied
+        return _field(constraint, predicate), applies, "list"
+
+    raise PolicyCompileError(f"Constraint '{constraint}' has neither listPolicy nor booleanPolicy")
+
+
+# -- public API ------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    kind: str  # azure | aws | gcp
+    effect: str
+    violates: Matcher
+    applies: Matcher
+
+
+@dataclass
+class PolicyResult:
+    """Evaluation totals for one policy, accumulated across batches."""
+    applicable: int = 0
+    affected: int = 0
+    sample_resource_ids: list[str] = field(default_factory=list)
+
+    @property
+    def status(self) -> models.ComplianceStatus:
+        if not self.applicable:
+            return models.ComplianceStatus.UNKNOWN
+        if self.affected:
+            return models.ComplianceStatus.NON_COMPLIANT
+        return models.ComplianceStatus.COMPLIANT
+
+    @property
+    def findings(self) -> str:
+        if not self.applicable:
+            return "No applicable resources found"
+        summary = f"{self.affected} of {self.applicable} resources non-compliant"
+        if self.sample_resource_ids:
+            more = ", ..." if self.affected > len(self.sample_resource_ids) else ""
+            summary += f": {', '.join(self.sample_resource_ids)}{more}"
+        return summary
+
+
+def compile_policy(content: str | Mapping[str, Any]) -> CompiledPolicy:
+    """Compile a policy document; raises :class:`PolicyCompileError` if unsupported."""
+    if isinstance(content, str):
+        try:
+            document = json.loads(content)
+        except json.JSONDecodeError as exc:
+            raise PolicyCompileError(f"Policy content is not valid JSON: {exc}") from exc
+    else:
+        document = content
+    if not isinstance(document, Mapping):
+        raise PolicyCompileError("Policy content must be a JSON object")
+
+    if "policyRule" in document or "policyRule" in (document.get("properties") or {}):
+        kind, compiled = "azure", _compile_azure(document)
+    elif "Statement" in document:
+        kind, compiled = "aws", _compile_aws(document)
+    elif "constraint" in document:
+        kind, compiled = "gcp", _compile_gcp(document)
+    else:
+        raise PolicyCompileError("Unrecognised policy document format")
+
+    violates, applies, effect = compiled
+    return CompiledPolicy(kind=kind, effect=effect, violates=violates, applies=applies)
+
+
+def content_hash(content: Optional[str]) -> Optional[str]:
+    """SHA-256 of ``policy_content``, stored on ``Policy.content_hash``."""
+    if not content:
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def compile_cached(content: str, digest: Optional[str] = None) -> CompiledPolicy:
+    """:func:`compile_policy` through :data:`~app.cache.compiled_policy_cache`.
+
+    ``digest`` is the stored ``Policy.content_hash`` when available. Compile
+    failures are cached as well, so a bad document is not re-parsed for
+    every account either.
+    """
+    digest = digest or content_hash(content)
+    cached = compiled_policy_cache.get(digest)
+    if cached is None:
+        try:
+            cached = compile_policy(content)
+        except PolicyCompileError as exc:
+            cached = exc
+        compiled_policy_cache.set(digest, cached)
+    if isinstance(cached, PolicyCompileError):
+        raise cached
+    return cached
+
+
+def evaluate_batch(
+    policies: Mapping[int, CompiledPolicy],
+    batch: ResourceBatch,
+    results: dict[int, PolicyResult],
+    *,
+    sample_size: int = 5,
+) -> None:
+    """Add one batch's counts for every policy to ``results``."""
+    for policy_id, policy in policies.items():
+        result = results.setdefault(policy_id, PolicyResult())
+        applies = policy.applies(batch)
+        violations = _and(applies, policy.violates(batch))
+        result.applicable += _count(applies)
+        affected = _count(violations)
+        if affected:
+            result.affected += affected
+            missing = sample_size - len(result.sample_resource_ids)
+            if missing > 0:
+                result.sample_resource_ids.extend(batch.ids[index] for index in _positions(violations, missing))
+
+
+def evaluate(
+    policies: Mapping[int, CompiledPolicy],
+    resources: Iterable[Mapping[str, Any]],
+    *,
+    batch_size: int = 1000,
+    sample_size: int = 5,
+) -> dict[int, PolicyResult]:
+    """Evaluate every policy against ``resources``, streamed in columnar batches."""
+    results = {policy_id: PolicyResult() for policy_id in policies}
+    iterator = iter(resources)
+    while records := list(islice(iterator, batch_size)):
+        evaluate_batch(policies, ResourceBatch(records), results, sample_size=sample_size)
+    return results
@@ -0,0 +1,218 @@
+"""Per-request SQL statement counts, DB time and N+1 detection.
+
+With ``QUERY_PROFILING=true`` every request is tracked by
+:class:`QueryProfilingMiddleware`: statements and their cursor time are
+counted through SQLAlchemy engine events into a context variable, the
+response gets a ``Server-Timing`` header (``db;dur=..;desc="N queries"``
+plus ``app;dur=..``), requests issuing more than ``QUERY_PROFILING_WARN_QUERIES``
+statements, or the same statement ``QUERY_PROFILING_REPEAT_THRESHOLD``
+times, are logged with their most repeated SQL, and per-route totals are
+served by ``GET /health/queries`` worst first.
+
+Tests can hold an endpoint to a budget whether or not profiling is on::
+
+    with profiling.assert_max_queries(4):
+        client.post(f"/accounts/{account_id}/sync", headers=headers)
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import Engine, event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_START_KEY = "profiling_query_start"
+
+
+@dataclass
+class QueryStats:
+    """Statements run in one request (or one :func:`track` block)."""
+
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+
+    def merge(self, other: QueryStats) -> None:
+        self.count += other.count
+        self.duration += other.duration
+        self.statements.update(other.statements)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most frequent first (N+1 candidates)."""
+        return [(sql, times) for sql, times in self.statements.most_common() if times >= threshold]
+
+    def report(self, limit: int = 5) -> str:
+        lines = [f"{self.count} queries, {self.duration * 1000:.1f} ms in the database"]
+        for sql, times in self.statements.most_common(limit):
+            lines.append(f"  {times}x {' '.join(sql.split())[:200]}")
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_install_lock = threading.Lock()
+_installed = False
+_observers: list[Callable[[str, QueryStats], None]] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    starts = conn.info.get(_START_KEY)
+    if stats is None or not starts:
+        return
+    stats.add(statement, time.perf_counter() - starts.pop())
+
+
+def install() -> None:
+    """Listen on every engine (sync, async and replica alike). Idempotent."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Count the statements run in this context (threadpool and async
+    handlers inherit it) until the block exits."""
+    install()
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class RouteStats:
+    """Per-route totals for ``GET /health/queries``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict[str, Any]] = {}
+
+    def record(self, route: str, stats: QueryStats) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(
+                route, {"requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0}
+            )
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["db_ms"] += stats.duration * 1000
+
+    def top(self, limit: int = 10) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "requests": entry["requests"],
+                    "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                    "max_queries": entry["max_queries"],
+                    "avg_db_ms": round(entry["db_ms"] / entry["requests"], 2),
+                }
+                for route, entry in self._routes.items()
+            ]
+        return sorted(rows, key=lambda row: (row["avg_queries"], row["avg_db_ms"]), reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
+
+
+def _route_name(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+def _finish(route: str, stats: QueryStats) -> None:
+    route_stats.record(route, stats)
+    for observer in list(_observers):
+        observer(route, stats)
+    repeated = stats.repeated(settings.query_profiling_repeat_threshold)
+    if stats.count > settings.query_profiling_warn_queries or repeated:
+        logger.warning(
+            "%s issued %s%s",
+            route,
+            stats.report(),
+            f" ({len(repeated)} statement(s) repeated, possible N+1)" if repeated else "",
+        )
+
+
+class QueryProfilingMiddleware:
+    """ASGI middleware: tracks each HTTP request when ``QUERY_PROFILING`` is
+    on or an :func:`assert_max_queries` block is active, and adds
+    ``Server-Timing`` to the response head."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not (settings.query_profiling or _observers):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = (time.perf_counter() - started) * 1000
+                value = (
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed:.1f}'
+                )
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"server-timing", value.encode("latin-1"))]
+            await send(message)
+
+        with track() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _finish(_route_name(scope), stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail with the most repeated statements when the block (direct calls
+    plus any requests it makes through the app) runs more than ``limit``."""
+    total = QueryStats()
+    observer = lambda route, stats: total.merge(stats)  # noqa: E731
+    _observers.append(observer)
+    try:
+        with track() as direct:
+            yield total
+    finally:
+        _observers.remove(observer)
+    total.merge(direct)
+    if total.count > limit:
+        raise AssertionError(f"Query budget of {limit} exceeded: {total.report()}")
+
+
+if settings.query_profiling:
+    install()
@@ -0,0 +1,311 @@
+"""Rate limiting primitives."""
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Optional
+
+from app.config import settings
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` burst, refilled at ``rate`` tokens per second."""
+
+    def __init__(self, *, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` would be available (0 when available now)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = tokens - self._tokens
+            if missing <= 0:
+                return 0.0
+            return missing / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimitStore(ABC):
+    """Shared state behind :class:`LoginRateLimiter`.
+
+    ``consume`` is a token bucket per key; the ``window_*`` methods keep a
+    sliding-window log of event timestamps per key. Times are wall-clock
+    seconds so separate processes sharing a store agree on them.
+    """
+
+    @abstractmethod
+    def consume(self, key: str, *, rate: float, capacity: float, now: float) -> float:
+        """Take one token; return 0 on success, else seconds until one is available."""
+
+    @abstractmethod
+    def window_add(self, key: str, *, window: float, now: float) -> None:
+        """Log one event at ``now``."""
+
+    @abstractmethod
+    def window_hits(self, key: str, *, window: float, now: float) -> tuple[int, Optional[float]]:
+        """``(events in the last window seconds, timestamp of the oldest one)``."""
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Forget the bucket and window of ``key``."""
+
+
+def _bucket_take(tokens: float, updated: float, *, rate: float, capacity: float, now: float) -> tuple[float, float]:
+    """Refill then take one token; return ``(tokens_left, retry_after)`` (tokens_left < 0 = rejected)."""
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate if rate > 0 else float("inf")
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process store; the least recently used keys are dropped past ``max_keys``."""
+
+    def __init__(self, *, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._windows: OrderedDict[str, deque] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _touch(self, table: OrderedDict, key: str) -> None:
+        table.move_to_end(key)
+        while len(table) > self.max_keys:
+            table.popitem(last=False)
+
+    def consume(self, key: str, *, rate: float, capacity: float, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            left, retry_after = _bucket_take(tokens, updated, rate=rate, capacity=capacity, now=now)
+            self._buckets[key] = (left, now)
+            self._touch(self._buckets, key)
+            return retry_after
+
+    def window_add(self, key: str, *, window: float, now: float) -> None:
+        with self._lock:
+            events = self._windows.setdefault(key, deque())
+            events.append(now)
+            self._trim(events, now - window)
+            self._touch(self._windows, key)
+
+    def window_hits(self, key: str, *, window: float, now: float) -> tuple[int, Optional[float]]:
+        with self._lock:
+            events = self._windows.get(key)
+            if not events:
+                return 0, None
+            self._trim(events, now - window)
+            return len(events), (events[0] if events else None)
+
+    @staticmethod
+    def _trim(events: deque, cutoff: float) -> None:
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+            self._windows.pop(key, None)
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Store shared by every API process through Redis.
+
+    Buckets are hashes and windows are sorted sets scored by timestamp, and
+    every key expires once idle. Bucket updates are read-then-write, so
+    concurrent attempts on one key can occasionally both get the last token.
+    That is acceptable for abuse throttling.
+    """
+
+    def __init__(self, client, *, prefix: str = "ratelimit:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def consume(self, key: str, *, rate: float, capacity: float, now: float) -> float:
+        name = f"{self.prefix}bucket:{key}"
+        state = self.client.hgetall(name)
+        tokens = float(state.get(b"tokens", state.get("tokens", capacity)))
+        updated = float(state.get(b"updated", state.get("updated", now)))
+        left, retry_after = _bucket_take(tokens, updated, rate=rate, capacity=capacity, now=now)
+        self.client.hset(name, mapping={"tokens": left, "updated": now})
+        self.client.expire(name, max(1, int(capacity / rate) + 1) if rate > 0 else 3600)
+        return retry_after
+
+    def window_add(self, key: str, *, window: float, now: float) -> None:
+        name = f"{self.prefix}window:{key}"
+        self.client.zadd(name, {f"{now:.6f}:{secrets.token_hex(4)}": now})
+        self.client.zremrangebyscore(name, "-inf", now - window)
+        self.client.expire(name, int(window) + 1)
+
+    def window_hits(self, key: str, *, window: float, now: float) -> tuple[int, Optional[float]]:
+        name = f"{self.prefix}window:{key}"
+        self.client.zremrangebyscore(name, "-inf", now - window)
+        oldest = self.client.zrange(name, 0, 0, withscores=True)
+        if not oldest:
+            return 0, None
+        return int(self.client.zcard(name)), float(oldest[0][1])
+
+    def reset(self, key: str) -> None:
+        self.client.delete(f"{self.prefix}bucket:{key}", f"{self.prefix}window:{key}")
+
+
+class LocalRedis:
+    """In-process stand-in for the handful of Redis commands used by
+    :class:`RedisRateLimitStore`, for running that code path without a server."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, default_factory):
+        expires_at = self._expires.get(name)
+        if expires_at is not None and expires_at <= time.time():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        if name not in self._data and default_factory is not None:
+            self._data[name] = default_factory()
+        return self._data.get(name)
+
+    def hgetall(self, name: str) -> dict:
+        with self._lock:
+            return dict(self._get(name, None) or {})
+
+    def hset(self, name: str, mapping: dict) -> int:
+        with self._lock:
+            self._get(name, dict).update({field: str(value) for field, value in mapping.items()})
+            return len(mapping)
+
+    def zadd(self, name: str, mapping: dict) -> int:
+        with self._lock:
+            self._get(name, dict).update(mapping)
+            return len(mapping)
+
+    def zremrangebyscore(self, name: str, minimum, maximum) -> int:
+        with self._lock:
+            members = self._get(name, None) or {}
+            low, high = float(minimum), float(maximum)
+            doomed = [member for member, score in members.items() if low <= score <= high]
+            for member in doomed:
+                del members[member]
+            return len(doomed)
+
+    def zrange(self, name: str, start: int, end: int, withscores: bool = False) -> list:
+        with self._lock:
+            ordered = sorted((self._get(name, None) or {}).items(), key=lambda item: item[1])
+            selected = ordered[start : (end + 1) if end >= 0 else len(ordered) + end + 1]
+            return selected if withscores else [member for member, _ in selected]
+
+    def zcard(self, name: str) -> int:
+        with self._lock:
+            return len(self._get(name, None) or {})
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            if self._get(name, None) is None:
+                return False
+            self._expires[name] = time.time() + seconds
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            removed = 0
+            for name in names:
+                removed += self._data.pop(name, None) is not None
+                self._expires.pop(name, None)
+            return removed
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limited; retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class LoginRateLimiter:
+    """Throttles ``/auth/login`` before any password work happens.
+
+    Every attempt takes a token from a per-IP and a per-email bucket. Failed
+    attempts are also logged in sliding windows, so an IP or an account that
+    keeps failing is locked out until its oldest failure ages out.
+    """
+
+    def __init__(self, store: RateLimitStore, *, enabled: bool = True) -> None:
+        self.store = store
+        self.enabled = enabled
+
+    @property
+    def blocking(self) -> bool:
+        """True when calls do network I/O, so async callers should run them
+        in the threadpool instead of on the event loop."""
+        return self.enabled and not isinstance(self.store, MemoryRateLimitStore)
+
+    def check(self, ip: str, email: str) -> None:
+        """Raise :class:`RateLimited` if this attempt should be rejected."""
+        if not self.enabled:
+            return
+        now = time.time()
+        window = settings.login_failure_window_seconds
+        for key, limit in (
+            (f"fail:ip:{ip}", settings.login_max_failures_per_ip),
+            (f"fail:email:{email.lower()}", settings.login_max_failures_per_email),
+        ):
+            count, oldest = self.store.window_hits(key, window=window, now=now)
+            if count >= limit:
+                raise RateLimited(max(1.0, oldest + window - now))
+        for key, per_minute, burst in (
+            (f"ip:{ip}", settings.login_ip_per_minute, settings.login_ip_burst),
+            (f"email:{email.lower()}", settings.login_email_per_minute, settings.login_email_burst),
+        ):
+            retry_after = self.store.consume(key, rate=per_minute / 60, capacity=burst, now=now)
+            if retry_after:
+                raise RateLimited(retry_after)
+
+    def record_failure(self, ip: str, email: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        window = settings.login_failure_window_seconds
+        self.store.window_add(f"fail:ip:{ip}", window=window, now=now)
+        self.store.window_add(f"fail:email:{email.lower()}", window=window, now=now)
+
+    def record_success(self, email: str) -> None:
+        if self.enabled:
+            self.store.reset(f"fail:email:{email.lower()}")
+
+
+def _create_store() -> RateLimitStore:
+    if settings.rate_limit_store == "redis":
+        try:
+            import redis  # type: ignore
+        except ImportError as exc:
+            raise RuntimeError(
+                "RATE_LIMIT_STORE=redis needs the redis package (pip install redis); "
+                "use RATE_LIMIT_STORE=memory for a per-process store"
+            ) from exc
+
+        return RedisRateLimitStore(redis.Redis.from_url(settings.redis_url))
+    if settings.rate_limit_store == "local-redis":
+        return RedisRateLimitStore(LocalRedis())
+    return MemoryRateLimitStore()
+
+
+login_limiter = LoginRateLimiter(_create_store(), enabled=settings.rate_limit_enabled)
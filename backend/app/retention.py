@@ -0,0 +1,328 @@
+"""Notification retention: coalescing, expiry and archival.
+
+``notifications`` only ever grows (every sync writes one, every new account
+four), so this job keeps the hot table small:
+
+* ``ACCOUNT_SYNC`` notifications are coalesced into one row per owner and
+  UTC day once the day is ``NOTIFICATION_COALESCE_AFTER_HOURS`` old.
+* Rows older than their type's TTL (``NOTIFICATION_TTL_DAYS``) are deleted
+  in id-ordered chunks of ``RETENTION_CHUNK_SIZE``, one short transaction
+  per chunk, so no long lock is held on the table.
+* Every removed row (coalesced or expired) is first appended to a gzip
+  NDJSON file in ``RETENTION_ARCHIVE_DIR`` when that is set.
+
+The notification counters are adjusted in the same transaction as each
+delete, and broadcast templates left without delivery rows are dropped. Run ``python -m app.retention run [--dry-run]``.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app import fanout, models, notification_counts
+from app.config import settings
+
+COALESCED_TYPES = (models.NotificationType.ACCOUNT_SYNC,)
+# Distinct messages quoted in a coalesced notification before "and N more".
+COALESCE_PREVIEW = 5
+
+
+def parse_ttls(spec: str) -> dict[models.NotificationType, timedelta]:
+    """Parse ``"account_sync=14,provisioning=30"`` (days). Types left out or
+    set to 0 are kept forever."""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, days = item.partition("=")
+        try:
+            notification_type = models.NotificationType(name.strip().lower())
+            days = float(days)
+        except ValueError as exc:
+            raise ValueError(f"Invalid NOTIFICATION_TTL_DAYS entry {item!r}") from exc
+        if days > 0:
+            ttls[notification_type] = timedelta(days=days)
+    return ttls
+
+
+@dataclass
+class RetentionReport:
+    coalesced_groups: int = 0
+    coalesced_rows: int = 0
+    expired: dict[str, int] = field(default_factory=dict)
+    pruned_templates: int = 0
+    archive_path: Optional[str] = None
+
+    @property
+    def removed(self) -> int:
+        return self.coalesced_rows + sum(self.expired.values())
+
+
+class NotificationArchive:
+    """Append-only gzip NDJSON file, opened on the first write.
+
+    Each chunk is flushed and fsynced before the delete that removes those
+    rows commits, so a crash can at worst archive a row twice, never lose it.
+    """
+
+    def __init__(self, directory: Optional[str], now: datetime) -> None:
+        self.path = (
+            os.path.join(directory, f"notifications-{now:%Y%m%dT%H%M%S}.ndjson.gz") if directory else None
+        )
+        self._file = None
+        self._archived_at = now.isoformat()
+        self.written = 0
+
+    def write(self, rows: list[dict], reason: str) -> None:
+        if self.path is None or not rows:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._raw = open(self.path, "ab")
+            self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        for row in rows:
+            record = {
+                "id": row["id"],
+                "owner_id": row["owner_id"],
+                "type": models.NotificationType(row["type"]).value,
+                "title": row["title"],
+                "message": row["message"],
+                "template_id": row["template_id"],
+                "is_read": bool(row["is_read"]),
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                "archived_at": self._archived_at,
+                "reason": reason,
+            }
+            self._file.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.written += len(rows)
+        self._file.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = None
+
+
+def _apply_removed(db: Session, rows: list[dict]) -> None:
+    notification_counts.apply_deltas(
+        db, notification_counts.deltas_for(((row["owner_id"], row["is_read"]) for row in rows), sign=-1)
+    )
+
+
+def _delete_rows(db: Session, ids: list[int]) -> list[dict]:
+    """Delete ``ids`` and return the rows as they were at delete time, with
+    fan-out delivery rows carrying their template's title and message."""
+    table = models.Notification.__table__
+    stmt = delete(table).where(table.c.id.in_(ids))
+    if db.get_bind().dialect.delete_returning:
+        rows = db.execute(stmt.returning(*table.c)).mappings().all()
+    else:
+        rows = db.execute(select(table).where(table.c.id.in_(ids)).with_for_update()).mappings().all()
+        db.execute(stmt)
+    rows = [dict(row) for row in rows]
+
+    template_ids = {row["template_id"] for row in rows if row["template_id"] is not None}
+    if template_ids:
+        template = models.NotificationTemplate
+        templates = {
+            row.id: row for row in db.execute(select(template).where(template.id.in_(template_ids))).scalars()
+        }
+        for row in rows:
+            if row["template_id"] in templates:
+                row["title"] = templates[row["template_id"]].title
+                row["message"] = templates[row["template_id"]].message
+    return rows
+
+
+# -- Coalescing ----------------------------------------------------------------
+def _coalesced_notification(rows: list[dict]) -> models.Notification:
+    messages = Counter(row["message"] for row in rows)
+    preview = "; ".join(
+        message if count == 1 else f"{message} (x{count})"
+        for message, count in messages.most_common(COALESCE_PREVIEW)
+    )
+    if len(messages) > COALESCE_PREVIEW:
+        preview += f"; and {len(messages) - COALESCE_PREVIEW} more"
+    newest = max(rows, key=lambda row: (row["created_at"], row["id"]))
+    return models.Notification(
+        owner_id=newest["owner_id"],
+        type=newest["type"],
+        title=f"{len(rows)} account syncs on {newest['created_at']:%Y-%m-%d}",
+        message=preview,
+        is_read=all(row["is_read"] for row in rows),
+        created_at=newest["created_at"],
+    )
+
+
+def coalesce(
+    db: Session,
+    archive: NotificationArchive,
+    report: RetentionReport,
+    *,
+    before: datetime,
+    dry_run: bool = False,
+) -> None:
+    """Fold same-day ``COALESCED_TYPES`` notifications older than ``before``
+    into one row per owner and day; one transaction per group."""
+    notification = models.Notification
+    day = func.date(notification.created_at)
+    groups = db.execute(
+        select(notification.owner_id, notification.type, day.label("day"))
+        .where(notification.type.in_(COALESCED_TYPES), notification.created_at < before)
+        .group_by(notification.owner_id, notification.type, day)
+        .having(func.count(notification.id) > 1)
+    ).all()
+
+    for owner_id, notification_type, group_day in groups:
+        if isinstance(group_day, str):  # SQLite returns date() as text
+            group_day = date.fromisoformat(group_day)
+        start = datetime.combine(group_day, datetime.min.time())
+        ids = list(
+            db.execute(
+                select(notification.id)
+                .where(
+                    notification.owner_id == owner_id,
+                    notification.type == notification_type,
+                    notification.created_at >= start,
+                    notification.created_at < start + timedelta(days=1),
+                )
+                .order_by(notification.id)
+            ).scalars()
+        )
+        if len(ids) < 2:
+            continue
+        report.coalesced_groups += 1
+        report.coalesced_rows += len(ids)
+        if dry_run:
+            continue
+
+        rows = _delete_rows(db, ids)
+        archive.write(rows, "coalesced")
+        _apply_removed(db, rows)
+        rollup = _coalesced_notification(rows)
+        db.add(rollup)
+        db.flush()
+        notification_counts.on_notifications_created(db, [rollup])
+        db.commit()
+    # A coalesced row is not new; it is not published to open streams.
+
+
+# -- Expiry --------------------------------------------------------------------
+def expire(
+    db: Session,
+    archive: NotificationArchive,
+    report: RetentionReport,
+    *,
+    ttls: dict[models.NotificationType, timedelta],
+    now: datetime,
+    chunk_size: int,
+    dry_run: bool = False,
+) -> None:
+    notification = models.Notification
+    for notification_type, ttl in ttls.items():
+        cutoff = now - ttl
+        expired = (notification.type == notification_type, notification.created_at < cutoff)
+        if dry_run:
+            count = db.execute(select(func.count(notification.id)).where(*expired)).scalar_one()
+            if count:
+                report.expired[notification_type.value] = count
+            continue
+
+        last_id = 0
+        while True:
+            ids = list(
+                db.execute(
+                    select(notification.id)
+                    .where(*expired, notification.id > last_id)
+                    .order_by(notification.id)
+                    .limit(chunk_size)
+                ).scalars()
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            rows = _delete_rows(db, ids)
+            archive.write(rows, "expired")
+            _apply_removed(db, rows)
+            db.commit()
+            report.expired[notification_type.value] = report.expired.get(notification_type.value, 0) + len(rows)
+
+
+def run(
+    db: Session,
+    *,
+    now: Optional[datetime] = None,
+    ttls: Optional[dict[models.NotificationType, timedelta]] = None,
+    coalesce_after: Optional[timedelta] = None,
+    chunk_size: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+) -> RetentionReport:
+    """Coalesce, then expire. Arguments default to the ``settings`` values.
+
+    With ``dry_run`` nothing is written; expiry counts then still include
+    rows that coalescing would have folded first.
+    """
+    now = now or datetime.utcnow()
+    ttls = parse_ttls(settings.notification_ttl_days) if ttls is None else ttls
+    if coalesce_after is None:
+        coalesce_after = timedelta(hours=settings.notification_coalesce_after_hours)
+    chunk_size = max(1, chunk_size or settings.retention_chunk_size)
+    archive = NotificationArchive(archive_dir or settings.retention_archive_dir, now)
+    report = RetentionReport()
+
+    # Only whole UTC days are coalesced, so a day is folded exactly once.
+    coalesce_before = datetime.combine((now - coalesce_after).date(), datetime.min.time())
+    try:
+        coalesce(db, archive, report, before=coalesce_before, dry_run=dry_run)
+        expire(db, archive, report, ttls=ttls, now=now, chunk_size=chunk_size, dry_run=dry_run)
+        if not dry_run:
+            report.pruned_templates = fanout.prune_templates(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        archive.close()
+    report.archive_path = archive.path if archive.written else None
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coalesce, expire and archive old notifications")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed")
+    parser.add_argument("--archive-dir", default=None, help="Overrides RETENTION_ARCHIVE_DIR")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Overrides RETENTION_CHUNK_SIZE")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report = run(db, archive_dir=args.archive_dir, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {report.removed} notifications")
+    print(f"  coalesced: {report.coalesced_rows} rows into {report.coalesced_groups}")
+    for type_name, count in sorted(report.expired.items()):
+        print(f"  expired {type_name}: {count}")
+    if report.pruned_templates:
+        print(f"  pruned {report.pruned_templates} unused broadcast templates")
+    if report.archive_path:
+        print(f"  archived to {report.archive_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Maintained per-owner compliance rollups backing ``GET /dashboard/summary``.
+
+Every change to ``policy_evaluations`` goes through one of the ``on_*`` hooks
+below inside the same transaction, so the dashboard can be served from a
+handful of ``compliance_rollups`` rows instead of aggregating every evaluation.
+
+Run ``python -m app.rollups verify`` to compare the rollups with the source
+tables and ``python -m app.rollups rebuild`` to recompute them.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, delete, exists, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.cache import dashboard_cache, invalidate_dashboard
+from app.database import upsert_insert
+
+STATUS_COLUMNS = {status: status.value for status in models.ComplianceStatus}
+COUNT_COLUMNS = ("accounts", *STATUS_COLUMNS.values())
+
+
+def _status_column(status) -> str:
+    return STATUS_COLUMNS[models.ComplianceStatus(status)]
+
+
+def apply_delta(db: Session, owner_id: Optional[int], provider, deltas: dict[str, int]) -> None:
+    """Add ``deltas`` (column name -> increment) to the owner's provider rollup."""
+    deltas = {column: value for column, value in deltas.items() if value}
+    if owner_id is None or not deltas:
+        return
+
+    table = models.ComplianceRollup.__table__
+    provider = models.CloudProvider(provider)
+    now = datetime.utcnow()
+    insert = upsert_insert(db.get_bind())
+
+    if insert is not None:
+        values = {column: deltas.get(column, 0) for column in COUNT_COLUMNS}
+        stmt = insert(table).values(owner_id=owner_id, provider=provider, updated_at=now, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.owner_id, table.c.provider],
+            set_={
+                **{column: table.c[column] + value for column, value in deltas.items()},
+                "updated_at": now,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    updated = db.execute(
+        table.update()
+        .where(table.c.owner_id == owner_id, table.c.provider == provider)
+        .values(
+            updated_at=now,
+            **{column: table.c[column] + value for column, value in deltas.items()},
+        )
+    )
+    if not updated.rowcount:
+        db.add(models.ComplianceRollup(owner_id=owner_id, provider=provider, **deltas))
+        db.flush()
+
+
+def lock_accounts(db: Session, account_ids) -> None:
+    """Serialize evaluation writes per account until commit.
+
+    Whether an account gains or loses its first evaluation (the ``accounts``
+    column) is derived by counting its evaluations, so two transactions
+    doing that at once could both see only their own row. ``FOR NO KEY
+    UPDATE`` does not conflict with the key-share locks the evaluation
+    foreign keys take, and once it is granted the count sees the other
+    transaction's committed rows. SQLite already serializes writers.
+    """
+    account_ids = sorted(set(account_ids))
+    if not account_ids:
+        return
+    db.execute(
+        select(models.CloudAccount.id)
+        .where(models.CloudAccount.id.in_(account_ids))
+        .order_by(models.CloudAccount.id)
+        .with_for_update(key_share=True)
+    ).all()
+
+
+def _account_has_evaluations(db: Session, account_id: int) -> bool:
+    condition = models.PolicyEvaluation.account_id == account_id
+    return bool(db.execute(select(exists().where(condition))).scalar())
+
+
+# -- Hooks called from crud ----------------------------------------------------
+def on_evaluation_created(db: Session, account: models.CloudAccount, status) -> None:
+    """Count a new evaluation. Call after the insert has been flushed."""
+    lock_accounts(db, [account.id])
+    count = db.execute(
+        select(func.count(models.PolicyEvaluation.id)).where(
+            models.PolicyEvaluation.account_id == account.id
+        )
+    ).scalar_one()
+    deltas = {_status_column(status): 1}
+    if count == 1:
+        deltas["accounts"] = 1
+    apply_delta(db, account.owner_id, account.provider, deltas)
+
+
+def on_evaluation_status_changed(db: Session, account: models.CloudAccount, old_status, new_status) -> None:
+    old_column, new_column = _status_column(old_status), _status_column(new_status)
+    if old_column == new_column:
+        return
+    apply_delta(db, account.owner_id, account.provider, {old_column: -1, new_column: 1})
+
+
+def on_evaluation_deleted(db: Session, account: models.CloudAccount, status) -> None:
+    """Uncount a deleted evaluation. Call after the delete has been flushed."""
+    lock_accounts(db, [account.id])
+    deltas = {_status_column(status): -1}
+    if not _account_has_evaluations(db, account.id):
+        deltas["accounts"] = -1
+    apply_delta(db, account.owner_id, account.provider, deltas)
+
+
+def on_evaluations_upserted(
+    db: Session,
+    accounts: dict[int, models.CloudAccount],
+    changes: list[tuple[int, Optional[models.ComplianceStatus], models.ComplianceStatus]],
+    first_evaluation_accounts: set[int],
+) -> None:
+    """Apply a batch of ``(account_id, old_status, new_status)`` changes in one pass.
+
+    ``old_status`` is ``None`` for inserted rows; ``first_evaluation_accounts``
+    lists accounts that had no evaluations before the batch. Both must be
+    read after :func:`lock_accounts` on the batch's accounts.
+    """
+    deltas: dict[tuple, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for account_id, old_status, new_status in changes:
+        account = accounts[account_id]
+        bucket = deltas[(account.owner_id, account.provider)]
+        if old_status is not None:
+            bucket[_status_column(old_status)] -= 1
+        bucket[_status_column(new_status)] += 1
+    for account_id in first_evaluation_accounts:
+        account = accounts[account_id]
+        deltas[(account.owner_id, account.provider)]["accounts"] += 1
+    for (owner_id, provider), bucket in deltas.items():
+        apply_delta(db, owner_id, provider, bucket)
+
+
+def on_account_deleted(db: Session, account: models.CloudAccount) -> None:
+    """Uncount every evaluation of ``account``. Call before the delete cascades."""
+    lock_accounts(db, [account.id])
+    rows = db.execute(
+        select(models.PolicyEvaluation.status, func.count(models.PolicyEvaluation.id))
+        .where(models.PolicyEvaluation.account_id == account.id)
+        .group_by(models.PolicyEvaluation.status)
+    ).all()
+    if not rows:
+        return
+    deltas = {_status_column(status): -count for status, count in rows}
+    deltas["accounts"] = -1
+    apply_delta(db, account.owner_id, account.provider, deltas)
+
+
+def on_policy_deleted(db: Session, policy_id: int) -> None:
+    """Uncount every evaluation of ``policy_id``. Call before the delete cascades."""
+    lock_accounts(
+        db,
+        db.execute(
+            select(models.PolicyEvaluation.account_id)
+            .where(models.PolicyEvaluation.policy_id == policy_id)
+            .distinct()
+        ).scalars(),
+    )
+    other = aliased(models.PolicyEvaluation)
+    others = (
+        select(other.id)
+        .where(other.account_id == models.CloudAccount.id, other.policy_id != policy_id)
+        .exists()
+    )
+    rows = db.execute(
+        select(
+            models.CloudAccount.owner_id,
+            models.CloudAccount.provider,
+            models.PolicyEvaluation.status,
+            others,
+        )
+        .join(models.CloudAccount, models.PolicyEvaluation.account_id == models.CloudAccount.id)
+        .where(models.PolicyEvaluation.policy_id == policy_id)
+    ).all()
+
+    deltas: dict[tuple, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for owner_id, provider, status, has_others in rows:
+        bucket = deltas[(owner_id, provider)]
+        bucket[_status_column(status)] -= 1
+        if not has_others:
+            bucket["accounts"] -= 1
+    for (owner_id, provider), bucket in deltas.items():
+        apply_delta(db, owner_id, provider, bucket)
+
+
+# -- Reads ---------------------------------------------------------------------
+def get_rollups(db: Session, owner_id: int) -> list[models.ComplianceRollup]:
+    stmt = (
+        select(models.ComplianceRollup)
+        .where(models.ComplianceRollup.owner_id == owner_id)
+        .order_by(models.ComplianceRollup.provider)
+    )
+    return list(db.execute(stmt).scalars())
+
+
+def _aggregate_stmt(owner_id: Optional[int] = None):
+    """Source-of-truth aggregation over ``policy_evaluations`` grouped like the rollups."""
+    status_sums = [
+        func.sum(case((models.PolicyEvaluation.status == status, 1), else_=0)).label(column)
+        for status, column in STATUS_COLUMNS.items()
+    ]
+    stmt = (
+        select(
+            models.CloudAccount.owner_id,
+            models.CloudAccount.provider,
+            func.count(func.distinct(models.CloudAccount.id)).label("accounts"),
+            *status_sums,
+        )
+        .select_from(models.PolicyEvaluation)
+        .join(models.CloudAccount, models.PolicyEvaluation.account_id == models.CloudAccount.id)
+        .where(models.CloudAccount.owner_id.is_not(None))
+        .group_by(models.CloudAccount.owner_id, models.CloudAccount.provider)
+    )
+    if owner_id is not None:
+        stmt = stmt.where(models.CloudAccount.owner_id == owner_id)
+    return stmt
+
+
+def _expected_counts(db: Session, owner_id: Optional[int] = None) -> dict[tuple, dict[str, int]]:
+    expected = {}
+    for row in db.execute(_aggregate_stmt(owner_id)).mappings():
+        expected[(row["owner_id"], row["provider"])] = {column: row[column] or 0 for column in COUNT_COLUMNS}
+    return expected
+
+
+def rebuild(db: Session, owner_id: Optional[int] = None) -> int:
+    """Recompute rollups from ``policy_evaluations``; returns the number of rows written."""
+    table = models.ComplianceRollup.__table__
+    clear = delete(table)
+    if owner_id is not None:
+        clear = clear.where(table.c.owner_id == owner_id)
+    db.execute(clear)
+
+    now = datetime.utcnow()
+    rows = [
+        {"owner_id": owner, "provider": provider, "updated_at": now, **counts}
+        for (owner, provider), counts in _expected_counts(db, owner_id).items()
+    ]
+    if rows:
+        db.execute(table.insert(), rows)
+    db.commit()
+    if owner_id is not None:
+        invalidate_dashboard(owner_id)
+    else:
+        dashboard_cache.clear()
+    return len(rows)
+
+
+def verify(db: Session, owner_id: Optional[int] = None) -> list[dict]:
+    """Return one entry per (owner, provider) whose rollup differs from the source tables."""
+    expected = _expected_counts(db, owner_id)
+    stmt = select(models.ComplianceRollup)
+    if owner_id is not None:
+        stmt = stmt.where(models.ComplianceRollup.owner_id == owner_id)
+
+    actual = {}
+    for rollup in db.execute(stmt).scalars():
+        counts = {column: getattr(rollup, column) for column in COUNT_COLUMNS}
+        if any(counts.values()):
+            actual[(rollup.owner_id, rollup.provider)] = counts
+
+    drift = []
+    for key in sorted(set(expected) | set(actual), key=lambda item: (item[0], item[1].value)):
+        want = expected.get(key, dict.fromkeys(COUNT_COLUMNS, 0))
+        have = actual.get(key, dict.fromkeys(COUNT_COLUMNS, 0))
+        if want != have:
+            drift.append({"owner_id": key[0], "provider": key[1].value, "expected": want, "actual": have})
+    return drift
+
+
+def ensure_backfilled(db: Session) -> bool:
+    """Rebuild once when evaluations exist but no rollups were ever written."""
+    has_rollups = db.execute(select(exists().where(models.ComplianceRollup.id.is_not(None)))).scalar()
+    if has_rollups:
+        return False
+    has_evaluations = db.execute(select(exists().where(models.PolicyEvaluation.id.is_not(None)))).scalar()
+    if not has_evaluations:
+        return False
+    rebuild(db)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild or verify dashboard compliance rollups")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--owner-id", type=int, default=None, help="Limit to a single user")
+    parser.add_argument("--repair", action="store_true", help="Rebuild when verify finds drift")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = rebuild(db, owner_id=args.owner_id)
+            print(f"Rebuilt {written} rollup rows")
+            return
+
+        drift = verify(db, owner_id=args.owner_id)
+        if not drift:
+            print("Rollups match policy_evaluations")
+            return
+        for entry in drift:
+            print(f"owner={entry['owner_id']} provider={entry['provider']} "
+                  f"expected={entry['expected']} actual={entry['actual']}")
+        if args.repair:
+            rebuild(db, owner_id=args.owner_id)
+            print(f"Repaired {len(drift)} drifted rollups")
+            return
+        raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
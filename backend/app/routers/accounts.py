@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List
@@ -10,8 +12,10 @@ from app.models import NotificationType
 from app.database import get_db_session
 from app.models import CloudAccount, CloudProvider, AccountStatus
 from app.schemas import CloudAccountCreate, CloudAccountUpdate, CloudAccountResponse
-from app import crud, schemas, models
-from app.deps import get_db, get_current_user
+from app import collectors, crud, crud_async, schemas, models
+from app.deps import get_async_db, get_current_user_async
+from app.pagination import NEXT_CURSOR_HEADER
+from app.sync import sync_engine
 
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
@@ -19,24 +23,38 @@ router = APIRouter(prefix="/accounts", tags=["accounts"])
 
 
 @router.get("/", response_model=list[schemas.AccountRead])
-def list_accounts(
+async def list_accounts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
-    """Get all cloud accounts for the current user."""
-    return crud.get_accounts(db, current_user=current_user, skip=skip, limit=limit)
+    """Get cloud accounts for the current user, newest first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the next page.
+    """
+    try:
+        page = await crud_async.get_accounts(db, current_user=current_user, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.get("/{account_id}", response_model=schemas.AccountRead)
-def get_account(
+async def get_account(
     account_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
     """Get a specific account by ID (only if user owns it)."""
-    account = crud.get_account(db, current_user=current_user, account_id=account_id)
+    account = await crud_async.get_account(db, current_user=current_user, account_id=account_id)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,14 +64,14 @@ def get_account(
 
 
 @router.post("/", response_model=schemas.AccountRead, status_code=status.HTTP_201_CREATED)
-def create_account(
+async def create_account(
     account_in: schemas.AccountCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
     """Create a new cloud account for the current user."""
     try:
-        account = crud.create_account(db, current_user=current_user, account_in=account_in)
+        account = await db.run_sync(crud.create_account, current_user=current_user, account_in=account_in)
         return account
     except ValueError as e:
         raise HTTPException(
@@ -63,15 +81,15 @@ def create_account(
 
 
 @router.patch("/{account_id}", response_model=schemas.AccountRead)
-def update_account(
+async def update_account(
     account_id: int,
     account_in: schemas.AccountUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
     """Update an existing cloud account (only if user owns it)."""
-    account = crud.update_account(
-        db, 
+    account = await db.run_sync(
+        crud.update_account,
         current_user=current_user,
         account_id=account_id, 
         account_in=account_in
@@ -85,13 +103,13 @@ def update_account(
 
 
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_account(
+async def delete_account(
     account_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
     """Delete a cloud account (only if user owns it)."""
-    deleted = crud.delete_account(db, current_user=current_user, account_id=account_id)
+    deleted = await db.run_sync(crud.delete_account, current_user=current_user, account_id=account_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -100,56 +118,86 @@ def delete_account(
 
 
 # In accounts router - sync endpoint
-@router.post("/{account_id}/sync", response_model=schemas.AccountRead)
-def sync_account(
+@router.post("/{account_id}/sync", response_model=schemas.SyncJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def sync_account(
     account_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
-    """Trigger a manual sync for a cloud account."""
-    account = crud.get_account(db, current_user=current_user, account_id=account_id)
-    if not account:
+    """
+    Queue a manual sync for a cloud account.
+    
+    Returns immediately with the sync job; poll
+    `GET /accounts/{account_id}/sync/{job_id}` for progress. Responds `409`
+    when no collector can sync the account's provider.
+    """
+    try:
+        job = await db.run_sync(_queue_sync, current_user=current_user, account_id=account_id)
+    except collectors.NoCollectorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
-
-    # Update sync timestamp
-    account_update = schemas.AccountUpdate(last_synced_at=datetime.utcnow())
-    updated = crud.update_account(
-        db, 
-        current_user=current_user,
-        account_id=account_id, 
-        account_in=account_update
-    )
     
-    if updated:
+    return job
+
+
+def _queue_sync(db: Session, current_user: models.User, account_id: int) -> models.SyncJob | None:
+    account = crud.get_account(db, current_user=current_user, account_id=account_id)
+    if not account:
+        return None
+
+    collectors.require_collector(account)
+    job, created = crud.create_sync_job(db, account)
+    if created:
+        sync_engine.submit(job.id)
         # Create notification for THIS user
         crud.create_notification(
             db,
             current_user=current_user,  # Pass current_user
             notification_in=schemas.NotificationCreate(
                 title="Manual sync requested",
-                message=f"{updated.display_name} is syncing now.",
+                message=f"{account.display_name} is syncing now.",
                 type=models.NotificationType.ACCOUNT_SYNC,
             ),
         )
-    
-    return updated
+    return job
+
+
+@router.get("/{account_id}/sync/{job_id}", response_model=schemas.SyncJobRead)
+async def get_sync_job(
+    account_id: int,
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    """Get the progress of a sync job (only if user owns the account)."""
+    job = await crud_async.get_sync_job(db, current_user=current_user, account_id=account_id, job_id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sync job not found"
+        )
+    return job
 
 
 @router.get("/{account_id}/validate", response_model=dict)
-def validate_account(
+async def validate_account(
     account_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
     """
     Validate cloud account credentials (only if user owns it).
     
     Returns validation status and any error messages.
     """
-    account = crud.get_account(db, current_user=current_user, account_id=account_id)
+    account = await crud_async.get_account(db, current_user=current_user, account_id=account_id)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -166,19 +214,10 @@ def validate_account(
     }
 
 
-def get_db():
-    """Dependency to get database session."""
-    db = get_db_session()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/", response_model=CloudAccountResponse, status_code=status.HTTP_201_CREATED)
 async def create_cloud_account(
     account_data: CloudAccountCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new cloud account connection.
@@ -189,10 +228,14 @@ async def create_cloud_account(
     **Important**: In production, credentials should be encrypted before storing.
     """
     # Check if account already exists
-    existing_account = db.query(CloudAccount).filter(
-        CloudAccount.provider == account_data.provider,
-        CloudAccount.external_id == account_data.external_id
-    ).first()
+    existing_account = (
+        await db.execute(
+            select(CloudAccount).where(
+                CloudAccount.provider == account_data.provider,
+                CloudAccount.external_id == account_data.external_id
+            )
+        )
+    ).scalars().first()
     
     if existing_account:
         raise HTTPException(
@@ -217,8 +260,8 @@ async def create_cloud_account(
     )
     
     db.add(new_account)
-    db.commit()
-    db.refresh(new_account)
+    await db.commit()
+    await db.refresh(new_account)
     
     # TODO: Trigger async validation and provisioning process
     # This would validate credentials and update status to CONNECTED or ERROR
@@ -230,7 +273,7 @@ async def create_cloud_account(
 async def get_cloud_accounts(
     provider: str = None,
     status: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all cloud accounts with optional filtering.
@@ -239,11 +282,11 @@ async def get_cloud_accounts(
     - provider: Filter by cloud provider (aws, azure, gcp)
     - status: Filter by account status (connected, pending, error)
     """
-    query = db.query(CloudAccount)
+    query = select(CloudAccount)
     
     if provider:
         try:
-            query = query.filter(CloudAccount.provider == CloudProvider(provider))
+            query = query.where(CloudAccount.provider == CloudProvider(provider))
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -252,26 +295,26 @@ async def get_cloud_accounts(
     
     if status:
         try:
-            query = query.filter(CloudAccount.status == AccountStatus(status))
+            query = query.where(CloudAccount.status == AccountStatus(status))
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid status: {status}"
             )
     
-    accounts = query.order_by(CloudAccount.created_at.desc()).all()
+    accounts = (await db.execute(query.order_by(CloudAccount.created_at.desc()))).scalars().all()
     return accounts
 
 
 @router.get("/{account_id}", response_model=CloudAccountResponse)
 async def get_cloud_account(
     account_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a specific cloud account by ID.
     """
-    account = db.query(CloudAccount).filter(CloudAccount.id == account_id).first()
+    account = (await db.execute(select(CloudAccount).where(CloudAccount.id == account_id))).scalar_one_or_none()
     
     if not account:
         raise HTTPException(
@@ -286,14 +329,14 @@ async def get_cloud_account(
 async def update_cloud_account(
     account_id: int,
     account_data: CloudAccountUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an existing cloud account.
     
     Only provided fields will be updated. Fields set to None will be ignored.
     """
-    account = db.query(CloudAccount).filter(CloudAccount.id == account_id).first()
+    account = (await db.execute(select(CloudAccount).where(CloudAccount.id == account_id))).scalar_one_or_none()
     
     if not account:
         raise HTTPException(
@@ -312,8 +355,8 @@ async def update_cloud_account(
     
     account.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(account)
+    await db.commit()
+    await db.refresh(account)
     
     return account
 
@@ -321,14 +364,14 @@ async def update_cloud_account(
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_cloud_account(
     account_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a cloud account.
     
     This will also delete all associated policy evaluations due to cascade delete.
     """
-    account = db.query(CloudAccount).filter(CloudAccount.id == account_id).first()
+    account = (await db.execute(select(CloudAccount).where(CloudAccount.id == account_id))).scalar_one_or_none()
     
     if not account:
         raise HTTPException(
@@ -336,65 +379,23 @@ async def delete_cloud_account(
             detail=f"Account with ID {account_id} not found"
         )
     
-    db.delete(account)
-    db.commit()
+    await db.delete(account)
+    await db.commit()
     
     return None
 
 
-@router.post("/{account_id}/sync", response_model=CloudAccountResponse)
-async def sync_cloud_account(
-    account_id: int,
-    db: Session = Depends(get_db)
-):
-    """
-    Trigger a manual sync for a cloud account.
-    
-    This endpoint initiates a sync operation that:
-    1. Validates the account credentials
-    2. Fetches the latest resources and configurations
-    3. Updates policy evaluations
-    4. Updates the last_synced_at timestamp
-    """
-    account = db.query(CloudAccount).filter(CloudAccount.id == account_id).first()
-    
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Account with ID {account_id} not found"
-        )
-    
-    # TODO: Implement actual sync logic here
-    # This would:
-    # 1. Validate credentials
-    # 2. Fetch resources from cloud provider
-    # 3. Update policy evaluations
-    # 4. Update status
-    
-    account.last_synced_at = datetime.utcnow()
-    account.updated_at = datetime.utcnow()
-    
-    # For now, just mark as connected if it was pending
-    if account.status == AccountStatus.PENDING:
-        account.status = AccountStatus.CONNECTED
-    
-    db.commit()
-    db.refresh(account)
-    
-    return account
-
-
 @router.get("/{account_id}/validate", response_model=dict)
 async def validate_cloud_account(
     account_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Validate cloud account credentials without performing a full sync.
     
     Returns validation status and any error messages.
     """
-    account = db.query(CloudAccount).filter(CloudAccount.id == account_id).first()
+    account = (await db.execute(select(CloudAccount).where(CloudAccount.id == account_id))).scalar_one_or_none()
     
     if not account:
         raise HTTPException(
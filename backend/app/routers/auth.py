@@ -1,19 +1,24 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import math
 
-from app import crud, schemas
-from app.deps import get_db, get_password_manager
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, crud_async, schemas
+from app.deps import get_async_db, get_password_manager
 from datetime import datetime, timedelta
 from jose import jwt
 from pydantic import BaseModel
 from app.config import settings
+from app.ratelimit import RateLimited, login_limiter
 
 
-def create_access_token(user_id: int) -> str:
+def create_access_token(user_id: int, token_version: int = 0) -> str:
     payload = {
         "sub": str(user_id),
+        "ver": token_version,
         "exp": datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes),
     }
     return jwt.encode(
@@ -35,11 +40,11 @@ def _password_manager():
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_in: schemas.UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    existing = crud.get_user_by_email(db, email=user_in.email)
+    existing = await crud_async.get_user_by_email(db, email=user_in.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,14 +52,15 @@ def register_user(
         )
 
     password_manager = _password_manager()
+    hashed_password = await password_manager.hash_async(user_in.password)
 
-    user = crud.create_user(
-        db,
+    user = await db.run_sync(
+        crud.create_user,
         user_in=user_in,
-        password_hasher=password_manager.hash,
+        password_hasher=lambda _password: hashed_password,
     )
 
-    token = create_access_token(user.id)
+    token = create_access_token(user.id, user.token_version or 0)
 
     return {
         "access_token": token,
@@ -63,28 +69,64 @@ def register_user(
 
 
 
+def _client_ip(request: Request) -> str:
+    if settings.rate_limit_trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _limiter(call, *args) -> None:
+    # The Redis store is a synchronous client: keep its round trips off the loop.
+    if login_limiter.blocking:
+        await run_in_threadpool(call, *args)
+    else:
+        call(*args)
+
+
 @router.post("/login", response_model=Token)
-def login_user(
+async def login_user(
+    request: Request,
     credentials: schemas.UserLogin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    """Verify the password off the event loop; stored hashes using an older
+    scheme or cost are transparently replaced with the current one.
+
+    Attempts over the per-IP / per-email limits get ``429`` with
+    ``Retry-After`` before any database or hashing work.
+    """
+    ip = _client_ip(request)
+    try:
+        await _limiter(login_limiter.check, ip, credentials.email)
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
     password_manager = _password_manager()
-    user = crud.authenticate_user(
-        db,
-        email=credentials.email,
-        password=credentials.password,
-        password_verifier=password_manager.verify,
-    )
-    if not user:
+    user = await crud_async.get_user_by_email(db, email=credentials.email)
+    verified, new_hash = False, None
+    if user is not None:
+        verified, new_hash = await password_manager.verify_and_update_async(
+            credentials.password, user.hashed_password
+        )
+    if not verified:
+        await _limiter(login_limiter.record_failure, ip, credentials.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+    if new_hash:
+        await db.run_sync(crud.update_password_hash, user, new_hash)
+    await _limiter(login_limiter.record_success, credentials.email)
 
-    token = create_access_token(user.id)
+    token = create_access_token(user.id, user.token_version or 0)
 
     return {
         "access_token": token,
         "token_type": "bearer",
     }
-
@@ -1,16 +1,32 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app import crud, schemas, models
-from app.deps import get_db, get_current_user
+from app.deps import get_read_db, get_current_user
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/summary", response_model=schemas.DashboardSnapshot)
 def get_summary(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    """Get dashboard summary for current user's accounts."""
-    return crud.build_dashboard_snapshot(db, current_user=current_user)
\ No newline at end of file
+    """Get dashboard summary for current user's accounts.
+
+    Responses carry an ``ETag``; pollers sending it back in ``If-None-Match``
+    get an empty ``304 Not Modified`` while the snapshot is unchanged.
+    """
+    etag, body = crud.get_dashboard_body(db, current_user=current_user)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,23 +1,176 @@
 """Notification API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app import crud, schemas, models
-from app.deps import get_db, get_current_user
+from app import crud, crud_async, schemas, models
+from app.database import AsyncSessionLocal
+from app.deps import (
+    get_async_read_db,
+    get_current_user,
+    get_current_user_async,
+    get_current_user_stream,
+    get_db,
+)
+from app.events import notification_event, notification_hub
+from app.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 @router.get("/", response_model=list[schemas.NotificationRead])
-def list_notifications(
+async def list_notifications(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user_async),
 ):
-    """Get all notifications for current user."""
-    return crud.get_notifications(db, current_user=current_user, skip=skip, limit=limit)
+    """Get notifications for current user, newest first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the next page.
+    """
+    try:
+        page = await crud_async.get_notifications(db, current_user=current_user, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+HEARTBEAT_SECONDS = 15.0
+BACKLOG_BATCH_SIZE = 100
+
+
+def _last_event_id(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+
+async def _backlog(owner_id: int, after_id: int):
+    """Notifications committed after ``after_id``, read from the primary."""
+    if AsyncSessionLocal is None:
+        return
+    while True:
+        async with AsyncSessionLocal() as db:
+            batch = await crud_async.get_notifications_after(db, owner_id, after_id, limit=BACKLOG_BATCH_SIZE)
+        for notification in batch:
+            yield notification_event(notification)
+        if len(batch) < BACKLOG_BATCH_SIZE:
+            return
+        after_id = batch[-1].id
+
+
+async def _notification_events(owner_id: int, last_event_id: int | None, is_disconnected):
+    """Yield backlog then live events for ``owner_id``; None means heartbeat."""
+    with notification_hub.subscribe(owner_id) as subscription:
+        # Subscribe before reading the backlog so nothing committed in between is lost.
+        if last_event_id is not None:
+            async for event in _backlog(owner_id, last_event_id):
+                last_event_id = event["id"]
+                yield event
+        while not await is_disconnected():
+            event = await subscription.next(HEARTBEAT_SECONDS)
+            if event is None:
+                if subscription.overflowed:
+                    return  # too far behind; the client resumes via Last-Event-ID
+                yield None
+            elif last_event_id is None or event["id"] > last_event_id:
+                last_event_id = event["id"]
+                yield event
+
+
+@router.get("/unread-count", response_model=schemas.UnreadCount)
+async def unread_count(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    """Unread notifications for the badge, from the maintained per-user counter."""
+    return {"unread": await crud_async.get_unread_count(db, current_user=current_user)}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    last_event_id: int | None = None,
+    current_user: models.User = Depends(get_current_user_stream),
+):
+    """Server-sent events: one ``notification`` event per new notification.
+
+    Authenticate with the usual header or ``?token=``. Reconnects send
+    ``Last-Event-ID`` (or ``?last_event_id=``) and first receive everything
+    newer than it.
+    """
+    resume_from = _last_event_id(request.headers.get("last-event-id"))
+    if resume_from is None:
+        resume_from = last_event_id
+
+    async def body():
+        yield "retry: 5000\n\n"
+        async for event in _notification_events(current_user.id, resume_from, request.is_disconnected):
+            yield ": keepalive\n\n" if event is None else _sse(event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def notifications_websocket(websocket: WebSocket, token: str = "", last_event_id: int | None = None):
+    """WebSocket variant of :func:`stream_notifications`; sends one JSON
+    notification per message. Authenticate with ``?token=``."""
+    if AsyncSessionLocal is None:
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            current_user = await get_current_user_async(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    disconnected = False
+
+    async def watch_disconnect():
+        nonlocal disconnected
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            disconnected = True
+
+    watcher = asyncio.create_task(watch_disconnect())
+
+    async def is_disconnected() -> bool:
+        return disconnected
+
+    try:
+        async for event in _notification_events(current_user.id, last_event_id, is_disconnected):
+            if event is not None:
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
 
 
 @router.post("/", response_model=schemas.NotificationRead, status_code=status.HTTP_201_CREATED)
@@ -67,20 +220,8 @@ def delete_notification(
     current_user: models.User = Depends(get_current_user),
 ):
     """Delete a notification (only if user owns it)."""
-    db_notification = (
-        db.query(models.Notification)
-        .filter(
-            models.Notification.id == notification_id,
-            models.Notification.owner_id == current_user.id
-        )
-        .first()
-    )
-    
-    if not db_notification:
+    if not crud.delete_notification(db, current_user=current_user, notification_id=notification_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    
-    db.delete(db_notification)
-    db.commit()
\ No newline at end of file
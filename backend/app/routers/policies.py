@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
-from app.deps import get_db, get_current_user
+from app.config import settings
+from app.database import SessionLocal
+from app.deps import get_db, get_read_db, get_current_user
+from app.pagination import NEXT_CURSOR_HEADER
 from app import models
 
 
@@ -18,18 +30,76 @@ router = APIRouter(prefix="/policies", tags=["policies"])
 
 @router.get("/evaluations", response_model=list[schemas.EvaluationRead])
 def list_evaluations(
+    response: Response,
     skip: int = 0,
     limit: int = 1000,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
-    Retrieve all policy evaluations with optional pagination.
+    Retrieve policy evaluations, most recently checked first.
     
     - **skip**: Number of records to skip (default: 0)
     - **limit**: Maximum number of records to return (default: 1000)
+    - **cursor**: Value of the previous page's `X-Next-Cursor` header
     """
-    return crud.get_evaluations_list(db, current_user=current_user, skip=skip, limit=limit)
+    try:
+        page = crud.get_evaluations_list(
+            db, current_user=current_user, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+def _stream_export(owner_id: int, export_format: str) -> Iterator[str]:
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the generator owns its own session for the lifetime of the download.
+    db = SessionLocal()
+    try:
+        rows = crud.iter_evaluation_export_rows(db, owner_id, batch_size=settings.export_batch_size)
+        if export_format == "ndjson":
+            for row in rows:
+                yield json.dumps(row) + "\n"
+            return
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=crud.EXPORT_COLUMNS)
+        writer.writeheader()
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if count % settings.export_batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/evaluations/export")
+def export_evaluations(
+    export_format: str = Query(default="csv", alias="format", pattern="^(csv|ndjson)$"),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Stream every policy evaluation for the current user as CSV or NDJSON.
+    
+    - **format**: `csv` (default) or `ndjson`
+    """
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"evaluations-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        _stream_export(current_user.id, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/evaluations/{evaluation_id}", response_model=schemas.EvaluationRead)
@@ -70,6 +140,72 @@ def create_evaluation(
         )
 
 
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    if "ndjson" in content_type:
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    payload = json.loads(body or b"[]")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array of evaluations")
+    return payload
+
+
+@router.post("/evaluations/bulk", response_model=schemas.BulkEvaluationResponse)
+async def bulk_upsert_evaluations(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Create or update many evaluations in one request.
+    
+    Accepts a JSON array or an NDJSON body (`Content-Type: application/x-ndjson`)
+    of evaluation objects. Existing (policy_id, account_id) pairs are updated in
+    place; every item gets a result entry at the same index.
+    """
+    try:
+        raw_items = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed bulk body: {e}"
+        )
+    if len(raw_items) > settings.bulk_ingest_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_ingest_max_items} evaluations per request"
+        )
+
+    results: list[schemas.BulkEvaluationResult | None] = [None] * len(raw_items)
+    valid_items: list[schemas.EvaluationCreate] = []
+    positions: list[int] = []
+    for index, raw in enumerate(raw_items):
+        try:
+            valid_items.append(schemas.EvaluationCreate.model_validate(raw))
+            positions.append(index)
+        except ValidationError as e:
+            results[index] = schemas.BulkEvaluationResult(
+                index=index, status="error", detail=str(e.errors(include_url=False))
+            )
+
+    outcomes = await run_in_threadpool(
+        crud.bulk_upsert_evaluations,
+        db,
+        current_user.id,
+        valid_items,
+        batch_size=settings.bulk_ingest_batch_size,
+        positions=positions,
+    )
+    for position, outcome in zip(positions, outcomes):
+        results[position] = outcome
+
+    return schemas.BulkEvaluationResponse(
+        created=sum(result.status == "created" for result in results),
+        updated=sum(result.status == "updated" for result in results),
+        failed=sum(result.status == "error" for result in results),
+        results=results,
+    )
+
+
 @router.patch("/evaluations/{evaluation_id}", response_model=schemas.EvaluationRead)
 def update_evaluation(
     evaluation_id: int,
@@ -117,18 +253,30 @@ def delete_evaluation(
 
 @router.get("/", response_model=list[schemas.PolicyRead])
 def list_policies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
-    Retrieve all policies with optional pagination.
+    Retrieve policies, oldest first.
     
     - **skip**: Number of records to skip (default: 0)
     - **limit**: Maximum number of records to return (default: 100)
+    - **cursor**: Value of the previous page's `X-Next-Cursor` header
     """
-    return crud.get_policies(db, current_user=current_user, skip=skip, limit=limit)
+    try:
+        page = crud.get_policies(db, current_user=current_user, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.post("/", response_model=schemas.PolicyRead, status_code=status.HTTP_201_CREATED)
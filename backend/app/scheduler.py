@@ -0,0 +1,272 @@
+"""In-process scheduler that queues syncs according to ``CloudAccount.sync_frequency``.
+
+Due times live in a min-heap keyed on ``last sync attempt + interval`` plus a
+per-account jitter, so accounts created or synced together drift apart
+instead of all firing at the top of the hour. Dispatch is capped globally
+(``SCHEDULER_MAX_CONCURRENCY``) and per provider with token buckets, and a
+lease row in ``scheduler_leases`` makes sure only one app instance schedules.
+Accounts no registered collector can sync are left out instead of being
+queued into jobs that can only fail.
+
+Enable with ``SCHEDULER_ENABLED=true``.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import socket
+import threading
+import uuid
+import zlib
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import collectors, crud, models
+from app.config import settings
+from app.database import SessionLocal
+from app.ratelimit import TokenBucket
+from app.sync import SyncEngine, sync_engine
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVALS = {
+    "Hourly": timedelta(hours=1),
+    "Daily": timedelta(days=1),
+    "Weekly": timedelta(weeks=1),
+}
+
+
+def sync_interval(frequency: Optional[str]) -> Optional[timedelta]:
+    """Interval for a ``sync_frequency`` value; ``None`` for Manual/unknown."""
+    return SYNC_INTERVALS.get(frequency or "")
+
+
+def jitter(account_id: int, interval: timedelta, max_jitter: float) -> timedelta:
+    """Stable per-account offset of up to 10% of the interval (capped at ``max_jitter``)."""
+    spread = min(interval.total_seconds() * 0.1, max_jitter)
+    fraction = (zlib.crc32(str(account_id).encode("ascii")) % 10_000) / 10_000
+    return timedelta(seconds=spread * fraction)
+
+
+def next_due(
+    account_id: int,
+    frequency: Optional[str],
+    last_attempt: Optional[datetime],
+    created_at: datetime,
+    *,
+    max_jitter: float,
+) -> Optional[datetime]:
+    """When the account should next sync; never-synced accounts are due from creation."""
+    interval = sync_interval(frequency)
+    if interval is None:
+        return None
+    base = last_attempt + interval if last_attempt else created_at
+    return base + jitter(account_id, interval, max_jitter)
+
+
+class LeaderLease:
+    """Time-limited lease row; whoever holds an unexpired lease is the leader."""
+
+    def __init__(self, name: str, *, ttl: float, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.name = name
+        self.ttl = timedelta(seconds=ttl)
+        self.session_factory = session_factory
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; returns whether this process is the leader."""
+        table = models.SchedulerLease.__table__
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            renewed = db.execute(
+                table.update()
+                .where(
+                    table.c.name == self.name,
+                    or_(table.c.holder == self.holder, table.c.expires_at < now),
+                )
+                .values(holder=self.holder, expires_at=now + self.ttl)
+            )
+            if renewed.rowcount:
+                db.commit()
+                return True
+            try:
+                db.execute(table.insert().values(name=self.name, holder=self.holder, expires_at=now + self.ttl))
+                db.commit()
+                return True
+            except IntegrityError:
+                db.rollback()
+                return False
+        finally:
+            db.close()
+
+    def release(self) -> None:
+        table = models.SchedulerLease.__table__
+        db = self.session_factory()
+        try:
+            db.execute(table.delete().where(table.c.name == self.name, table.c.holder == self.holder))
+            db.commit()
+        finally:
+            db.close()
+
+
+class SyncScheduler:
+    def __init__(
+        self,
+        *,
+        engine: SyncEngine = sync_engine,
+        session_factory: Callable[[], Session] = SessionLocal,
+        tick_seconds: float = settings.scheduler_tick_seconds,
+        refresh_seconds: float = settings.scheduler_refresh_seconds,
+        max_concurrency: int = settings.scheduler_max_concurrency,
+        provider_rate_per_minute: float = settings.scheduler_provider_rate_per_minute,
+        max_jitter_seconds: float = settings.scheduler_max_jitter_seconds,
+        lease_seconds: float = settings.scheduler_lease_seconds,
+    ) -> None:
+        self.engine = engine
+        self.session_factory = session_factory
+        self.tick_seconds = tick_seconds
+        self.refresh_seconds = refresh_seconds
+        self.max_concurrency = max_concurrency
+        self.max_jitter_seconds = max_jitter_seconds
+        self.lease = LeaderLease("account-sync-scheduler", ttl=lease_seconds, session_factory=session_factory)
+        self.buckets = {
+            provider: TokenBucket(
+                rate=provider_rate_per_minute / 60.0,
+                capacity=max(1.0, provider_rate_per_minute / 6.0),
+            )
+            for provider in models.CloudProvider
+        }
+        self._heap: list[tuple[datetime, int, models.CloudProvider]] = []
+        self._in_flight: dict[int, Future] = {}
+        self._last_refresh: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- lifecycle -----------------------------------------------------------
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sync-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.tick_seconds + 1)
+            self._thread = None
+        self.lease.release()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:  # keep the loop alive across transient DB errors
+                logger.exception("Sync scheduler tick failed")
+            self._stop.wait(self.tick_seconds)
+
+    # -- scheduling ----------------------------------------------------------
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Run one tick; returns the number of sync jobs queued."""
+        now = now or datetime.utcnow()
+        if not self.lease.acquire():
+            self._heap.clear()
+            self._last_refresh = None
+            return 0
+
+        db = self.session_factory()
+        try:
+            if self._last_refresh is None or (now - self._last_refresh).total_seconds() >= self.refresh_seconds:
+                crud.fail_stale_sync_jobs(db, now=now)
+                self._refresh(db, now)
+            return self._dispatch(db, now)
+        finally:
+            db.close()
+
+    def _refresh(self, db: Session, now: datetime) -> None:
+        """Rebuild the heap from the accounts table."""
+        providers = [provider for provider in models.CloudProvider if collectors.get_collector(provider)]
+        last_attempt = (
+            select(models.SyncJob.account_id, func.max(models.SyncJob.created_at).label("attempted_at"))
+            .group_by(models.SyncJob.account_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(
+                models.CloudAccount.id,
+                models.CloudAccount.provider,
+                models.CloudAccount.sync_frequency,
+                models.CloudAccount.last_synced_at,
+                models.CloudAccount.created_at,
+                last_attempt.c.attempted_at,
+            )
+            .outerjoin(last_attempt, last_attempt.c.account_id == models.CloudAccount.id)
+            .where(
+                models.CloudAccount.auto_sync.is_(True),
+                models.CloudAccount.owner_id.is_not(None),
+                models.CloudAccount.sync_frequency.in_(list(SYNC_INTERVALS)),
+                models.CloudAccount.provider.in_(providers),
+            )
+        ).all()
+
+        heap = []
+        for account_id, provider, frequency, last_synced_at, created_at, attempted_at in rows:
+            attempts = [value for value in (last_synced_at, attempted_at) if value is not None]
+            due = next_due(
+                account_id,
+                frequency,
+                max(attempts) if attempts else None,
+                created_at or now,
+                max_jitter=self.max_jitter_seconds,
+            )
+            if due is not None:
+                heap.append((due, account_id, provider))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._last_refresh = now
+
+    def _dispatch(self, db: Session, now: datetime) -> int:
+        for account_id, future in list(self._in_flight.items()):
+            if future.done():
+                del self._in_flight[account_id]
+
+        queued = 0
+        requeue = []
+        while self._heap and self._heap[0][0] <= now and len(self._in_flight) < self.max_concurrency:
+            due, account_id, provider = heapq.heappop(self._heap)
+            if account_id in self._in_flight:
+                continue
+            bucket = self.buckets[provider]
+            if not bucket.try_acquire():
+                requeue.append((now + timedelta(seconds=bucket.wait_time()), account_id, provider))
+                continue
+
+            account = db.get(models.CloudAccount, account_id)
+            if account is None or not account.auto_sync or account.owner_id is None:
+                continue
+            if collectors.get_collector(account.provider, account) is None:
+                continue
+            job, created = crud.create_sync_job(db, account)
+            if created:
+                self._in_flight[account_id] = self.engine.submit(job.id)
+                queued += 1
+            # Due again one interval after this attempt, without waiting for the next refresh.
+            due = next_due(
+                account_id, account.sync_frequency, now, account.created_at, max_jitter=self.max_jitter_seconds
+            )
+            if due is not None:
+                requeue.append((due, account_id, provider))
+
+        for entry in requeue:
+            heapq.heappush(self._heap, entry)
+        return queued
+
+
+sync_scheduler = SyncScheduler()
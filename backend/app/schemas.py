@@ -182,6 +182,10 @@ class NotificationRead(NotificationBase):
         from_attributes = True
 
 
+class UnreadCount(BaseModel):
+    unread: int
+
+
 class CloudAccountCreate(BaseModel):
     """Schema for creating a new cloud account connection."""
     display_name: str = Field(..., min_length=1, max_length=255)
@@ -347,6 +351,7 @@ class EvaluationCreate(BaseModel):
     status: str = Field(default="unknown", pattern="^(compliant|non_compliant|warning|unknown)$")
     findings: Optional[str] = None
     resource_id: Optional[str] = Field(None, max_length=255)
+    affected_resources: int = Field(default=0, ge=0)
 
 
 class EvaluationUpdate(BaseModel):
@@ -354,6 +359,7 @@ class EvaluationUpdate(BaseModel):
     status: Optional[str] = Field(None, pattern="^(compliant|non_compliant|warning|unknown)$")
     findings: Optional[str] = None
     resource_id: Optional[str] = Field(None, max_length=255)
+    affected_resources: Optional[int] = Field(None, ge=0)
 
 
 class EvaluationRead(BaseModel):
@@ -367,6 +373,45 @@ class EvaluationRead(BaseModel):
     last_checked_at: datetime
     findings: Optional[str] = None
     resource_id: Optional[str] = None
+    affected_resources: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BulkEvaluationResult(BaseModel):
+    """Outcome of a single item in a bulk evaluation upload."""
+    index: int
+    status: str  # created | updated | skipped | error
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkEvaluationResponse(BaseModel):
+    """Schema for bulk evaluation upload response."""
+    created: int
+    updated: int
+    failed: int
+    results: list[BulkEvaluationResult]
+
+
+# ===========================
+# Sync Job Schemas
+# ===========================
+
+class SyncJobRead(BaseModel):
+    """Schema for account sync job progress."""
+    id: int
+    account_id: int
+    status: str
+    total: int
+    processed: int
+    created: int
+    updated: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
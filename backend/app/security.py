@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import logging
+import multiprocessing
 import secrets
+import threading
 import warnings
-from typing import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
 
-try:
-    from passlib.context import CryptContext  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency fallback
-    CryptContext = None  # type: ignore
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _crypt_context_class():
+    """passlib's ``CryptContext``, or None. Imported on first use: passlib and
+    the backends it probes add noticeably to a serverless cold start."""
+    try:
+        from passlib.context import CryptContext  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency fallback
+        return None
+    return CryptContext
 
 
 def _bcrypt_backend_available() -> bool:
-    if CryptContext is None:
+    if _crypt_context_class() is None:
         return False
     try:
         import bcrypt  # type: ignore
@@ -25,52 +39,192 @@ def _bcrypt_backend_available() -> bool:
     return True
 
 
+def _argon2_backend_available() -> bool:
+    if _crypt_context_class() is None:
+        return False
+    try:
+        from passlib.hash import argon2  # type: ignore
+
+        return bool(argon2.has_backend())
+    except Exception:  # pragma: no cover - argon2-cffi missing or broken
+        return False
+
+
+def _context_config(scheme: str) -> Optional[str]:
+    """passlib config for ``scheme`` (falling back to whatever backend exists), or None.
+
+    The first scheme hashes new passwords; the rest still verify and are
+    reported as needing an update, which drives rehash-on-login.
+    """
+    schemes = []
+    if _argon2_backend_available():
+        schemes.append("argon2")
+    elif scheme == "argon2":
+        warnings.warn("argon2-cffi not installed; hashing new passwords with bcrypt", RuntimeWarning)
+    if _bcrypt_backend_available():
+        schemes.insert(0 if scheme == "bcrypt" else len(schemes), "bcrypt")
+    if not schemes:
+        return None
+    ctx = _crypt_context_class()(
+        schemes=schemes,
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=settings.argon2_time_cost,
+        argon2__memory_cost=settings.argon2_memory_cost_kib,
+        argon2__parallelism=settings.argon2_parallelism,
+        bcrypt__rounds=settings.bcrypt_rounds,
+    )
+    return ctx.to_string()
+
+
+# Contexts built inside pool workers, keyed by their config string.
+_worker_contexts: dict = {}
+
+
+def _run_in_worker(config: str, method: str, *args):
+    ctx = _worker_contexts.get(config)
+    if ctx is None:
+        ctx = _worker_contexts[config] = _crypt_context_class().from_string(config)
+    return getattr(ctx, method)(*args)
+
+
 class PasswordManager:
-    """Wrap password hashing so the app can run even without optional deps."""
+    """Wrap password hashing so the app can run even without optional deps.
+
+    The ``*_async`` methods run the hash in a bounded process pool of
+    ``workers`` processes (a thread when ``workers`` is 0) so logins never
+    hold the event loop or the GIL for the length of a hash. The passlib
+    context is built on first use, so importing this module stays cheap.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, scheme: Optional[str] = None, *, workers: Optional[int] = None) -> None:
+        self._scheme = scheme
         self._ctx = None
-        if _bcrypt_backend_available():
-            try:
-                self._ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
-            except Exception:  # pragma: no cover - fall back when bcrypt backend misbehaves
-                warnings.warn(
-                    "passlib bcrypt backend unavailable; falling back to built-in SHA256 hashing",
-                    RuntimeWarning,
-                )
-                self._ctx = None
-        elif CryptContext is not None:
-            warnings.warn(
-                "passlib detected but bcrypt backend is incompatible; falling back to built-in SHA256 hashing",
-                RuntimeWarning,
-            )
+        self._config = None
+        self._loaded = False
+        self.workers = settings.password_hash_workers if workers is None else workers
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _context(self):
+        if self._loaded:
+            return self._ctx
+        with self._lock:
+            if not self._loaded:
+                crypt_context = _crypt_context_class()
+                if crypt_context is not None:
+                    try:
+                        self._config = _context_config(self._scheme or settings.password_scheme)
+                    except Exception:  # pragma: no cover - fall back when a backend misbehaves
+                        self._config = None
+                    if self._config is not None:
+                        self._ctx = crypt_context.from_string(self._config)
+                    else:
+                        warnings.warn(
+                            "passlib detected but no usable argon2/bcrypt backend; "
+                            "falling back to built-in SHA256 hashing",
+                            RuntimeWarning,
+                        )
+                self._loaded = True
+        return self._ctx
+
+    @property
+    def scheme(self) -> str:
+        ctx = self._context()
+        return ctx.default_scheme() if ctx else "sha256"
 
     def hash(self, raw_password: str) -> str:
-        if self._ctx:
-            return self._ctx.hash(raw_password)
+        ctx = self._context()
+        if ctx:
+            return ctx.hash(raw_password)
         # Simple salted SHA256 fallback for demo purposes only.
         salt = secrets.token_hex(16)
         digest = hashlib.sha256(f"{salt}{raw_password}".encode("utf-8")).hexdigest()
         return f"sha256${salt}${digest}"
 
     def verify(self, raw_password: str, hashed_password: str) -> bool:
-        if self._ctx:
-            return self._ctx.verify(raw_password, hashed_password)
+        return self.verify_and_update(raw_password, hashed_password)[0]
+
+    def verify_and_update(self, raw_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Return ``(verified, new_hash)``; ``new_hash`` is set when the stored
+        hash uses a deprecated scheme or outdated cost and should be replaced."""
+        ctx = self._context()
+        if hashed_password.startswith("sha256$"):
+            verified = _verify_sha256(raw_password, hashed_password)
+            return verified, (self.hash(raw_password) if verified and ctx else None)
+        if not ctx:
+            return False, None
+        try:
+            return ctx.verify_and_update(raw_password, hashed_password)
+        except ValueError:  # unrecognised hash format
+            return False, None
+
+    async def hash_async(self, raw_password: str) -> str:
+        if not self._context():
+            return self.hash(raw_password)
+        return await self._submit("hash", raw_password)
+
+    async def verify_and_update_async(self, raw_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        if not self._context() or hashed_password.startswith("sha256$"):
+            return self.verify_and_update(raw_password, hashed_password)
         try:
-            algorithm, salt, digest = hashed_password.split("$")
+            return await self._submit("verify_and_update", raw_password, hashed_password)
         except ValueError:
-            return False
-        if algorithm != "sha256":
-            return False
-        candidate = hashlib.sha256(f"{salt}{raw_password}".encode("utf-8")).hexdigest()
-        return secrets.compare_digest(candidate, digest)
+            return False, None
+
+    async def _submit(self, method: str, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            executor = self._pool()
+            if executor is not None:
+                return await loop.run_in_executor(executor, _run_in_worker, self._config, method, *args)
+        except (OSError, BrokenProcessPool) as exc:
+            # No /dev/shm (Lambda), or spawned workers that cannot re-import
+            # the host's __main__: hash on a thread from now on.
+            logger.warning("Password hashing process pool unavailable, using a thread: %r", exc)
+            self._disable_pool()
+        return await loop.run_in_executor(None, getattr(self._ctx, method), *args)
+
+    def _pool(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process already runs threads (scheduler, sync engine).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _disable_pool(self) -> None:
+        self.workers = 0
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _verify_sha256(raw_password: str, hashed_password: str) -> bool:
+    try:
+        algorithm, salt, digest = hashed_password.split("$")
+    except ValueError:
+        return False
+    if algorithm != "sha256":
+        return False
+    candidate = hashlib.sha256(f"{salt}{raw_password}".encode("utf-8")).hexdigest()
+    return secrets.compare_digest(candidate, digest)
+
+
+# Shared by the API, startup seeding and the CLIs; building a CryptContext is not free.
+password_manager = PasswordManager()
 
 
 def get_password_hasher() -> Callable[[str], str]:
-    manager = PasswordManager()
-    return manager.hash
+    return password_manager.hash
 
 
 def get_password_verifier() -> Callable[[str, str], bool]:
-    manager = PasswordManager()
-    return manager.verify
+    return password_manager.verify
@@ -1,9 +1,29 @@
+"""Demo records plus a bulk loader and a synthetic dataset generator.
+
+``python -m app.seed demo`` loads :func:`demo_records` for the admin user;
+``python -m app.seed synthetic --preset production`` generates 1k tenants
+with 50k accounts and 5M evaluations. Generation is deterministic for a
+given ``--seed`` and ``--anchor`` date, so a production-sized dataset can be
+reproduced locally. Rows go in with chunked executemany INSERTs and explicit
+ids, and the rollups and notification counters are rebuilt afterwards.
+"""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from app import models
 
+DEFAULT_CHUNK_SIZE = 5000
+
 
 def demo_records(*, password_hasher) -> list[dict]:
     now = datetime.utcnow()
@@ -278,4 +298,365 @@ def demo_records(*, password_hasher) -> list[dict]:
         },
     ]
 
-    return records
\ No newline at end of file
+    return records
+
+
+# -- Bulk loading --------------------------------------------------------------
+def bulk_insert(db: Session, model, rows: Iterable[dict], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Insert ``rows`` as executemany batches of ``chunk_size``, committing per
+    chunk. Rows leaving out a column get its default, so a chunk is split by
+    key set (executemany needs the same keys in every row)."""
+    stmt = model.__table__.insert()
+    rows = iter(rows)
+    inserted = 0
+    while chunk := list(islice(rows, chunk_size)):
+        groups: dict[frozenset, list[dict]] = {}
+        for row in chunk:
+            groups.setdefault(frozenset(row), []).append(row)
+        for group in groups.values():
+            db.execute(stmt, group)
+        db.commit()
+        inserted += len(chunk)
+    return inserted
+
+
+def insert_records(db: Session, records: Iterable[dict], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Bulk insert ``{"model", "data"}`` records in order, skipping rows that
+    violate a constraint (a chunk that fails is retried row by row)."""
+    inserted = 0
+    records = list(records)
+    start = 0
+    while start < len(records):
+        model = records[start]["model"]
+        end = start
+        while end < len(records) and records[end]["model"] is model and end - start < chunk_size:
+            end += 1
+        rows = [record["data"] for record in records[start:end]]
+        try:
+            inserted += bulk_insert(db, model, rows, chunk_size=chunk_size)
+        except IntegrityError:
+            db.rollback()
+            for row in rows:
+                try:
+                    inserted += bulk_insert(db, model, [row])
+                except IntegrityError:
+                    db.rollback()
+        start = end
+    return inserted
+
+
+def _next_id(db: Session, model) -> int:
+    return (db.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _sync_sequences(db: Session, tables: Iterable[str]) -> None:
+    """Explicit ids do not advance PostgreSQL sequences; move them past the new rows."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}")
+        )
+    db.commit()
+
+
+def _rebuild_counters(db: Session) -> None:
+    from app import notification_counts, rollups
+
+    rollups.rebuild(db)
+    notification_counts.rebuild(db)
+
+
+def load_demo(db: Session, *, owner_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, int]:
+    """Bulk load :func:`demo_records` (minus the user) for ``owner_id``."""
+    # The user record is skipped, so its password is never hashed.
+    records = demo_records(password_hasher=lambda raw: raw)
+    by_model: dict = {}
+    for record in records:
+        by_model.setdefault(record["model"], []).append(dict(record["data"]))
+
+    account_ids: dict[int, int] = {}
+    policy_ids: dict[int, int] = {}
+    for model, id_map in ((models.CloudAccount, account_ids), (models.Policy, policy_ids)):
+        next_id = _next_id(db, model)
+        for index, row in enumerate(by_model.get(model, []), start=1):
+            id_map[index] = row["id"] = next_id + index - 1
+            row["owner_id"] = owner_id
+    for row in by_model.get(models.PolicyEvaluation, []):
+        row["policy_id"] = policy_ids[row["policy_id"]]
+        row["account_id"] = account_ids[row["account_id"]]
+    for row in by_model.get(models.Notification, []):
+        row["owner_id"] = owner_id
+
+    counts = {}
+    for model in (models.CloudAccount, models.Policy, models.PolicyEvaluation, models.Notification):
+        counts[model.__tablename__] = bulk_insert(db, model, by_model.get(model, []), chunk_size=chunk_size)
+    _sync_sequences(db, ("cloud_accounts", "policies"))
+    _rebuild_counters(db)
+    return counts
+
+
+# -- Synthetic tenants ---------------------------------------------------------
+PRESETS = {
+    "small": {"users": 10, "accounts_per_user": 5, "policies_per_user": 30, "evaluations_per_account": 10,
+              "notifications_per_user": 20},
+    "medium": {"users": 100, "accounts_per_user": 20, "policies_per_user": 120, "evaluations_per_account": 40,
+               "notifications_per_user": 50},
+    # 1k users, 50k accounts, 300k policies, 5M evaluations, 50k notifications.
+    "production": {"users": 1000, "accounts_per_user": 50, "policies_per_user": 300,
+                   "evaluations_per_account": 100, "notifications_per_user": 50},
+}
+
+PROVIDER_WEIGHTS = {models.CloudProvider.AWS: 50, models.CloudProvider.AZURE: 30, models.CloudProvider.GCP: 20}
+ACCOUNT_STATUS_WEIGHTS = {
+    models.AccountStatus.CONNECTED: 85,
+    models.AccountStatus.PENDING: 10,
+    models.AccountStatus.ERROR: 5,
+}
+SEVERITY_WEIGHTS = {
+    models.PolicySeverity.LOW: 20,
+    models.PolicySeverity.MEDIUM: 40,
+    models.PolicySeverity.HIGH: 28,
+    models.PolicySeverity.CRITICAL: 12,
+}
+# Share of the non-compliant remainder; the compliant share comes from each
+# account's health (Beta(8, 2), mean 0.8), so some accounts are much worse than others.
+FAILING_STATUS_WEIGHTS = {
+    models.ComplianceStatus.NON_COMPLIANT: 55,
+    models.ComplianceStatus.WARNING: 30,
+    models.ComplianceStatus.UNKNOWN: 15,
+}
+NOTIFICATION_TYPE_WEIGHTS = {
+    models.NotificationType.ACCOUNT_SYNC: 45,
+    models.NotificationType.POLICY_VIOLATION: 30,
+    models.NotificationType.BUILD_COMPLETE: 10,
+    models.NotificationType.PROVISIONING: 10,
+    models.NotificationType.BROADCAST: 5,
+}
+CATEGORIES = ("Identity", "Storage", "Network", "Logging", "Compute", "Encryption", "Monitoring")
+
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class SyntheticDataset:
+    """Deterministic tenants for ``seed``; rows are produced lazily so the
+    evaluations of a production-sized run never sit in memory at once."""
+
+    def __init__(
+        self,
+        *,
+        users: int,
+        accounts_per_user: int,
+        policies_per_user: int,
+        evaluations_per_account: int,
+        notifications_per_user: int,
+        seed: int = 42,
+        anchor: Optional[date] = None,
+        first_ids: Optional[dict] = None,
+        hashed_password: str = "",
+    ) -> None:
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.users = users
+        self.accounts_per_user = accounts_per_user
+        self.policies_per_user = policies_per_user
+        self.evaluations_per_account = evaluations_per_account
+        self.notifications_per_user = notifications_per_user
+        self.now = datetime.combine(anchor or datetime.utcnow().date(), datetime.min.time())
+        self.first_ids = first_ids or {}
+        self.hashed_password = hashed_password
+        # owner -> provider -> policy ids, and account id -> (owner, provider)
+        self._policies: dict[int, dict[models.CloudProvider, list[int]]] = {}
+        self._accounts: list[tuple[int, int, models.CloudProvider]] = []
+
+    def _ago(self, max_hours: float) -> datetime:
+        return self.now - timedelta(seconds=int(self.rng.random() * max_hours * 3600))
+
+    def user_rows(self) -> Iterator[dict]:
+        first = self.first_ids.get(models.User, 1)
+        for index in range(self.users):
+            yield {
+                "id": first + index,
+                "email": f"tenant{index:05d}.s{self.seed}@synthetic.cloudguard.dev",
+                "full_name": f"Synthetic Tenant {index:05d}",
+                "hashed_password": self.hashed_password,
+                "is_active": True,
+                "token_version": 0,
+                "created_at": self._ago(24 * 365),
+            }
+
+    def account_rows(self) -> Iterator[dict]:
+        next_id = self.first_ids.get(models.CloudAccount, 1)
+        first_user = self.first_ids.get(models.User, 1)
+        for owner_id in range(first_user, first_user + self.users):
+            for _ in range(self.accounts_per_user):
+                provider = _weighted(self.rng, PROVIDER_WEIGHTS)
+                self._accounts.append((next_id, owner_id, provider))
+                created_at = self._ago(24 * 365)
+                yield {
+                    "id": next_id,
+                    "provider": provider,
+                    "external_id": f"syn-{self.seed}-{next_id}",
+                    "display_name": f"{provider.value.upper()} account {next_id}",
+                    "status": _weighted(self.rng, ACCOUNT_STATUS_WEIGHTS),
+                    "sync_frequency": "Daily",
+                    "auto_sync": True,
+                    "owner_id": owner_id,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "last_synced_at": self._ago(48),
+                }
+                next_id += 1
+
+    def policy_rows(self) -> Iterator[dict]:
+        next_id = self.first_ids.get(models.Policy, 1)
+        first_user = self.first_ids.get(models.User, 1)
+        providers = list(PROVIDER_WEIGHTS)
+        for owner_id in range(first_user, first_user + self.users):
+            by_provider = self._policies[owner_id] = {provider: [] for provider in providers}
+            for index in range(self.policies_per_user):
+                provider = providers[index % len(providers)]
+                category = CATEGORIES[self.rng.randrange(len(CATEGORIES))]
+                by_provider[provider].append(next_id)
+                created_at = self._ago(24 * 365)
+                yield {
+                    "id": next_id,
+                    "provider": provider,
+                    "name": f"{category} control {index:04d}",
+                    "control_id": f"SYN-{provider.value.upper()}-{index:04d}",
+                    "category": category,
+                    "severity": _weighted(self.rng, SEVERITY_WEIGHTS),
+                    "compliance_status": models.ComplianceStatus.UNKNOWN,
+                    "affected_resources": 0,
+                    "owner_id": owner_id,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+                next_id += 1
+
+    def evaluation_rows(self) -> Iterator[dict]:
+        """Needs :meth:`account_rows` and :meth:`policy_rows` consumed first."""
+        next_id = self.first_ids.get(models.PolicyEvaluation, 1)
+        failing = list(FAILING_STATUS_WEIGHTS)
+        failing_weights = list(FAILING_STATUS_WEIGHTS.values())
+        for account_id, owner_id, provider in self._accounts:
+            policy_ids = self._policies[owner_id][provider]
+            health = self.rng.betavariate(8, 2)
+            for policy_id in self.rng.sample(policy_ids, min(self.evaluations_per_account, len(policy_ids))):
+                if self.rng.random() < health:
+                    status, affected, findings = models.ComplianceStatus.COMPLIANT, 0, None
+                else:
+                    status = self.rng.choices(failing, weights=failing_weights)[0]
+                    affected = self.rng.randint(1, 50) if status == models.ComplianceStatus.NON_COMPLIANT else 0
+                    findings = f"{affected} resources out of policy" if affected else "Awaiting latest scan"
+                yield {
+                    "id": next_id,
+                    "policy_id": policy_id,
+                    "account_id": account_id,
+                    "status": status,
+                    "last_checked_at": self._ago(72),
+                    "findings": findings,
+                    "resource_id": f"syn-resource-{account_id}-{policy_id}",
+                    "affected_resources": affected,
+                }
+                next_id += 1
+
+    def notification_rows(self) -> Iterator[dict]:
+        first_user = self.first_ids.get(models.User, 1)
+        for owner_id in range(first_user, first_user + self.users):
+            for _ in range(self.notifications_per_user):
+                notification_type = _weighted(self.rng, NOTIFICATION_TYPE_WEIGHTS)
+                yield {
+                    "title": f"Synthetic {notification_type.value.replace('_', ' ')}",
+                    "message": f"Generated notification for tenant {owner_id}.",
+                    "type": notification_type,
+                    "is_read": self.rng.random() < 0.6,
+                    "created_at": self._ago(24 * 30),
+                    "owner_id": owner_id,
+                    "template_id": None,
+                }
+
+
+def generate(
+    db: Session,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    password: str = "changeme123",
+    progress=print,
+    **options,
+) -> dict[str, int]:
+    """Insert a :class:`SyntheticDataset` (``options`` as its keyword
+    arguments) after the existing rows and rebuild the counters."""
+    from app.security import password_manager
+
+    if db.execute(
+        select(models.User.id).where(models.User.email.like(f"%.s{options.get('seed', 42)}@synthetic.cloudguard.dev"))
+    ).first():
+        raise ValueError(f"Synthetic tenants for seed {options.get('seed', 42)} already exist")
+
+    table_models = (models.User, models.CloudAccount, models.Policy, models.PolicyEvaluation)
+    dataset = SyntheticDataset(
+        first_ids={model: _next_id(db, model) for model in table_models},
+        hashed_password=password_manager.hash(password),
+        **options,
+    )
+    counts = {}
+    for model, rows in (
+        (models.User, dataset.user_rows()),
+        (models.CloudAccount, dataset.account_rows()),
+        (models.Policy, dataset.policy_rows()),
+        (models.PolicyEvaluation, dataset.evaluation_rows()),
+        (models.Notification, dataset.notification_rows()),
+    ):
+        started = time.perf_counter()
+        counts[model.__tablename__] = bulk_insert(db, model, rows, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - started
+        progress(f"  {model.__tablename__}: {counts[model.__tablename__]} rows in {elapsed:.1f}s")
+    _sync_sequences(db, [model.__tablename__ for model in table_models])
+    _rebuild_counters(db)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load demo data or generate synthetic tenants")
+    parser.add_argument("command", choices=["demo", "synthetic"])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in PRESETS["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, help="Overrides the preset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=None,
+                        help="Date timestamps are generated back from (default today, UTC)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if args.command == "demo":
+            admin = db.execute(
+                select(models.User).where(models.User.email == "admin@cloudguard.dev")
+            ).scalar_one_or_none()
+            if admin is None:
+                raise SystemExit("Run `python -m app.bootstrap init --no-seed` first to create the admin user")
+            counts = load_demo(db, owner_id=admin.id, chunk_size=args.chunk_size)
+        else:
+            options = {
+                name: value if (value := getattr(args, name)) is not None else default
+                for name, default in PRESETS[args.preset].items()
+            }
+            print(f"Generating {options} (seed {args.seed})")
+            try:
+                counts = generate(db, seed=args.seed, anchor=args.anchor, chunk_size=args.chunk_size, **options)
+            except ValueError as exc:
+                raise SystemExit(str(exc))
+    finally:
+        db.close()
+    print(f"Loaded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Background account sync engine.
+
+``POST /accounts/{id}/sync`` records a :class:`~app.models.SyncJob` and hands
+its id to :data:`sync_engine`, whose thread pool runs the provider collector
+and writes the resulting evaluations in batches through
+``crud.bulk_upsert_evaluations``. Progress is persisted on the job row so any
+API worker can report it.
+
+When the collector returns resource records, policies whose
+``policy_content`` compiles are evaluated locally by :mod:`app.policy_engine`;
+the rest fall back to the collector's own findings.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import collectors, crud, models, policy_engine, schemas
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class SyncEngine:
+    def __init__(self, *, max_workers: int, batch_size: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="account-sync"
+                )
+            return self._executor
+
+    def submit(self, job_id: int) -> Future:
+        return self._pool().submit(self.run, job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def run(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            job = db.get(models.SyncJob, job_id)
+            if job is None or job.status != models.SyncJobStatus.QUEUED:
+                return
+            try:
+                self._sync(db, job)
+            except Exception as exc:  # collectors raise anything; the job must not stay running
+                logger.exception("Sync job %s failed", job_id)
+                db.rollback()
+                job = db.get(models.SyncJob, job_id)
+                job.status = models.SyncJobStatus.FAILED
+                job.error = str(exc) or exc.__class__.__name__
+                job.finished_at = datetime.utcnow()
+                # Only the provider rejecting or not answering says something
+                # about the account; our own failures leave its status alone.
+                if isinstance(exc, collectors.CollectorError):
+                    job.account.status = models.AccountStatus.ERROR
+                db.commit()
+        finally:
+            db.close()
+
+    def _sync(self, db: Session, job: models.SyncJob) -> None:
+        account = job.account
+        collector = collectors.require_collector(account)
+
+        rows = db.execute(
+            select(models.Policy).where(
+                models.Policy.owner_id == job.owner_id,
+                models.Policy.provider == account.provider,
+            )
+        ).scalars().all()
+        policies = [
+            collectors.PolicyTarget(id=policy.id, control_id=policy.control_id, name=policy.name, category=policy.category)
+            for policy in rows
+        ]
+        policy_ids = {policy.control_id: policy.id for policy in policies}
+        compiled = {}
+        for policy in rows:
+            if not policy.policy_content:
+                continue
+            try:
+                compiled[policy.id] = policy_engine.compile_cached(policy.policy_content, policy.content_hash)
+            except policy_engine.PolicyCompileError as exc:
+                logger.info("Policy %s is not evaluated locally: %s", policy.id, exc)
+
+        job.status = models.SyncJobStatus.RUNNING
+        job.started_at = job.heartbeat_at = datetime.utcnow()
+        job.total = len(policies)
+        db.commit()
+
+        evaluated: set[int] = set()
+        findings = self._findings(collector, account, policies, compiled)
+        while batch := list(islice(findings, self.batch_size)):
+            items = [
+                schemas.EvaluationCreate(
+                    policy_id=policy_ids[finding.control_id],
+                    account_id=account.id,
+                    status=models.ComplianceStatus(finding.status).value,
+                    findings=finding.findings,
+                    resource_id=finding.resource_id,
+                    affected_resources=finding.affected_resources,
+                )
+                for finding in batch
+                if finding.control_id in policy_ids
+            ]
+            evaluated.update(item.policy_id for item in items)
+            results = crud.bulk_upsert_evaluations(db, job.owner_id, items, batch_size=self.batch_size)
+            job.processed += len(batch)
+            job.created += sum(result.status == "created" for result in results)
+            job.updated += sum(result.status == "updated" for result in results)
+            job.heartbeat_at = datetime.utcnow()
+            db.commit()
+
+        crud.refresh_policy_affected_resources(db, evaluated)
+        now = datetime.utcnow()
+        job.status = models.SyncJobStatus.SUCCEEDED
+        job.finished_at = now
+        account.last_synced_at = now
+        account.status = models.AccountStatus.CONNECTED
+        db.commit()
+
+    def _findings(
+        self,
+        collector: collectors.Collector,
+        account: models.CloudAccount,
+        policies: list[collectors.PolicyTarget],
+        compiled: dict[int, policy_engine.CompiledPolicy],
+    ) -> Iterator[collectors.Finding]:
+        resources = collector.collect_resources(account) if compiled else None
+        if resources is None:
+            yield from collector.collect(account, policies)
+            return
+
+        control_ids = {policy.id: policy.control_id for policy in policies}
+        results = policy_engine.evaluate(compiled, resources, batch_size=self.batch_size)
+        for policy_id, result in results.items():
+            yield collectors.Finding(
+                control_id=control_ids[policy_id],
+                status=result.status,
+                resource_id=result.sample_resource_ids[0][:255] if result.sample_resource_ids else None,
+                findings=result.findings,
+                affected_resources=result.affected,
+            )
+        remaining = [policy for policy in policies if policy.id not in compiled]
+        if remaining:
+            yield from collector.collect(account, remaining)
+
+
+sync_engine = SyncEngine(max_workers=settings.sync_workers, batch_size=settings.sync_batch_size)
+
+if settings.sync_fake_providers:
+    collectors.register_fake_collectors()
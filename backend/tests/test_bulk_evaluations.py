@@ -0,0 +1,69 @@
+import json
+
+from sqlalchemy import select
+
+from app import models
+
+
+def _evaluations(db, account) -> dict[int, str]:
+    db.expire_all()
+    rows = db.execute(
+        select(models.PolicyEvaluation).where(models.PolicyEvaluation.account_id == account.id)
+    ).scalars()
+    return {row.policy_id: row.status.value for row in rows}
+
+
+def test_results_keep_request_positions(client, db, headers, make_user, make_account, make_policy):
+    account = make_account()
+    first, second = make_policy(), make_policy()
+    foreign = models.Policy(
+        provider=models.CloudProvider.AWS, name="Foreign", control_id="FOREIGN-1", category="Test",
+        owner_id=make_user().id,
+    )
+    db.add(foreign)
+    db.commit()
+    body = [
+        {"policy_id": first.id, "account_id": account.id, "status": "compliant"},
+        {"policy_id": first.id, "account_id": account.id, "status": "not-a-status"},
+        {"policy_id": foreign.id, "account_id": account.id, "status": "compliant"},
+        {"policy_id": second.id, "account_id": account.id, "status": "warning"},
+        {"policy_id": first.id, "account_id": account.id, "status": "non_compliant"},
+    ]
+
+    response = client.post("/policies/evaluations/bulk", headers=headers, json=body)
+
+    assert response.status_code == 200
+    payload = response.json()
+    results = payload["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["status"] for result in results] == ["skipped", "error", "error", "created", "created"]
+    # Positions refer to the request body, not to the validated subset.
+    assert results[0]["detail"] == "Superseded by item 4"
+    assert str(foreign.id) in results[2]["detail"]
+    assert (payload["created"], payload["updated"], payload["failed"]) == (2, 0, 2)
+    assert _evaluations(db, account) == {first.id: "non_compliant", second.id: "warning"}
+
+
+def test_second_upload_updates_in_place(client, db, headers, make_account, make_policy):
+    account, policy = make_account(), make_policy()
+    item = {"policy_id": policy.id, "account_id": account.id, "status": "compliant"}
+    created = client.post("/policies/evaluations/bulk", headers=headers, json=[item]).json()["results"][0]
+
+    updated = client.post(
+        "/policies/evaluations/bulk",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content=json.dumps({**item, "status": "warning"}) + "\n",
+    ).json()["results"][0]
+
+    assert (created["status"], updated["status"]) == ("created", "updated")
+    assert created["id"] == updated["id"]
+    assert _evaluations(db, account) == {policy.id: "warning"}
+
+
+def test_malformed_body_is_rejected(client, headers):
+    response = client.post(
+        "/policies/evaluations/bulk",
+        headers={**headers, "Content-Type": "application/json"},
+        content=b"[{",
+    )
+    assert response.status_code == 400
@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, select
+
+from app import database, models
+
+
+def test_engine_arguments_follow_each_url():
+    sqlite = database._engine_kwargs("sqlite:////tmp/primary.db")
+    postgres = database._engine_kwargs("postgresql://cloudguard@replica.internal/cloudguard")
+
+    assert sqlite["connect_args"] == {"check_same_thread": False}
+    assert "connect_args" not in postgres
+    assert database._engine_kwargs("sqlite://") == {"connect_args": {"check_same_thread": False}}
+
+
+def test_read_only_session_sends_only_selects_to_the_replica(tmp_path):
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    session = database.RoutingSession(bind=database.engine, replica=replica, info={"read_only": True})
+    users = models.User.__table__
+    try:
+        assert session.get_bind(clause=select(users.c.id)) is replica
+        assert session.get_bind(clause=users.update().values(full_name="Renamed")) is database.engine
+        assert session.get_bind(clause=users.delete().where(users.c.id == 0)) is database.engine
+
+        session.info["read_only"] = False
+        assert session.get_bind(clause=select(users.c.id)) is database.engine
+    finally:
+        session.close()
+        replica.dispose()
@@ -0,0 +1,55 @@
+from app import fanout, notification_counts
+
+
+def _create(client, headers, title="Build finished") -> int:
+    response = client.post("/notifications/", headers=headers, json={"title": title, "message": "All good"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _unread(client, headers) -> int:
+    return client.get("/notifications/unread-count", headers=headers).json()["unread"]
+
+
+def test_counter_follows_creates_reads_and_deletes(client, db, user, headers):
+    first, second, _ = (_create(client, headers) for _ in range(3))
+    assert _unread(client, headers) == 3
+
+    for _ in range(2):  # marking the same notification twice decrements once
+        assert client.patch(f"/notifications/{first}/read", headers=headers).status_code == 200
+    assert _unread(client, headers) == 2
+
+    assert client.delete(f"/notifications/{first}", headers=headers).status_code == 204
+    assert client.delete(f"/notifications/{second}", headers=headers).status_code == 204
+    assert _unread(client, headers) == 1
+
+    assert client.patch("/notifications/mark-all-read", headers=headers).json() == {"updated": 1}
+    assert _unread(client, headers) == 0
+    db.expire_all()
+    assert notification_counts.get_counts(db, user.id) == {"unread": 0, "total": 1}
+    assert notification_counts.verify(db, user.id) == []
+
+
+def test_fan_out_counts_every_recipient(db, make_user):
+    recipients = [make_user() for _ in range(3)]
+    owner_ids = [recipient.id for recipient in recipients]
+
+    sent = fanout.fan_out(db, owner_ids + owner_ids[:1], title="Maintenance", message="Tonight", use_template=True)
+
+    assert sent == 3
+    db.expire_all()
+    for owner_id in owner_ids:
+        assert notification_counts.get_counts(db, owner_id) == {"unread": 1, "total": 1}
+        assert notification_counts.verify(db, owner_id) == []
+
+
+def test_rebuild_repairs_drift(db, user, client, headers):
+    _create(client, headers)
+    notification_counts.apply_delta(db, user.id, unread=5, total=5)
+    db.commit()
+    assert notification_counts.verify(db, user.id)
+
+    notification_counts.rebuild(db, owner_id=user.id)
+
+    assert notification_counts.verify(db, user.id) == []
+    assert _unread(client, headers) == 1
@@ -0,0 +1,22 @@
+from sqlalchemy import select
+
+from app import fanout, models
+
+
+def test_delivery_rows_read_title_and_message_from_their_template(client, db, user, headers):
+    fanout.fan_out(db, [user.id], title="Scheduled maintenance", message="Tonight at 22:00", use_template=True)
+    db.expire_all()
+
+    rows = db.execute(
+        select(models.Notification).where(models.Notification.title == "Scheduled maintenance")
+    ).scalars().all()
+    page = client.get("/notifications/", headers=headers).json()
+
+    assert [row.owner_id for row in rows] == [user.id]
+    assert rows[0].template_id is not None and rows[0].stored_title == ""
+    assert (rows[0].title, rows[0].message) == ("Scheduled maintenance", "Tonight at 22:00")
+    assert [(item["title"], item["message"]) for item in page] == [("Scheduled maintenance", "Tonight at 22:00")]
+
+
+def test_notification_queries_do_not_join_templates():
+    assert "JOIN" not in str(select(models.Notification))
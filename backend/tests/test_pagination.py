@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate
+
+
+def _walk(query_factory, sort_column, *, limit: int, descending: bool) -> list[int]:
+    seen, cursor = [], None
+    while True:
+        page = paginate(query_factory(), sort_column, models.CloudAccount.id, cursor=cursor, limit=limit, descending=descending)
+        seen.extend(row.id for row in page.items)
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+
+
+def test_cursor_round_trips_datetimes_and_nulls():
+    moment = datetime(2026, 1, 2, 3, 4, 5)
+    column = models.CloudAccount.last_synced_at
+    assert decode_cursor(encode_cursor(moment, 7), column) == (moment, 7)
+    assert decode_cursor(encode_cursor(None, 8), column) == (None, 8)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", column)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_cursor_walk_matches_one_query_with_ties_and_nulls(db, user, make_account, descending):
+    base = datetime(2026, 1, 1)
+    # Ties on the sort value and NULLs in between page boundaries.
+    synced = [None, base, base, None, base + timedelta(hours=1), None, base, base - timedelta(days=1)]
+    for value in synced:
+        make_account(last_synced_at=value)
+
+    def query():
+        return db.query(models.CloudAccount).filter(models.CloudAccount.owner_id == user.id)
+
+    column = models.CloudAccount.last_synced_at
+    expected = [row.id for row in paginate(query(), column, models.CloudAccount.id, limit=100, descending=descending).items]
+    assert len(expected) == len(synced)
+    for limit in (1, 2, 3):
+        assert _walk(query, column, limit=limit, descending=descending) == expected
+
+
+def test_list_endpoint_follows_next_cursor(client, headers, make_account):
+    created = [make_account().id for _ in range(5)]
+
+    seen, params = [], {"limit": 2}
+    while True:
+        response = client.get("/accounts/", headers=headers, params=params)
+        assert response.status_code == 200
+        seen.extend(account["id"] for account in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    assert seen == sorted(created, reverse=True)
+
+
+@pytest.mark.parametrize("path", ["/accounts/", "/policies/", "/policies/evaluations", "/notifications/"])
+def test_skip_with_cursor_is_rejected(client, headers, path):
+    cursor = encode_cursor(datetime(2026, 1, 1), 1)
+
+    response = client.get(path, headers=headers, params={"cursor": cursor, "skip": 5})
+
+    assert response.status_code == 400
+    assert client.get(path, headers=headers, params={"cursor": cursor}).status_code == 200
@@ -0,0 +1,91 @@
+import pytest
+
+from app import ratelimit
+from app.config import settings
+from app.routers import auth
+
+from conftest import PASSWORD
+
+STORES = {
+    "memory": lambda: ratelimit.MemoryRateLimitStore(),
+    "local-redis": lambda: ratelimit.RedisRateLimitStore(ratelimit.LocalRedis()),
+}
+
+
+@pytest.fixture(params=list(STORES))
+def store(request) -> ratelimit.RateLimitStore:
+    return STORES[request.param]()
+
+
+def test_store_is_abstract():
+    with pytest.raises(TypeError):
+        ratelimit.RateLimitStore()
+
+
+def test_bucket_allows_the_burst_then_refills_at_the_rate(store):
+    take = lambda now: store.consume("bucket", rate=0.5, capacity=3, now=now)  # noqa: E731
+
+    assert [take(100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert take(100.0) == pytest.approx(2.0)
+    assert take(101.0) == pytest.approx(1.0)
+    assert take(102.0) == 0.0
+    assert take(102.0) > 0
+
+
+def test_window_counts_recent_events_and_resets(store):
+    for now in (100.0, 110.0, 120.0):
+        store.window_add("window", window=30, now=now)
+
+    assert store.window_hits("window", window=30, now=125.0) == (3, 100.0)
+    assert store.window_hits("window", window=30, now=135.0) == (2, 110.0)
+    store.reset("window")
+    assert store.window_hits("window", window=30, now=135.0) == (0, None)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = ratelimit.TokenBucket(rate=1.0, capacity=2)
+
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert 0 < bucket.wait_time() <= 1.0
+
+
+@pytest.fixture
+def limiter(monkeypatch, store):
+    limiter = ratelimit.LoginRateLimiter(store, enabled=True)
+    monkeypatch.setattr(auth, "login_limiter", limiter)
+    monkeypatch.setattr(settings, "login_max_failures_per_email", 3)
+    monkeypatch.setattr(settings, "login_email_burst", 100)
+    monkeypatch.setattr(settings, "login_ip_burst", 100)
+    return limiter
+
+
+def test_failures_lock_the_email_until_the_window_passes(client, user, limiter):
+    wrong = {"email": user.email, "password": "wrong-password"}
+
+    statuses = [client.post("/auth/login", json=wrong).status_code for _ in range(3)]
+    locked = client.post("/auth/login", json={"email": user.email, "password": PASSWORD})
+
+    assert statuses == [401, 401, 401]
+    assert locked.status_code == 429
+    assert 0 < int(locked.headers["Retry-After"]) <= settings.login_failure_window_seconds
+
+
+def test_success_clears_the_email_failures(client, user, limiter):
+    wrong = {"email": user.email, "password": "wrong-password"}
+    for _ in range(2):
+        assert client.post("/auth/login", json=wrong).status_code == 401
+
+    assert client.post("/auth/login", json={"email": user.email, "password": PASSWORD}).status_code == 200
+    assert [client.post("/auth/login", json=wrong).status_code for _ in range(3)] == [401, 401, 401]
+
+
+def test_ip_bucket_throttles_attempts_across_emails(client, limiter, monkeypatch):
+    monkeypatch.setattr(settings, "login_ip_burst", 2)
+
+    statuses = [
+        client.post("/auth/login", json={"email": f"nobody{n}@tests.cloudguard.dev", "password": "x"}).status_code
+        for n in range(3)
+    ]
+
+    assert statuses == [401, 401, 429]
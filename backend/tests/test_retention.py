@@ -0,0 +1,144 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app import fanout, models, notification_counts, retention
+
+SYNC = models.NotificationType.ACCOUNT_SYNC
+PROVISIONING = models.NotificationType.PROVISIONING
+NOW = datetime(2026, 10, 18, 12, 0)
+DAY = datetime(2026, 10, 10, 9, 0)
+
+
+@pytest.fixture
+def notify(db, user):
+    """``notify(created_at, type=..., message=..., is_read=...)`` -> a counted notification for ``user``."""
+
+    def make(created_at, type=SYNC, message="Sync finished", is_read=False) -> models.Notification:
+        notification = models.Notification(
+            owner_id=user.id,
+            type=type,
+            title="Sync complete",
+            message=message,
+            is_read=is_read,
+            created_at=created_at,
+        )
+        db.add(notification)
+        db.flush()
+        notification_counts.on_notifications_created(db, [notification])
+        db.commit()
+        return notification
+
+    return make
+
+
+def _notifications(db, user) -> list[models.Notification]:
+    db.expire_all()
+    stmt = select(models.Notification).where(models.Notification.owner_id == user.id).order_by(models.Notification.id)
+    return list(db.execute(stmt).scalars())
+
+
+def _archived(report, user) -> list[dict]:
+    if report.archive_path is None:
+        return []
+    with gzip.open(report.archive_path, "rt", encoding="utf-8") as archive:
+        return [record for record in map(json.loads, archive) if record["owner_id"] == user.id]
+
+
+def test_same_day_syncs_are_coalesced_and_archived(db, user, notify, tmp_path):
+    folded = [
+        notify(DAY, message="Synced 12 policies").id,
+        notify(DAY + timedelta(hours=1), message="Synced 12 policies", is_read=True).id,
+        notify(DAY + timedelta(hours=2), message="Synced 14 policies").id,
+    ]
+    next_day = notify(DAY + timedelta(days=1))
+    provisioning = notify(DAY, type=PROVISIONING)
+
+    report = retention.run(db, now=NOW, ttls={}, coalesce_after=timedelta(hours=24), archive_dir=str(tmp_path))
+
+    rows = _notifications(db, user)
+    assert [row.id for row in rows[:2]] == [next_day.id, provisioning.id]
+    (rollup,) = rows[2:]
+    assert rollup.title == "3 account syncs on 2026-10-10"
+    assert rollup.message == "Synced 12 policies (x2); Synced 14 policies"
+    assert (rollup.is_read, rollup.created_at) == (False, DAY + timedelta(hours=2))
+    assert notification_counts.get_counts(db, user.id) == {"unread": 3, "total": 3}
+    assert notification_counts.verify(db, user.id) == []
+
+    archived = _archived(report, user)
+    assert sorted(record["id"] for record in archived) == folded
+    assert {record["reason"] for record in archived} == {"coalesced"}
+
+
+def test_recent_days_are_not_coalesced(db, user, notify):
+    today = NOW - timedelta(hours=1)
+    notify(today)
+    notify(today)
+
+    retention.run(db, now=NOW, ttls={}, coalesce_after=timedelta(hours=24))
+
+    assert len(_notifications(db, user)) == 2
+
+
+def test_expiry_deletes_in_chunks_and_archives_template_rows(db, user, notify, tmp_path):
+    old = NOW - timedelta(days=40)
+    for hour in range(5):
+        notify(old + timedelta(hours=hour), type=PROVISIONING)
+    kept = notify(NOW - timedelta(days=5), type=PROVISIONING)
+    fanout.fan_out(
+        db, [user.id], title="Old maintenance", message="Done", type=PROVISIONING, use_template=True
+    )
+    db.execute(
+        update(models.Notification)
+        .where(models.Notification.owner_id == user.id, models.Notification.template_id.is_not(None))
+        .values(created_at=old)
+    )
+    db.commit()
+
+    report = retention.run(
+        db,
+        now=NOW,
+        ttls={PROVISIONING: timedelta(days=30)},
+        coalesce_after=timedelta(hours=24),
+        chunk_size=2,
+        archive_dir=str(tmp_path),
+    )
+
+    assert [row.id for row in _notifications(db, user)] == [kept.id]
+    assert notification_counts.verify(db, user.id) == []
+    archived = _archived(report, user)
+    assert len(archived) == 6
+    assert {record["reason"] for record in archived} == {"expired"}
+    assert ("Old maintenance", "Done") in {(record["title"], record["message"]) for record in archived}
+    assert report.pruned_templates >= 1
+    assert not db.execute(
+        select(models.NotificationTemplate).where(models.NotificationTemplate.title == "Old maintenance")
+    ).first()
+
+
+def test_dry_run_only_reports(db, user, notify, tmp_path):
+    notify(DAY)
+    notify(DAY)
+    notify(NOW - timedelta(days=40), type=PROVISIONING)
+
+    report = retention.run(
+        db,
+        now=NOW,
+        ttls={PROVISIONING: timedelta(days=30)},
+        coalesce_after=timedelta(hours=24),
+        archive_dir=str(tmp_path),
+        dry_run=True,
+    )
+
+    assert report.coalesced_rows >= 2 and report.expired[PROVISIONING.value] >= 1
+    assert report.archive_path is None
+    assert len(_notifications(db, user)) == 3
+
+
+def test_parse_ttls():
+    assert retention.parse_ttls("account_sync=14, provisioning=0,") == {SYNC: timedelta(days=14)}
+    with pytest.raises(ValueError):
+        retention.parse_ttls("nonsense=3")
@@ -0,0 +1,119 @@
+from app import crud, models, rollups, schemas
+
+C = models.ComplianceStatus
+
+
+def _counts(db, user) -> dict:
+    db.expire_all()
+    return {
+        rollup.provider: {column: getattr(rollup, column) for column in rollups.COUNT_COLUMNS}
+        for rollup in rollups.get_rollups(db, user.id)
+    }
+
+
+def _evaluate(db, user, policy, account, status=C.COMPLIANT) -> models.PolicyEvaluation:
+    return crud.create_evaluation(
+        db,
+        current_user=user,
+        evaluation_in=schemas.EvaluationCreate(policy_id=policy.id, account_id=account.id, status=status.value),
+    )
+
+
+def test_single_writes_keep_rollups_in_sync(db, user, make_account, make_policy):
+    account = make_account()
+    first, second = make_policy(), make_policy()
+
+    evaluation = _evaluate(db, user, first, account, C.COMPLIANT)
+    _evaluate(db, user, second, account, C.NON_COMPLIANT)
+    aws = _counts(db, user)[models.CloudProvider.AWS]
+    assert (aws["accounts"], aws["compliant"], aws["non_compliant"]) == (1, 1, 1)
+
+    crud.update_evaluation(
+        db, current_user=user, evaluation_id=evaluation.id,
+        evaluation_in=schemas.EvaluationUpdate(status=C.WARNING.value),
+    )
+    aws = _counts(db, user)[models.CloudProvider.AWS]
+    assert (aws["compliant"], aws["warning"]) == (0, 1)
+
+    crud.delete_evaluation(db, current_user=user, evaluation_id=evaluation.id)
+    assert _counts(db, user)[models.CloudProvider.AWS]["accounts"] == 1
+    assert rollups.verify(db, user.id) == []
+
+
+def test_last_evaluation_removed_uncounts_the_account(db, user, make_account, make_policy):
+    account, policy = make_account(), make_policy()
+    evaluation = _evaluate(db, user, policy, account)
+
+    crud.delete_evaluation(db, current_user=user, evaluation_id=evaluation.id)
+
+    assert _counts(db, user)[models.CloudProvider.AWS]["accounts"] == 0
+    assert rollups.verify(db, user.id) == []
+
+
+def test_bulk_upsert_counts_inserts_updates_and_first_evaluations(db, user, make_account, make_policy):
+    populated, empty = make_account(), make_account()
+    policies = [make_policy() for _ in range(3)]
+    _evaluate(db, user, policies[0], populated, C.COMPLIANT)
+
+    items = [
+        schemas.EvaluationCreate(policy_id=policies[0].id, account_id=populated.id, status="non_compliant"),
+        schemas.EvaluationCreate(policy_id=policies[1].id, account_id=populated.id, status="compliant"),
+        schemas.EvaluationCreate(policy_id=policies[0].id, account_id=empty.id, status="warning"),
+        schemas.EvaluationCreate(policy_id=policies[2].id, account_id=empty.id, status="compliant"),
+    ]
+    crud.bulk_upsert_evaluations(db, user.id, items, batch_size=2)
+
+    aws = _counts(db, user)[models.CloudProvider.AWS]
+    assert (aws["accounts"], aws["compliant"], aws["non_compliant"], aws["warning"]) == (2, 2, 1, 1)
+    assert rollups.verify(db, user.id) == []
+
+
+def test_account_and_policy_deletes_uncount_their_evaluations(db, user, make_account, make_policy):
+    aws_account, gcp_account = make_account(), make_account(models.CloudProvider.GCP)
+    aws_policy, gcp_policy = make_policy(), make_policy(models.CloudProvider.GCP)
+    shared = make_policy()
+    _evaluate(db, user, aws_policy, aws_account)
+    _evaluate(db, user, shared, aws_account, C.WARNING)
+    _evaluate(db, user, gcp_policy, gcp_account, C.NON_COMPLIANT)
+
+    crud.delete_policy(db, current_user=user, policy_id=shared.id)
+    assert _counts(db, user)[models.CloudProvider.AWS]["warning"] == 0
+    assert rollups.verify(db, user.id) == []
+
+    crud.delete_account(db, current_user=user, account_id=aws_account.id)
+    counts = _counts(db, user)
+    assert counts[models.CloudProvider.AWS]["accounts"] == 0
+    assert counts[models.CloudProvider.GCP]["accounts"] == 1
+    assert rollups.verify(db, user.id) == []
+
+
+def test_dashboard_summary_reads_the_rollups(client, db, user, headers, make_account, make_policy):
+    account = make_account()
+    _evaluate(db, user, make_policy(), account, C.COMPLIANT)
+    _evaluate(db, user, make_policy(), account, C.NON_COMPLIANT)
+
+    response = client.get("/dashboard/summary", headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"] == {"total_policies": 2, "compliant": 1, "non_compliant": 1, "unknown": 0}
+    assert body["providers"][0]["accounts"] == 1
+
+
+def test_deletes_lock_the_affected_accounts_before_counting(db, user, make_account, make_policy, monkeypatch):
+    # SQLite serializes writers by itself; on PostgreSQL the lock is what keeps
+    # a concurrent first evaluation from being missed by the "accounts" count.
+    locked = []
+    monkeypatch.setattr(rollups, "lock_accounts", lambda db, account_ids: locked.append(sorted(account_ids)))
+    first, second = make_account(), make_account()
+    policy = make_policy()
+    _evaluate(db, user, policy, first)
+    _evaluate(db, user, policy, second)
+    locked.clear()
+
+    crud.delete_policy(db, current_user=user, policy_id=policy.id)
+    assert locked == [sorted([first.id, second.id])]
+
+    locked.clear()
+    crud.delete_account(db, current_user=user, account_id=first.id)
+    assert locked == [[first.id]]
@@ -0,0 +1,74 @@
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app import collectors, models
+from app.scheduler import SyncScheduler
+
+GCP = models.CloudProvider.GCP
+
+
+class RecordingEngine:
+    """Stands in for the sync engine: records job ids instead of running them."""
+
+    def __init__(self) -> None:
+        self.job_ids: list[int] = []
+
+    def submit(self, job_id: int) -> Future:
+        self.job_ids.append(job_id)
+        future = Future()
+        future.set_result(None)
+        return future
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = SyncScheduler(
+        engine=RecordingEngine(),
+        max_concurrency=10_000,
+        provider_rate_per_minute=600_000,
+        max_jitter_seconds=0,
+    )
+    yield scheduler
+    scheduler.lease.release()
+
+
+@pytest.fixture
+def fake_gcp():
+    collectors.register_collector(collectors.FakeCollector(GCP))
+    yield
+    collectors.unregister_collector(GCP)
+
+
+def _jobs(db, account) -> list[models.SyncJob]:
+    db.expire_all()
+    return list(db.execute(select(models.SyncJob).where(models.SyncJob.account_id == account.id)).scalars())
+
+
+def test_accounts_without_a_collector_are_not_scheduled(db, scheduler, make_account):
+    account = make_account(GCP, sync_frequency="Hourly")
+
+    scheduler.run_once(datetime.utcnow() + timedelta(minutes=1))
+
+    assert _jobs(db, account) == []
+    assert account.id not in {account_id for _, account_id, _ in scheduler._heap}
+
+
+def test_dispatched_account_is_due_again_after_its_interval(db, scheduler, make_account, fake_gcp):
+    account = make_account(GCP, sync_frequency="Daily")
+    credentialed = make_account(GCP, sync_frequency="Daily", credential="service-account-key")
+    now = datetime.utcnow() + timedelta(minutes=1)
+
+    scheduler.run_once(now)
+
+    jobs = _jobs(db, account)
+    assert len(jobs) == 1 and jobs[0].id in scheduler.engine.job_ids
+    assert _jobs(db, credentialed) == []
+    due = {account_id: due for due, account_id, _ in scheduler._heap}
+    assert due[account.id] == now + timedelta(days=1)
+
+    # Not due again before the next refresh rebuilds the heap.
+    scheduler.run_once(now + timedelta(seconds=1))
+    assert len(_jobs(db, account)) == 1
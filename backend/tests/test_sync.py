@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import func, select
+
+from app import collectors, models, rollups
+
+from conftest import wait_for
+
+AWS = models.CloudProvider.AWS
+
+
+@pytest.fixture
+def register_collector():
+    """``register_collector(collector)`` for the duration of one test."""
+    providers = []
+
+    def register(collector: collectors.Collector) -> collectors.Collector:
+        collectors.register_collector(collector)
+        providers.append(collector.provider)
+        return collector
+
+    yield register
+    for provider in providers:
+        collectors.unregister_collector(provider)
+
+
+def _sync(client, headers, account):
+    response = client.post(f"/accounts/{account.id}/sync", headers=headers)
+    if response.status_code != 202:
+        return response, None
+
+    job_id = response.json()["id"]
+
+    def finished():
+        job = client.get(f"/accounts/{account.id}/sync/{job_id}", headers=headers).json()
+        return job if job["status"] in ("succeeded", "failed") else None
+
+    job = wait_for(finished)
+    assert job, "sync job did not finish"
+    return response, job
+
+
+def _refreshed(db, account) -> models.CloudAccount:
+    db.expire_all()
+    return db.get(models.CloudAccount, account.id)
+
+
+def _evaluation_count(db, account) -> int:
+    return db.execute(
+        select(func.count()).select_from(models.PolicyEvaluation).where(models.PolicyEvaluation.account_id == account.id)
+    ).scalar_one()
+
+
+def test_collector_abc_requires_collect():
+    with pytest.raises(TypeError):
+        collectors.Collector()
+
+
+def test_fake_sync_writes_evaluations(client, db, user, headers, make_account, make_policy, register_collector):
+    register_collector(collectors.FakeCollector(AWS))
+    account = make_account()
+    policies = [make_policy() for _ in range(3)]
+    make_policy(models.CloudProvider.GCP)
+
+    response, job = _sync(client, headers, account)
+
+    assert response.status_code == 202
+    assert job["status"] == "succeeded"
+    assert (job["total"], job["processed"], job["created"]) == (3, 3, 3)
+    assert _evaluation_count(db, account) == len(policies)
+    account = _refreshed(db, account)
+    assert account.status == models.AccountStatus.CONNECTED
+    assert account.last_synced_at is not None
+    assert rollups.verify(db, user.id) == []
+
+    _, again = _sync(client, headers, account)
+    assert (again["status"], again["created"], again["updated"]) == ("succeeded", 0, 3)
+
+
+def test_unreachable_provider_fails_the_job_and_the_account(
+    client, db, headers, make_account, make_policy, register_collector
+):
+    register_collector(collectors.FakeCollector(AWS, fail=True))
+    account = make_account(status=models.AccountStatus.CONNECTED)
+    make_policy()
+
+    response, job = _sync(client, headers, account)
+
+    assert response.status_code == 202
+    assert job["status"] == "failed"
+    assert "Unable to reach aws" in job["error"]
+    assert _evaluation_count(db, account) == 0
+    assert _refreshed(db, account).status == models.AccountStatus.ERROR
+
+
+def test_internal_failure_leaves_the_account_status(
+    client, db, headers, make_account, make_policy, register_collector
+):
+    class BrokenCollector(collectors.FakeCollector):
+        def collect(self, account, policies):
+            raise KeyError("bug in our own code")
+
+    register_collector(BrokenCollector(AWS))
+    account = make_account(status=models.AccountStatus.CONNECTED)
+    make_policy()
+
+    _, job = _sync(client, headers, account)
+
+    assert job["status"] == "failed"
+    assert _refreshed(db, account).status == models.AccountStatus.CONNECTED
+
+
+@pytest.mark.parametrize("credentials", [{}, {"credential": "arn:aws:iam::123456789012:role/Audit"}])
+def test_sync_without_a_usable_collector_is_rejected(
+    client, db, headers, make_account, register_collector, credentials
+):
+    if credentials:
+        # The fake collector never serves accounts with real credentials.
+        register_collector(collectors.FakeCollector(AWS))
+    account = make_account(status=models.AccountStatus.CONNECTED, **credentials)
+
+    response, _ = _sync(client, headers, account)
+
+    assert response.status_code == 409
+    assert "No collector configured for aws" in response.json()["detail"]
+    assert db.execute(
+        select(func.count()).select_from(models.SyncJob).where(models.SyncJob.account_id == account.id)
+    ).scalar_one() == 0
+    assert _refreshed(db, account).status == models.AccountStatus.CONNECTED
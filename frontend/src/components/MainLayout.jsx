@@ -6,6 +6,7 @@ import {
   useNotifications,
   useMarkNotificationRead,
   useMarkAllNotificationsRead,
+  useUnreadNotificationCount,
 } from "../services/hooks";
 import ThemeSwitcher from "./ThemeSwitcher";
 import { runAppTransition } from "../lib/transitions";
@@ -109,6 +110,7 @@ export default function MainLayout() {
 
   const { data } = useNotifications({ enabled: Boolean(token) });
   const notifications = data ?? EMPTY_NOTIFICATIONS;
+  const { data: serverUnreadCount } = useUnreadNotificationCount({ enabled: Boolean(token) });
   const markNotificationRead = useMarkNotificationRead();
   const markAllRead = useMarkAllNotificationsRead();
 
@@ -133,7 +135,15 @@ export default function MainLayout() {
     [notifications, dismissedNotificationIds]
   );
 
-  const unreadCount = visibleNotifications.filter((notification) => !notification.is_read).length;
+  // Dismissed notifications are hidden from the list, so they must not count
+  // toward the badge either, even before the server has seen them as read.
+  const dismissedUnreadCount = notifications.filter(
+    (notification) => dismissedNotificationIds.has(notification.id) && !notification.is_read
+  ).length;
+  const unreadCount =
+    serverUnreadCount != null
+      ? Math.max(0, serverUnreadCount - dismissedUnreadCount)
+      : visibleNotifications.filter((notification) => !notification.is_read).length;
 
   const handleLogout = () => {
     runAppTransition("exit", () => {
@@ -1,3 +1,4 @@
+import { useEffect, useState } from "react";
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import { apiClient } from "./apiClient";
 
@@ -7,6 +8,7 @@ const queryKeys = {
   policies: ["policies"],
   evaluations: ["evaluations"],
   notifications: ["notifications"],
+  unreadCount: ["notifications", "unread-count"],
 };
 
 // ===========================
@@ -173,11 +175,43 @@ export function useSignup() {
 // ===========================
 export function useNotifications(options = {}) {
   const token = window.localStorage.getItem("cloud_guard_token");
+  const enabled = options.enabled ?? Boolean(token);
+  const client = useQueryClient();
+  const [streaming, setStreaming] = useState(false);
+
+  // New notifications are pushed over SSE; polling only runs while the stream is down.
+  useEffect(() => {
+    if (!enabled || !token || typeof window.EventSource === "undefined") {
+      return undefined;
+    }
+    const source = new EventSource(
+      `${apiClient.defaults.baseURL}/notifications/stream?token=${encodeURIComponent(token)}`
+    );
+    source.onopen = () => {
+      setStreaming(true);
+      // Pick up anything created while the stream was connecting.
+      client.invalidateQueries({ queryKey: queryKeys.notifications });
+    };
+    // EventSource reconnects on its own and resumes with Last-Event-ID.
+    source.onerror = () => setStreaming(false);
+    source.addEventListener("notification", (event) => {
+      const notification = JSON.parse(event.data);
+      client.setQueryData(queryKeys.notifications, (data = []) =>
+        data.some((item) => item.id === notification.id) ? data : [notification, ...data]
+      );
+      client.invalidateQueries({ queryKey: queryKeys.unreadCount });
+    });
+    return () => {
+      source.close();
+      setStreaming(false);
+    };
+  }, [client, enabled, token]);
+
   return useQuery({
     queryKey: queryKeys.notifications,
     queryFn: () => apiClient.get("notifications/"),  // Add trailing slash
-    enabled: options.enabled ?? Boolean(token),
-    refetchInterval: 30000, // Refetch every 30 seconds
+    enabled,
+    refetchInterval: streaming ? false : 30000, // Fallback: refetch every 30 seconds
     retry: (failureCount, error) => {
       if (error?.response?.status === 401) {
         return false;
@@ -187,6 +221,17 @@ export function useNotifications(options = {}) {
   });
 }
 
+// Served from a per-user counter; the ["notifications"] invalidations above refresh it too.
+export function useUnreadNotificationCount(options = {}) {
+  const token = window.localStorage.getItem("cloud_guard_token");
+  return useQuery({
+    queryKey: queryKeys.unreadCount,
+    queryFn: () => apiClient.get("notifications/unread-count"),
+    enabled: options.enabled ?? Boolean(token),
+    select: (data) => data.unread,
+  });
+}
+
 export function useCreateNotification() {
   const client = useQueryClient();
   return useMutation({
@@ -202,17 +247,29 @@ export function useMarkNotificationRead() {
     onMutate: async (notificationId) => {
       await client.cancelQueries({ queryKey: queryKeys.notifications });
       const previous = client.getQueryData(queryKeys.notifications);
+      const previousUnread = client.getQueryData(queryKeys.unreadCount);
+      const target = previous?.find((item) => item.id === notificationId);
       client.setQueryData(queryKeys.notifications, (data = []) =>
         data.map((item) =>
           item.id === notificationId ? { ...item, is_read: true } : item
         )
       );
-      return { previous };
+      // Keep the badge in step with the list until the refetch lands.
+      if (target && !target.is_read && previousUnread) {
+        client.setQueryData(queryKeys.unreadCount, {
+          ...previousUnread,
+          unread: Math.max(0, previousUnread.unread - 1),
+        });
+      }
+      return { previous, previousUnread };
     },
     onError: (_error, _notificationId, context) => {
       if (context?.previous) {
         client.setQueryData(queryKeys.notifications, context.previous);
       }
+      if (context?.previousUnread) {
+        client.setQueryData(queryKeys.unreadCount, context.previousUnread);
+      }
     },
     onSettled: () => client.invalidateQueries({ queryKey: queryKeys.notifications }),
   });
@@ -225,15 +282,22 @@ export function useMarkAllNotificationsRead() {
     onMutate: async () => {
       await client.cancelQueries({ queryKey: queryKeys.notifications });
       const previous = client.getQueryData(queryKeys.notifications);
+      const previousUnread = client.getQueryData(queryKeys.unreadCount);
       client.setQueryData(queryKeys.notifications, (data = []) =>
         data.map((item) => ({ ...item, is_read: true }))
       );
-      return { previous };
+      if (previousUnread) {
+        client.setQueryData(queryKeys.unreadCount, { ...previousUnread, unread: 0 });
+      }
+      return { previous, previousUnread };
     },
     onError: (_error, _variables, context) => {
       if (context?.previous) {
         client.setQueryData(queryKeys.notifications, context.previous);
       }
+      if (context?.previousUnread) {
+        client.setQueryData(queryKeys.unreadCount, context.previousUnread);
+      }
     },
     onSettled: () => client.invalidateQueries({ queryKey: queryKeys.notifications }),
   });
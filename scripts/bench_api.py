@@ -0,0 +1,254 @@
+"""End-to-end API benchmark: p50/p99 latency and RPS of the hot endpoints.
+
+Usage (from the repo root):
+    python scripts/bench_api.py [--database-url postgresql://.../scratch ...] [--preset small]
+                                [--concurrency 20] [--requests 500] [--json]
+                                [--history api_history.jsonl] [--max-regression 0.2]
+
+For every --database-url (default: a throwaway SQLite file) the schema is
+created with ``python -m app.bootstrap init``, a synthetic dataset is loaded
+with ``python -m app.seed synthetic --preset ...`` and the API is started
+under uvicorn in a separate process (rate limiting and the scheduler off).
+Requests are made as the first synthetic tenant against ``/auth/login``,
+``/dashboard/summary``, ``/policies/evaluations``, ``/accounts/`` and
+``/notifications/`` after a short warm-up. A Postgres URL must point at a
+scratch database; a dataset already loaded there is reused.
+
+--history appends the results with the current commit to a JSONL file; with
+--max-regression the script exits non-zero when p50 or p99 grew, or RPS
+fell, by more than that fraction against the previous entry for the same
+database, preset, concurrency and endpoint.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ENDPOINTS = ["/auth/login", "/dashboard/summary", "/policies/evaluations", "/accounts/", "/notifications/"]
+PASSWORD = "changeme123"
+# Hashing dominates /auth/login, so it gets a fraction of the requests.
+LOGIN_SHARE = 0.1
+
+
+def _tenant_email(seed: int) -> str:
+    return f"tenant00000.s{seed}@synthetic.cloudguard.dev"
+
+
+def _backend_env(database_url: str) -> dict:
+    return {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "STARTUP_MODE": "lazy",
+        "SCHEDULER_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "DEMO_SEED": "false",
+    }
+
+
+def _prepare(env: dict, preset: str, seed: int) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "app.bootstrap", "init", "--no-seed"],
+        cwd="backend", env=env, check=True, capture_output=True,
+    )
+    result = subprocess.run(
+        [sys.executable, "-m", "app.seed", "synthetic", "--preset", preset, "--seed", str(seed)],
+        cwd="backend", env=env, capture_output=True, text=True,
+    )
+    if result.returncode and "already exist" not in result.stderr:
+        raise SystemExit(f"loading the synthetic dataset failed:\n{result.stderr}")
+
+
+def _start_server(env: dict) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd="backend", env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            httpx.get(f"{base_url}/health")
+            return server, base_url
+        except httpx.TransportError:
+            if server.poll() is not None:
+                raise SystemExit("server exited during startup")
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("server did not start")
+
+
+async def _measure(client: httpx.AsyncClient, send, concurrency: int, total: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await send(client)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await send(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "errors": errors,
+    }
+
+
+async def _run_backend(base_url: str, email: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    credentials = {"email": email, "password": PASSWORD}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        login = await client.post("/auth/login", json=credentials)
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        results = {}
+        for path in args.endpoints:
+            if path == "/auth/login":
+                async def send(client):
+                    return await client.post(path, json=credentials)
+                total = max(args.concurrency, int(args.requests * LOGIN_SHARE))
+            else:
+                async def send(client, path=path):
+                    return await client.get(path, headers=headers)
+                total = args.requests
+            results[path] = await _measure(client, send, args.concurrency, total, args.warmup)
+    return results
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+HISTORY_KEY = ("database", "preset", "concurrency", "endpoint")
+
+
+def _previous(history: str, result: dict):
+    """Latest entry measured under the same conditions as ``result``."""
+    if not os.path.exists(history):
+        return None
+    previous = None
+    key = tuple(result[field] for field in HISTORY_KEY)
+    with open(history) as handle:
+        for line in handle:
+            entry = json.loads(line)
+            if tuple(entry.get(field) for field in HISTORY_KEY) == key:
+                previous = entry
+    return previous
+
+
+def _regressions(result: dict, previous: dict, threshold: float) -> list[str]:
+    label = f"{result['database']} {result['endpoint']}"
+    failures = []
+    for metric in ("p50_ms", "p99_ms"):
+        if previous.get(metric) and result[metric] > previous[metric] * (1 + threshold):
+            failures.append(f"{label} {metric}: {result[metric]:.1f} vs {previous[metric]:.1f} at {previous['commit']}")
+    if previous.get("rps") and result["rps"] < previous["rps"] / (1 + threshold):
+        failures.append(f"{label} rps: {result['rps']:.1f} vs {previous['rps']:.1f} at {previous['commit']}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", action="append", dest="database_urls",
+                        help="repeat to compare databases (default: throwaway SQLite)")
+    parser.add_argument("--preset", choices=["small", "medium", "production"], default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="per endpoint (login gets a tenth)")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--endpoint", action="append", dest="endpoints", choices=ENDPOINTS)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--history", help="JSONL file to append this commit's results to")
+    parser.add_argument("--max-regression", type=float, help="fail if p50/p99/RPS regressed by more than this fraction")
+    args = parser.parse_args()
+    args.endpoints = args.endpoints or ENDPOINTS
+
+    database_urls = args.database_urls or [f"sqlite:///{tempfile.mkdtemp()}/bench_api.db"]
+    commit = _commit()
+    results = []
+    for database_url in database_urls:
+        database = database_url.split(":", 1)[0].split("+", 1)[0]
+        env = _backend_env(database_url)
+        _prepare(env, args.preset, args.seed)
+        server, base_url = _start_server(env)
+        try:
+            measured = asyncio.run(_run_backend(base_url, _tenant_email(args.seed), args))
+        finally:
+            server.terminate()
+            server.wait()
+        for endpoint, metrics in measured.items():
+            results.append({
+                "commit": commit,
+                "database": database,
+                "preset": args.preset,
+                "concurrency": args.concurrency,
+                "endpoint": endpoint,
+                **metrics,
+            })
+
+    failures, errors = [], []
+    for result in results:
+        previous = _previous(args.history, result) if args.history else None
+        if previous and args.max_regression is not None:
+            failures.extend(_regressions(result, previous, args.max_regression))
+        result["previous_commit"] = previous["commit"] if previous else None
+        if result["errors"]:
+            errors.append(f"{result['database']} {result['endpoint']}: {result['errors']} error responses")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"commit {commit}, preset {args.preset}, concurrency {args.concurrency}")
+        print(f"{'database':<11}{'endpoint':<24}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for result in results:
+            print(
+                f"{result['database']:<11}{result['endpoint']:<24}{result['rps']:>10.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}"
+            )
+
+    if args.history:
+        with open(args.history, "a") as handle:
+            for result in results:
+                entry = {key: value for key, value in result.items() if key != "previous_commit"}
+                handle.write(json.dumps(entry) + "\n")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    for error in errors:
+        print(f"ERROR {error}", file=sys.stderr)
+    return 1 if failures or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Benchmark login password verification throughput per core.
+
+Usage (from the repo root):
+    python scripts/bench_password_hashing.py [--scheme argon2] [--logins 200] [--workers 1 2 4]
+
+Times verify_and_update inline on one core, then through
+PasswordManager.verify_and_update_async with each --workers pool size
+(0 = thread pool), the same path /auth/login takes. Cost parameters come
+from the usual ARGON2_* / BCRYPT_ROUNDS environment variables.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append("backend")
+from app.security import PasswordManager  # noqa: E402
+
+
+async def _verify_many(manager: PasswordManager, hashed: str, logins: int) -> float:
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(manager.verify_and_update_async("correct horse battery", hashed) for _ in range(logins))
+    )
+    elapsed = time.perf_counter() - started
+    assert all(verified for verified, _ in results)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", choices=["argon2", "bcrypt"], default="argon2")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    inline = PasswordManager(args.scheme, workers=0)
+    hashed = inline.hash("correct horse battery")
+    print(f"scheme: {inline.scheme} ({hashed[: hashed.rfind('$')]}), {os.cpu_count()} cpus")
+
+    samples = max(5, args.logins // 20)
+    started = time.perf_counter()
+    for _ in range(samples):
+        inline.hash("correct horse battery")
+    print(f"hash   inline: {samples / (time.perf_counter() - started):8.1f}/s")
+    started = time.perf_counter()
+    for _ in range(samples):
+        inline.verify("correct horse battery", hashed)
+    print(f"verify inline: {samples / (time.perf_counter() - started):8.1f}/s (one core)")
+
+    for workers in sorted(set(args.workers)):
+        manager = PasswordManager(args.scheme, workers=workers)
+        try:
+            asyncio.run(_verify_many(manager, hashed, max(workers, 1)))  # start the pool
+            elapsed = asyncio.run(_verify_many(manager, hashed, args.logins))
+        finally:
+            manager.shutdown()
+        rate = args.logins / elapsed
+        label = "threads" if workers == 0 else f"{workers} proc"
+        cores = min(max(workers, 1), os.cpu_count() or 1)
+        print(f"login verify, {label:>7}: {rate:8.1f}/s, {rate / cores:8.1f}/s per core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Benchmark API cold start: import, startup hooks and first requests.
+
+Usage (from the repo root):
+    python scripts/bench_startup.py [--mode lazy full] [--runs 5] [--json]
+                                    [--history startup_history.jsonl] [--max-regression 0.2]
+
+Every run is a fresh interpreter, like a serverless cold start, against a
+throwaway SQLite database prepared once with ``python -m app.bootstrap init``.
+It times ``import app.main``, the startup hooks (``STARTUP_MODE``), the
+first ``GET /health`` and the first authenticated, database-backed request
+(``GET /api/dashboard/summary``), and prints the median of each per mode.
+
+--history appends the medians with the current commit to a JSONL file so
+cold start can be tracked per commit; with --max-regression the script
+exits non-zero when a median grew by more than that fraction over the
+previous entry for the same mode.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PHASES = ("import_ms", "startup_ms", "first_health_ms", "first_db_request_ms", "total_ms")
+
+CHILD = r"""
+import json, sys, time
+
+started = time.perf_counter()
+sys.path.append("backend")
+from app.main import app
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from app.routers.auth import create_access_token
+
+client = TestClient(app)
+before_startup = time.perf_counter()
+client.__enter__()  # runs the startup hooks
+after_startup = time.perf_counter()
+health = client.get("/health")
+after_health = time.perf_counter()
+headers = {"Authorization": "Bearer " + create_access_token(int(sys.argv[1]))}
+before_request = time.perf_counter()
+summary = client.get("/api/dashboard/summary", headers=headers)
+after_request = time.perf_counter()
+client.__exit__(None, None, None)
+assert health.status_code == 200 and summary.status_code == 200, (health.status_code, summary.text)
+
+import_ms = (imported - started) * 1000
+startup_ms = (after_startup - before_startup) * 1000
+health_ms = (after_health - after_startup) * 1000
+request_ms = (after_request - before_request) * 1000
+print(json.dumps({
+    "import_ms": import_ms,
+    "startup_ms": startup_ms,
+    "first_health_ms": health_ms,
+    "first_db_request_ms": request_ms,
+    "total_ms": import_ms + startup_ms + health_ms + request_ms,
+}))
+"""
+
+
+def _prepare_database(env: dict) -> int:
+    subprocess.run(
+        [sys.executable, "-m", "app.bootstrap", "init", "--no-seed"],
+        cwd="backend",
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    path = env["DATABASE_URL"].removeprefix("sqlite:///")
+    with sqlite3.connect(path) as conn:
+        (user_id,) = conn.execute("SELECT id FROM users WHERE email = 'admin@cloudguard.dev'").fetchone()
+    return user_id
+
+
+def _run_once(env: dict, user_id: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, str(user_id)], env=env, check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _previous(history: str, mode: str):
+    if not os.path.exists(history):
+        return None
+    previous = None
+    with open(history) as handle:
+        for line in handle:
+            entry = json.loads(line)
+            if entry.get("mode") == mode:
+                previous = entry
+    return previous
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", nargs="+", choices=["lazy", "full"], default=["lazy", "full"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--history", help="JSONL file to append this commit's medians to")
+    parser.add_argument("--max-regression", type=float, help="fail if a median grew by more than this fraction")
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/startup.db",
+        "SCHEDULER_ENABLED": "false",
+        "PYTHONDONTWRITEBYTECODE": "",
+    }
+    user_id = _prepare_database(env)
+    commit = _commit()
+
+    results = []
+    for mode in args.mode:
+        runs = [_run_once({**env, "STARTUP_MODE": mode}, user_id) for _ in range(args.runs)]
+        medians = {phase: round(statistics.median(run[phase] for run in runs), 1) for phase in PHASES}
+        results.append({"commit": commit, "mode": mode, "runs": args.runs, **medians})
+
+    failures = []
+    for result in results:
+        previous = _previous(args.history, result["mode"]) if args.history else None
+        if previous and args.max_regression is not None:
+            for phase in PHASES:
+                if previous.get(phase) and result[phase] > previous[phase] * (1 + args.max_regression):
+                    failures.append(
+                        f"{result['mode']} {phase}: {result[phase]:.1f} ms vs {previous[phase]:.1f} ms at {previous['commit']}"
+                    )
+        result["previous_commit"] = previous["commit"] if previous else None
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"commit {commit}, median of {args.runs} cold starts (ms)")
+        print(f"{'mode':<6}" + "".join(f"{phase.removesuffix('_ms'):>20}" for phase in PHASES))
+        for result in results:
+            print(f"{result['mode']:<6}" + "".join(f"{result[phase]:>20.1f}" for phase in PHASES))
+
+    if args.history:
+        with open(args.history, "a") as handle:
+            for result in results:
+                entry = {key: value for key, value in result.items() if key != "previous_commit"}
+                handle.write(json.dumps(entry) + "\n")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
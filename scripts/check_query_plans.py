@@ -0,0 +1,182 @@
+"""Query-plan regression check: tenant-scoped queries must use their indexes.
+
+Usage (from the repo root):
+    python scripts/check_query_plans.py [--database-url postgresql://.../scratch] [--verbose]
+
+Runs the real crud / rollup / sync query paths against a small fixture,
+captures the SQL they emit and asserts that EXPLAIN shows the expected
+index. Without --database-url a throwaway SQLite file is used; a Postgres
+URL must point at an empty scratch database (tables are created there and
+sequential scans are disabled so tiny tables still show index choice).
+Exits non-zero if any query path does not use one of its indexes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+
+def _capture(engine):
+    """Record (statement, parameters) for every SELECT/UPDATE/DELETE run on ``engine``."""
+    from sqlalchemy import event
+
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in {"SELECT", "UPDATE", "DELETE"}:
+            captured.append((statement, parameters))
+
+    @contextmanager
+    def capturing():
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield captured
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return capturing
+
+
+def _seed(db):
+    from app import models
+
+    user = models.User(email="plans@cloudguard.dev", hashed_password="x", full_name="Plans", is_active=True)
+    db.add(user)
+    db.flush()
+    accounts = [
+        models.CloudAccount(
+            provider=provider, external_id=f"plan-{provider.value}", display_name=f"Plan {provider.value}", owner_id=user.id
+        )
+        for provider in models.CloudProvider
+    ]
+    policies = [
+        models.Policy(
+            provider=provider,
+            name=f"Policy {index}",
+            control_id=f"PLAN-{provider.value}-{index}",
+            category="Identity",
+            owner_id=user.id,
+        )
+        for provider in models.CloudProvider
+        for index in range(5)
+    ]
+    db.add_all(accounts + policies)
+    db.flush()
+    for account in accounts:
+        for policy in policies:
+            if policy.provider == account.provider:
+                db.add(models.PolicyEvaluation(policy_id=policy.id, account_id=account.id))
+    db.add_all(
+        models.Notification(title=f"Note {index}", message="check", owner_id=user.id, is_read=index % 2 == 0)
+        for index in range(10)
+    )
+    db.commit()
+    return user, accounts[0], policies[0]
+
+
+def _checks(user, account, policy):
+    """(name, query path, acceptable index names). Unique constraints appear
+    as ``sqlite_autoindex_<table>_N`` on SQLite and by name on Postgres."""
+    from datetime import timedelta
+
+    from sqlalchemy import select
+
+    from app import crud, models, retention, rollups
+
+    def load_sync_policies(db):
+        db.execute(
+            select(models.Policy).where(
+                models.Policy.owner_id == user.id, models.Policy.provider == account.provider
+            )
+        ).all()
+
+    return [
+        ("accounts list", lambda db: crud.get_accounts(db, current_user=user), {"ix_cloud_accounts_owner_created"}),
+        ("policies list", lambda db: crud.get_policies(db, current_user=user), {"ix_policies_owner_created"}),
+        (
+            "evaluations list",
+            lambda db: crud.get_evaluations_list(db, current_user=user),
+            # Only indexes leading with account_id keep the lookup tenant-scoped;
+            # ix_policy_evaluations_checked would scan every tenant's rows.
+            {
+                "ix_policy_evaluations_account_checked",
+                "ix_policy_evaluations_account_status",
+            },
+        ),
+        ("notifications list", lambda db: crud.get_notifications(db, current_user=user), {"ix_notifications_owner_created"}),
+        (
+            "mark all notifications read",
+            lambda db: crud.mark_all_notifications_read(db, current_user=user),
+            {"ix_notifications_owner_read"},
+        ),
+        (
+            "account status counts",
+            lambda db: rollups.on_account_deleted(db, account),
+            {"ix_policy_evaluations_account_status"},
+        ),
+        (
+            "evaluations by policy",
+            lambda db: rollups.on_policy_deleted(db, policy.id),
+            {"uq_policy_account", "sqlite_autoindex_policy_evaluations_1"},
+        ),
+        ("sync policy load", load_sync_policies, {"ix_policies_owner_provider"}),
+        (
+            "notification retention",
+            lambda db: retention.run(db, ttls={models.NotificationType.BROADCAST: timedelta(days=30)}, dry_run=True),
+            {"ix_notifications_type_created"},
+        ),
+    ]
+
+
+def _explain(conn, statement, parameters, dialect):
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return "\n".join(str(row[-1]) for row in rows)
+    rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    return "\n".join(str(row[0]) for row in rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/query_plans.db"
+    sys.path.append("backend")
+    from app import models  # noqa: F401  (registers the tables)
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    dialect = engine.dialect.name
+    capturing = _capture(engine)
+
+    db = SessionLocal()
+    try:
+        checks = _checks(*_seed(db))
+        failures = 0
+        for name, run, indexes in checks:
+            with capturing() as statements:
+                run(db)
+                db.rollback()
+            with engine.connect() as conn:
+                if dialect == "postgresql":
+                    conn.exec_driver_sql("SET enable_seqscan = off")
+                plans = [_explain(conn, statement, parameters, dialect) for statement, parameters in statements]
+            ok = any(index in plan for plan in plans for index in indexes)
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: expected one of {sorted(indexes)}")
+            if args.verbose or not ok:
+                for (statement, _), plan in zip(statements, plans):
+                    print(f"    {' '.join(statement.split())[:160]}")
+                    print("      " + plan.replace("\n", "\n      "))
+    finally:
+        db.close()
+    print(f"{len(checks) - failures}/{len(checks)} query paths use their indexes ({dialect})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Concurrent-request load test for the API.
+
+Usage (from the repo root):
+    python scripts/load_test.py [--base-url http://localhost:8000] [--concurrency 50]
+                                [--requests 2000] [--path /accounts/ --path /policies/]
+
+Without --base-url an in-process uvicorn server is started against a
+throwaway SQLite database. Each path gets its own run, so the async
+handlers (/accounts/, /notifications/) can be compared with the sync
+threadpool ones (/policies/, /dashboard/summary) - or run it before and
+after a change to compare the same path.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+DEFAULT_PATHS = ["/accounts/", "/notifications/", "/policies/", "/dashboard/summary"]
+
+
+def _start_server() -> str:
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/load_test.db")
+    sys.path.append("backend")
+    import uvicorn
+    from app.main import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/health")
+            return base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise SystemExit("server did not start")
+
+
+async def _run(base_url: str, path: str, token: str, concurrency: int, total: int) -> None:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{path:<22} {total / elapsed:8.1f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   errors {errors}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url")
+    parser.add_argument("--email", default="admin@cloudguard.dev")
+    parser.add_argument("--password", default="changeme123")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+
+    base_url = args.base_url or _start_server()
+    login = httpx.post(f"{base_url}/auth/login", json={"email": args.email, "password": args.password})
+    login.raise_for_status()
+    token = login.json()["access_token"]
+
+    print(f"{args.requests} requests per path, concurrency {args.concurrency}")
+    for path in args.paths or DEFAULT_PATHS:
+        asyncio.run(_run(base_url, path, token, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()